@@ -0,0 +1,110 @@
+from langchain_core.prompts import ChatPromptTemplate
+from src.utils.state import AgentState
+from src.utils.config import get_structured_llm
+from src.schemas.schema import DetailsFeedback
+from src.agents.fluency import calculate_wpm, fluency_key, get_fluency_features
+from src.agents.vocabulary import get_lexical_profile
+from src.utils.cache import memoize_analysis, analysis_version
+from src.utils.fluency_features import format_fluency_features
+from src.utils.lexical_profile import format_lexical_profile
+from src.utils.limits import invoke_llm
+from src.utils.routing import routed_model
+from src.utils.hedging import node_deadline
+from src.utils.logger import setup_logger, log_step
+
+logger = setup_logger(__name__)
+
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert IELTS Speaking examiner. You assess Fluency and Coherence, Pronunciation, Grammatical Range and Accuracy, and Lexical Resource."),
+    ("user", """
+    Analyze the following transcript against all four IELTS Speaking criteria.
+    
+    Transcript: {transcript}
+    Duration: {duration:.2f} seconds
+    
+    Fluency measures from the audio and word timestamps (interpret these, do not recompute them):
+{features}
+    
+    Lexical profile of the transcript (interpret these, do not recompute them):
+{lexical}
+    
+    Provide one structured assessment for each section: fluency, pronunciation, grammar and vocabulary.
+    Each section includes:
+    1. score (0-9): Score for that criterion based on IELTS criteria
+    2. evaluation: List of evaluation details with criteria (e.g., 'Strengths', 'Weaknesses', 'Improvements') and detailed descriptions
+    3. errors: List of issues found for that criterion with:
+       - original: The problematic text
+       - suggested: The improved or corrected version (phonetic guidance for pronunciation)
+       - explanation: Why this is an issue
+    4. feedback: Overall feedback for that criterion
+    
+    Section notes:
+    - fluency: judge speed and pausing from the measures; find repetitions and self-corrections in the transcript; set wpm to {wpm:.2f} (use this exact value)
+    - pronunciation: since you're analyzing text, infer issues from spelling errors, word choice that might
+      indicate mispronunciation, or patterns suggesting accent interference
+    - grammar: grammatical errors and range of sentence structures
+    - vocabulary: judge range from the lexical profile; suggest better synonyms, idioms or more advanced vocabulary for the words used
+    """)
+])
+
+# State keys written by the combined analysis (one per section)
+COMBINED_STATE_KEYS = [
+    "pronunciation_analysis",
+    "pronunciation_quality_analysis",
+    "grammar_analysis",
+    "vocabulary_analysis",
+]
+
+@node_deadline("combined", COMBINED_STATE_KEYS)
+@memoize_analysis("combined", analysis_version(PROMPT, DetailsFeedback), fluency_key)
+async def analyze_combined(state: AgentState) -> AgentState:
+    """
+    Analyzes all four criteria in a single structured-output call.
+    """
+    agent_name = "Combined Analyzer"
+    
+    try:
+        log_step(logger, agent_name, "STARTED")
+        
+        transcript = state.get("transcript", "")
+        duration = state.get("duration", 0)
+        
+        if not transcript:
+            log_step(logger, agent_name, "SKIPPED")
+            return {
+                "pronunciation_analysis": None,
+                "pronunciation_quality_analysis": None,
+                "grammar_analysis": None,
+                "vocabulary_analysis": None,
+            }
+        
+        wpm = calculate_wpm(transcript, duration)
+        
+        structured_llm = get_structured_llm(DetailsFeedback, routed_model("combined", transcript))
+        
+        chain = PROMPT | structured_llm
+        response = await invoke_llm(chain, {
+            "transcript": transcript,
+            "duration": duration,
+            "wpm": wpm,
+            "features": format_fluency_features(get_fluency_features(state)),
+            "lexical": format_lexical_profile(get_lexical_profile(state)),
+        }, hedge="combined")
+        
+        # Keep the locally computed rate rather than whatever the model echoed
+        response.fluency.wpm = wpm
+        
+        result = {
+            "pronunciation_analysis": response.fluency.model_dump(),
+            "pronunciation_quality_analysis": response.pronunciation.model_dump(),
+            "grammar_analysis": response.grammar.model_dump(),
+            "vocabulary_analysis": response.vocabulary.model_dump(),
+        }
+        
+        log_step(logger, agent_name, "COMPLETED")
+        return result
+        
+    except Exception as e:
+        log_step(logger, agent_name, "FAILED")
+        logger.error(f"{agent_name} error: {str(e)}")
+        raise
@@ -1,14 +1,142 @@
+import math
+from typing import Any, Dict, List, Optional
 from langchain_core.prompts import ChatPromptTemplate
 from src.utils.state import AgentState
-from src.utils.config import get_llm
-from src.schemas.schema import IELTSFeedback
+from src.utils.config import get_structured_llm, FEEDBACK_MODE
+from src.schemas.schema import LLMFeedback, DetailsFeedback, SectionFeedback, GeneralSuggestions
+from src.utils.limits import invoke_llm
+from src.utils.routing import select_model
+from src.utils.hedging import is_unavailable, unavailable_section
+from src.agents.fluency import calculate_wpm
 from src.utils.logger import setup_logger, log_step
 
 logger = setup_logger(__name__)
 
-def generate_feedback(state: AgentState) -> AgentState:
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a senior IELTS Speaking Examiner. Your task is to provide a final score and comprehensive feedback report."),
+    ("user", """
+    Based on the following analyses, provide a final IELTS Speaking Report.
+    
+    Transcript: {transcript}
+    
+    Questions Asked:
+    {questions}
+    
+    ---
+    Fluency Analysis:
+    {fluency}
+    
+    ---
+    Pronunciation Analysis:
+    {pronunciation}
+    
+    ---
+    Grammar Analysis:
+    {grammar}
+    
+    ---
+    Vocabulary Analysis:
+    {vocabulary}
+    
+    ---
+    
+    Provide a structured output including:
+    1. overall_score (0-9): The overall IELTS band score
+    2. transcript: The original transcript
+    3. details: Contains four sections (fluency, pronunciation, grammar, vocabulary) - use the analyzed data above
+       - For fluency: use the fluency analysis provided
+       - For pronunciation: use the pronunciation analysis provided
+       - For grammar: use the grammar analysis provided
+       - For vocabulary: use the vocabulary analysis provided
+    4. general_suggestions: List of general improvement suggestions
+    
+    Note: Each section in details should have score, evaluation, errors, and feedback fields.
+    """)
+])
+
+SUGGESTIONS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a senior IELTS Speaking Examiner. Your task is to give the candidate a short list of general improvement suggestions."),
+    ("user", """
+    The candidate has already been scored on each IELTS Speaking criterion.
+    
+    Questions Asked:
+    {questions}
+    
+    {sections}
+    
+    Provide general_suggestions: 3-5 short, actionable suggestions that address the weakest areas first.
+    Do not repeat the individual error corrections.
+    """)
+])
+
+# Keys in AgentState holding each section's analysis, in report order
+SECTION_STATE_KEYS = {
+    "fluency": "pronunciation_analysis",
+    "pronunciation": "pronunciation_quality_analysis",
+    "grammar": "grammar_analysis",
+    "vocabulary": "vocabulary_analysis",
+}
+
+def round_band(score: float) -> float:
+    """
+    Rounds a mean criterion score to an IELTS band: to the nearest half band,
+    with quarter scores rounded up (6.25 -> 6.5, 6.75 -> 7.0, 6.125 -> 6.0).
+    """
+    return math.floor(score * 2 + 0.5) / 2
+
+def calculate_overall_band(scores: List[Optional[float]]) -> float:
+    """
+    Averages the available criterion scores into an overall band score.
+    """
+    available = [score for score in scores if score is not None]
+    if not available:
+        return 0.0
+    return round_band(sum(available) / len(available))
+
+def unavailable_sections(state: AgentState) -> Dict[str, str]:
+    """
+    Sections whose analysis missed its deadline or failed, with the reason.
+    """
+    return {
+        section: state[key]["reason"]
+        for section, key in SECTION_STATE_KEYS.items()
+        if is_unavailable(state.get(key))
+    }
+
+def _placeholder_section(reason: str) -> Dict[str, Any]:
+    return {"score": 0.0, "feedback": f"This section is unavailable: {reason}."}
+
+def assemble_details(state: AgentState) -> Dict[str, Any]:
+    """
+    Builds the details section verbatim from the per-criterion analyses in state.
+    Unavailable sections get a placeholder with a score of 0.
+    """
+    details = {}
+    for section, key in SECTION_STATE_KEYS.items():
+        analysis = state.get(key) or {}
+        details[section] = _placeholder_section(analysis["reason"]) if is_unavailable(analysis) else analysis
+    return DetailsFeedback.model_validate(details).model_dump()
+
+def _format_questions(questions: List[str]) -> str:
+    return "\n".join(f"- {q}" for q in questions) if questions else "No specific questions provided."
+
+def _format_sections(details: Dict[str, Any], unavailable: Dict[str, str]) -> str:
+    lines = []
+    for section, analysis in details.items():
+        if section in unavailable:
+            continue
+        lines.append(f"{section.capitalize()} (band {analysis['score']}): {analysis['feedback']}")
+    return "\n".join(lines)
+
+async def generate_feedback(state: AgentState) -> AgentState:
     """
     Aggregates all analysis and generates a final IELTS feedback report with a band score.
+    
+    Modes (per-request "feedback_mode" in state, else FEEDBACK_MODE):
+    - "llm": the LLM writes the whole report from the analyses
+    - "assembled": details and overall band are assembled locally; the LLM only
+      writes general_suggestions
+    - "fast": fully local report with no LLM call and no general_suggestions
     """
     agent_name = "Feedback Generator"
     
@@ -16,75 +144,22 @@ def generate_feedback(state: AgentState) -> AgentState:
         log_step(logger, agent_name, "STARTED")
 
         transcript = state.get("transcript", "")
-        fluency = state.get("pronunciation_analysis", {})
-        pronunciation = state.get("pronunciation_quality_analysis", {})
-        grammar = state.get("grammar_analysis", {})
-
-        vocabulary = state.get("vocabulary_analysis", {})
-        questions = state.get("questions", [])
+        questions = state.get("questions", []) or []
+        mode = state.get("feedback_mode") or FEEDBACK_MODE
         
         if not transcript:
             log_step(logger, agent_name, "SKIPPED")
             return {"final_feedback": None}
         
-        llm = get_llm()
-        structured_llm = llm.with_structured_output(IELTSFeedback)
+        # A report may lack some sections, but not all of them
+        if len(unavailable_sections(state)) == len(SECTION_STATE_KEYS):
+            raise RuntimeError("No section analysis is available.")
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a senior IELTS Speaking Examiner. Your task is to provide a final score and comprehensive feedback report."),
-            ("user", """
-            Based on the following analyses, provide a final IELTS Speaking Report.
-            
-            Transcript: {transcript}
-            
-            Questions Asked:
-            {questions}
-            
-            ---
-            Fluency Analysis:
-            {fluency}
-            
-            ---
-            Pronunciation Analysis:
-            {pronunciation}
-            
-            ---
-            Grammar Analysis:
-            {grammar}
-            
-            ---
-            Vocabulary Analysis:
-            {vocabulary}
-            
-            ---
-            
-            Provide a structured output including:
-            1. overall_score (0-9): The overall IELTS band score
-            2. transcript: The original transcript
-            3. details: Contains four sections (fluency, pronunciation, grammar, vocabulary) - use the analyzed data above
-               - For fluency: use the fluency analysis provided
-               - For pronunciation: use the pronunciation analysis provided
-               - For grammar: use the grammar analysis provided
-               - For vocabulary: use the vocabulary analysis provided
-            4. general_suggestions: List of general improvement suggestions
-            
-            Note: Each section in details should have score, evaluation, errors, and feedback fields.
-            """)
-        ])
+        if mode == "llm":
+            response_data = await _generate_llm_report(state, transcript, questions)
+        else:
+            response_data = await _assemble_report(state, transcript, questions, with_suggestions=(mode != "fast"))
         
-        chain = prompt | structured_llm
-        response = chain.invoke({
-            "transcript": transcript,
-            "fluency": fluency,
-            "pronunciation": pronunciation,
-            "grammar": grammar,
-
-            "vocabulary": vocabulary,
-            "questions": "\n".join(f"- {q}" for q in questions) if questions else "No specific questions provided."
-        })
-        
-        response_data = response.model_dump()
-        response_data["questions"] = questions
         result = {"final_feedback": response_data}
         
         log_step(logger, agent_name, "COMPLETED")
@@ -94,3 +169,141 @@ def generate_feedback(state: AgentState) -> AgentState:
         log_step(logger, agent_name, "FAILED")
         logger.error(f"{agent_name} error: {str(e)}")
         raise
+
+async def _assemble_report(state: AgentState, transcript: str, questions: List[str], with_suggestions: bool) -> Dict[str, Any]:
+    details = assemble_details(state)
+    unavailable = unavailable_sections(state)
+    overall_score = calculate_overall_band([
+        None if section in unavailable else analysis["score"]
+        for section, analysis in details.items()
+    ])
+    
+    general_suggestions = []
+    if with_suggestions:
+        chain = SUGGESTIONS_PROMPT | get_structured_llm(GeneralSuggestions, select_model("suggestions", transcript))
+        response = await invoke_llm(chain, {
+            "questions": _format_questions(questions),
+            "sections": _format_sections(details, unavailable),
+        })
+        general_suggestions = response.general_suggestions
+    
+    return {
+        "overall_score": overall_score,
+        "questions": questions,
+        "transcript": transcript,
+        "details": details,
+        "general_suggestions": general_suggestions,
+        "unavailable_sections": list(unavailable),
+    }
+
+async def _generate_llm_report(state: AgentState, transcript: str, questions: List[str]) -> Dict[str, Any]:
+    unavailable = unavailable_sections(state)
+    analyses = {
+        section: (
+            f"Unavailable ({unavailable[section]}). Do not score this section or count it in overall_score."
+            if section in unavailable else state.get(key, {})
+        )
+        for section, key in SECTION_STATE_KEYS.items()
+    }
+    
+    structured_llm = get_structured_llm(LLMFeedback, select_model("feedback", transcript))
+    
+    chain = PROMPT | structured_llm
+    response = await invoke_llm(chain, {
+        "transcript": transcript,
+        **analyses,
+        "questions": _format_questions(questions)
+    })
+    
+    response_data = response.model_dump()
+    response_data["questions"] = questions
+    for section, reason in unavailable.items():
+        response_data["details"][section] = SectionFeedback.model_validate(_placeholder_section(reason)).model_dump()
+    response_data["unavailable_sections"] = list(unavailable)
+    return response_data
+
+def merge_part_analyses(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merges each section's analyses across the parts of a test session.
+    
+    A section's score is the half-band-rounded mean over the parts where it is
+    available; evaluations, errors and feedback are kept per part, labelled
+    with the part number. A section unavailable in every part stays unavailable.
+    
+    Args:
+        parts: {"part": number, "state": final graph state of that part}, in part order
+    """
+    merged = {}
+    for section, key in SECTION_STATE_KEYS.items():
+        available = [
+            (part["part"], part["state"][key])
+            for part in parts
+            if part["state"].get(key) and not is_unavailable(part["state"][key])
+        ]
+        if not available:
+            reasons = [part["state"][key]["reason"] for part in parts if is_unavailable(part["state"].get(key))]
+            merged[key] = unavailable_section(reasons[0] if reasons else "no part was analyzed")
+            continue
+        merged[key] = {
+            "score": round_band(sum(analysis["score"] for _, analysis in available) / len(available)),
+            "evaluation": [
+                {**item, "criteria": f"Part {number}: {item['criteria']}"}
+                for number, analysis in available
+                for item in analysis.get("evaluation", [])
+            ],
+            "errors": [error for _, analysis in available for error in analysis.get("errors", [])],
+            "feedback": "\n".join(f"Part {number}: {analysis.get('feedback', '')}" for number, analysis in available),
+        }
+    
+    fluency_key = SECTION_STATE_KEYS["fluency"]
+    if not is_unavailable(merged[fluency_key]):
+        transcript = " ".join(part["state"].get("transcript") or "" for part in parts)
+        duration = sum(part["state"].get("duration") or 0 for part in parts)
+        merged[fluency_key]["wpm"] = calculate_wpm(transcript, duration)
+    return merged
+
+def part_feedback(part: int, state: AgentState) -> Dict[str, Any]:
+    """
+    One part's breakdown for a session report, assembled locally.
+    """
+    details = assemble_details(state)
+    unavailable = unavailable_sections(state)
+    return {
+        "part": part,
+        "questions": state.get("questions", []) or [],
+        "transcript": state.get("transcript", "") or "",
+        "duration": state.get("duration"),
+        "overall_score": calculate_overall_band([
+            None if section in unavailable else analysis["score"]
+            for section, analysis in details.items()
+        ]),
+        "details": details,
+        "unavailable_sections": list(unavailable),
+    }
+
+async def generate_session_feedback(parts: List[Dict[str, Any]], feedback_mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Produces one report for a multi-part test session from the analyses of
+    each part, with a per-part breakdown.
+    
+    The merged analyses go through generate_feedback() once, so the session
+    costs a single report call (or none in "fast" mode) however many parts it has.
+    
+    Args:
+        parts: {"part": number, "state": final graph state of that part}, in part order
+        feedback_mode: Overrides FEEDBACK_MODE for the session report
+    """
+    session_state = {
+        "transcript": "\n\n".join(
+            f"Part {part['part']}: {part['state'].get('transcript') or ''}" for part in parts
+        ),
+        "questions": [question for part in parts for question in (part["state"].get("questions") or [])],
+        "feedback_mode": feedback_mode,
+        **merge_part_analyses(parts),
+    }
+    result = await generate_feedback(session_state)
+    report = result["final_feedback"]
+    if not report:
+        raise RuntimeError("No transcript in any part of the session.")
+    report["parts"] = [part_feedback(part["part"], part["state"]) for part in parts]
+    return report
@@ -1,14 +1,74 @@
+from typing import Any, Dict, Optional
 from langchain_core.prompts import ChatPromptTemplate
 from src.utils.state import AgentState
-from src.utils.config import get_llm
+from src.utils.config import get_structured_llm
 from src.schemas.schema import FluencyFeedback
+from src.utils.cache import memoize_analysis, analysis_version, fingerprint, transcript_duration_key
+from src.utils.limits import invoke_llm
+from src.utils.routing import routed_model
+from src.utils.hedging import node_deadline
+from src.utils.fluency_features import extract_fluency_features, format_fluency_features
 from src.utils.logger import setup_logger, log_step
 
 logger = setup_logger(__name__)
 
-def analyze_fluency(state: AgentState) -> AgentState:
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert IELTS Speaking examiner specializing in Fluency and Coherence."),
+    ("user", """
+    Analyze the following transcript for Fluency and Coherence.
+    
+    Transcript: {transcript}
+    Duration: {duration:.2f} seconds
+    
+    Measured from the audio and word timestamps (interpret these, do not recompute them):
+{features}
+    
+    Judge speed, pausing and hesitation from these measures; use the transcript for coherence,
+    repetitions and self-corrections.
+    
+    Provide a structured assessment including:
+    1. score (0-9): Fluency and coherence score based on IELTS criteria
+    2. evaluation: List of evaluation details with criteria (e.g., 'Strengths', 'Weaknesses', 'Improvements') and detailed descriptions
+    3. errors: List of fluency issues found (hesitations, repetitions, self-corrections) with:
+       - original: The problematic text
+       - suggested: How it could be improved
+       - explanation: Why this is an issue
+    4. feedback: Overall feedback on fluency and coherence
+    5. wpm: {wpm:.2f} (use this exact value)
+    """)
+])
+
+def calculate_wpm(transcript: str, duration: float) -> float:
+    """
+    Calculates the speaking rate in words per minute.
+    """
+    word_count = len(transcript.split())
+    return (word_count / duration) * 60 if duration and duration > 0 else 0
+
+def get_fluency_features(state: AgentState) -> Dict[str, Any]:
     """
-    Analyzes fluency and coherence based on transcript and duration.
+    Returns the fluency measures taken at transcription, or computes them from
+    the timestamps in state (e.g. a transcript cached before they existed).
+    """
+    return state.get("fluency_features") or extract_fluency_features(
+        state.get("transcript", ""), state.get("duration"), state.get("words"), state.get("segments"),
+    )
+
+def fluency_key(state: Dict[str, Any]) -> Optional[tuple]:
+    """
+    Cache key inputs for analyses that also use the fluency measures.
+    """
+    key = transcript_duration_key(state)
+    if key is None:
+        return None
+    return (*key, fingerprint(state.get("fluency_features")))
+
+@node_deadline("fluency", ["pronunciation_analysis"])
+@memoize_analysis("fluency", analysis_version(PROMPT, FluencyFeedback), fluency_key)
+async def analyze_fluency(state: AgentState) -> AgentState:
+    """
+    Analyzes fluency and coherence from the transcript and the locally measured
+    pause, rate and run features; the model interprets the numbers.
     """
     agent_name = "Fluency Analyzer"
     
@@ -23,35 +83,17 @@ def analyze_fluency(state: AgentState) -> AgentState:
             return {"pronunciation_analysis": None}
         
         # Calculate Words Per Minute (WPM)
-        word_count = len(transcript.split())
-        wpm = (word_count / duration) * 60 if duration > 0 else 0
-        
-        llm = get_llm()
-        structured_llm = llm.with_structured_output(FluencyFeedback)
+        wpm = calculate_wpm(transcript, duration)
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert IELTS Speaking examiner specializing in Fluency and Coherence."),
-            ("user", """
-            Analyze the following transcript for Fluency and Coherence.
-            
-            Transcript: {transcript}
-            Duration: {duration:.2f} seconds
-            Speaking Rate: {wpm:.2f} Words Per Minute (WPM)
-            
-            Provide a structured assessment including:
-            1. score (0-9): Fluency and coherence score based on IELTS criteria
-            2. evaluation: List of evaluation details with criteria (e.g., 'Strengths', 'Weaknesses', 'Improvements') and detailed descriptions
-            3. errors: List of fluency issues found (hesitations, repetitions, self-corrections) with:
-               - original: The problematic text
-               - suggested: How it could be improved
-               - explanation: Why this is an issue
-            4. feedback: Overall feedback on fluency and coherence
-            5. wpm: {wpm:.2f} (use this exact value)
-            """)
-        ])
+        structured_llm = get_structured_llm(FluencyFeedback, routed_model("fluency", transcript))
         
-        chain = prompt | structured_llm
-        response = chain.invoke({"transcript": transcript, "duration": duration, "wpm": wpm})
+        chain = PROMPT | structured_llm
+        response = await invoke_llm(chain, {
+            "transcript": transcript,
+            "duration": duration,
+            "wpm": wpm,
+            "features": format_fluency_features(get_fluency_features(state)),
+        }, hedge="fluency")
         
         result = {"pronunciation_analysis": response.model_dump()}
         
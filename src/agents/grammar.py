@@ -1,14 +1,50 @@
 from langchain_core.prompts import ChatPromptTemplate
 from src.utils.state import AgentState
-from src.utils.config import get_llm
+from src.utils.config import get_structured_llm
 from src.schemas.schema import GrammarFeedback
+from src.utils.cache import memoize_analysis, analysis_version, transcript_key
+from src.utils.limits import invoke_llm
+from src.utils.routing import routed_model
+from src.utils.hedging import node_deadline
+from src.utils.grammar_checks import grammar_prepass, format_flagged, format_complexity, format_range_samples
 from src.utils.logger import setup_logger, log_step
 
 logger = setup_logger(__name__)
 
-def analyze_grammar(state: AgentState) -> AgentState:
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert IELTS Speaking examiner specializing in Grammatical Range and Accuracy."),
+    ("user", """
+    Assess the candidate's grammatical range and accuracy.
+    
+    Sentence statistics, measured over the whole transcript (interpret these, do not recompute them):
+{complexity}
+    
+    Sentences flagged by local pattern checks (marked >>), with neighbouring sentences for context.
+    The checks are only hints: confirm or reject each flag, and report any other error in a >> sentence.
+{flagged}
+    
+    The most complex of the remaining, unflagged sentences (for range):
+{samples}
+    
+    Provide a structured assessment including:
+    1. score (0-9): Grammar score based on IELTS criteria; judge range from the statistics and samples,
+       accuracy from the share of sentences with confirmed errors
+    2. evaluation: List of evaluation details with criteria (e.g., 'Strengths', 'Weaknesses', 'Improvements') and detailed descriptions
+    3. errors: List of grammatical errors found in the >> sentences with:
+       - original: The incorrect text
+       - suggested: The corrected version
+       - explanation: Explanation of the grammatical error
+    4. feedback: General feedback on grammatical range and accuracy
+    """)
+])
+
+@node_deadline("grammar", ["grammar_analysis"])
+@memoize_analysis("grammar", analysis_version(PROMPT, GrammarFeedback), transcript_key)
+async def analyze_grammar(state: AgentState) -> AgentState:
     """
-    Analyzes grammar accuracy and range.
+    Analyzes grammar accuracy and range. A local pre-pass flags suspicious
+    sentences; only those (with a sentence of context) and a few complex
+    clean ones are sent to the LLM, alongside the complexity statistics.
     """
     agent_name = "Grammar Analyzer"
     
@@ -21,29 +57,18 @@ def analyze_grammar(state: AgentState) -> AgentState:
             log_step(logger, agent_name, "SKIPPED")
             return {"grammar_analysis": None}
         
-        llm = get_llm()
-        structured_llm = llm.with_structured_output(GrammarFeedback)
-        
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert IELTS Speaking examiner specializing in Grammatical Range and Accuracy."),
-            ("user", """
-            Analyze the following transcript for Grammatical errors and sentence structure.
-            
-            Transcript: {transcript}
-            
-            Provide a structured assessment including:
-            1. score (0-9): Grammar score based on IELTS criteria
-            2. evaluation: List of evaluation details with criteria (e.g., 'Strengths', 'Weaknesses', 'Improvements') and detailed descriptions
-            3. errors: List of grammatical errors found with:
-               - original: The incorrect text
-               - suggested: The corrected version
-               - explanation: Explanation of the grammatical error
-            4. feedback: General feedback on grammatical range and accuracy
-            """)
-        ])
+        structured_llm = get_structured_llm(GrammarFeedback, routed_model("grammar", transcript))
         
-        chain = prompt | structured_llm
-        response = chain.invoke({"transcript": transcript})
+        chain = PROMPT | structured_llm
+        prepass = grammar_prepass(transcript)
+        logger.info(
+            f"{agent_name}: {len(prepass['flagged'])} of {len(prepass['sentences'])} sentences flagged"
+        )
+        response = await invoke_llm(chain, {
+            "complexity": format_complexity(prepass),
+            "flagged": format_flagged(prepass),
+            "samples": format_range_samples(prepass),
+        }, hedge="grammar")
         
         result = {"grammar_analysis": response.model_dump()}
         
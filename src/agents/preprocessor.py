@@ -0,0 +1,71 @@
+import io
+import os
+import asyncio
+import time
+from typing import Any, Dict, Union
+from src.utils.state import AgentState
+from src.utils.config import (
+    NORMALIZE_AUDIO_ENABLED,
+    NORMALIZE_MIN_BYTES,
+    NORMALIZE_SAMPLE_RATE,
+    NORMALIZE_FORMAT,
+    NORMALIZE_CODEC,
+    NORMALIZE_BITRATE,
+)
+from src.utils.audio import audio_source, format_from_filename, load_audio, normalize_audio
+from src.utils.logger import setup_logger, log_step
+
+logger = setup_logger(__name__)
+
+def _normalize(source: Union[str, bytes], filename: str) -> Dict[str, Any]:
+    """
+    Decodes, normalizes and re-encodes the audio; CPU-bound, run in a worker thread.
+    The (small) result is kept in memory rather than written back to disk.
+    """
+    audio = normalize_audio(load_audio(source, format_from_filename(filename)), NORMALIZE_SAMPLE_RATE)
+    buffer = io.BytesIO()
+    audio.export(buffer, format=NORMALIZE_FORMAT, codec=NORMALIZE_CODEC or None, bitrate=NORMALIZE_BITRATE)
+    stem = os.path.splitext(filename)[0]
+    return {
+        "audio_bytes": buffer.getvalue(),
+        "audio_filename": f"{stem}.{NORMALIZE_FORMAT}",
+        "audio_duration": len(audio) / 1000,
+    }
+
+async def preprocess_audio(state: AgentState) -> AgentState:
+    """
+    Shrinks large uploads before transcription: mono, 16 kHz, trimmed, compact codec.
+    """
+    agent_name = "Audio Preprocessor"
+    
+    try:
+        log_step(logger, agent_name, "STARTED")
+        
+        source, filename, original_bytes = audio_source(state)
+        
+        if not NORMALIZE_AUDIO_ENABLED or original_bytes < NORMALIZE_MIN_BYTES:
+            log_step(logger, agent_name, "SKIPPED")
+            return {"preprocessing": {"skipped": True, "original_bytes": original_bytes}}
+        
+        started = time.perf_counter()
+        result = await asyncio.to_thread(_normalize, source, filename)
+        elapsed = time.perf_counter() - started
+        normalized_bytes = len(result["audio_bytes"])
+        
+        result["preprocessing"] = {
+            "skipped": False,
+            "original_bytes": original_bytes,
+            "normalized_bytes": normalized_bytes,
+            "seconds": round(elapsed, 3),
+        }
+        logger.info(
+            f"{agent_name}: {original_bytes / 1e6:.1f} MB -> {normalized_bytes / 1e6:.1f} MB in {elapsed:.2f}s"
+        )
+        
+        log_step(logger, agent_name, "COMPLETED")
+        return result
+        
+    except Exception as e:
+        log_step(logger, agent_name, "FAILED")
+        logger.error(f"{agent_name} error: {str(e)}")
+        raise
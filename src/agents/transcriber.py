@@ -1,11 +1,188 @@
-import os
-from openai import OpenAI
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
 from src.utils.state import AgentState
+from src.utils.config import (
+    get_openai_client,
+    TRANSCRIPT_CACHE_MAX_ENTRIES,
+    TRANSCRIPT_CACHE_MAX_BYTES,
+    TRANSCRIPT_CACHE_TTL,
+    TRANSCRIBE_CHUNK_MIN_BYTES,
+    TRANSCRIBE_CHUNK_SECONDS,
+    TRANSCRIBE_MAX_UPLOAD_BYTES,
+    TRANSCRIBE_MAX_CONCURRENCY,
+    TRANSCRIBE_SILENCE_MIN_MS,
+    TRANSCRIBE_SILENCE_SEARCH_SECONDS,
+    TRANSCRIBE_CHUNK_FORMAT,
+    FLUENCY_VAD_ENABLED,
+)
+from pydub import AudioSegment
+from src.utils.cache import create_cache, TieredCache
+from src.utils.audio import AudioChunk, audio_source, format_from_filename, load_audio, split_audio
+from src.utils.fluency_features import extract_fluency_features, voice_activity
+from src.utils.lexical_profile import profile_lexis
+from src.utils.limits import call_whisper
+from src.utils.metrics import record_whisper
 from src.utils.logger import setup_logger, log_step
 
 logger = setup_logger(__name__)
 
-def transcribe_audio(state: AgentState) -> AgentState:
+_transcript_cache: Optional[TieredCache] = None
+
+def get_transcript_cache() -> TieredCache:
+    """
+    Returns the content-addressed transcript cache, keyed by audio SHA-256.
+    """
+    global _transcript_cache
+    if _transcript_cache is None:
+        _transcript_cache = create_cache(
+            "transcripts",
+            max_entries=TRANSCRIPT_CACHE_MAX_ENTRIES,
+            max_bytes=TRANSCRIPT_CACHE_MAX_BYTES,
+            ttl=TRANSCRIPT_CACHE_TTL,
+        )
+    return _transcript_cache
+
+def lookup_transcript(audio_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the cached transcript state for an audio digest, or None on a miss.
+    """
+    cache = get_transcript_cache()
+    cached = cache.get(audio_hash)
+    if cached is None:
+        return None
+    cache.stats.bytes_saved += cached.get("audio_size", 0)
+    return {
+        "transcript": cached["transcript"],
+        "duration": cached["duration"],
+        "segments": cached["segments"],
+        "words": cached.get("words"),
+        "fluency_features": cached.get("fluency_features"),
+        "lexical_profile": cached.get("lexical_profile"),
+    }
+
+def _read_file(path: str) -> bytes:
+    """Reads the whole audio file; run in a worker thread."""
+    with open(path, "rb") as f:
+        return f.read()
+
+def _may_need_chunking(upload_size: int, audio_duration: Optional[float]) -> bool:
+    """
+    Cheap pre-check before decoding: uses the duration when preprocessing already
+    measured it, otherwise the upload size.
+    """
+    if upload_size > TRANSCRIBE_MAX_UPLOAD_BYTES:
+        return True
+    if audio_duration is not None:
+        return audio_duration > TRANSCRIBE_CHUNK_SECONDS
+    return upload_size > TRANSCRIBE_CHUNK_MIN_BYTES
+
+def _voice_activity(audio: AudioSegment) -> Optional[Dict[str, Any]]:
+    """
+    Voice activity of the recording for the fluency measures, or None when
+    disabled or it fails.
+    """
+    if not FLUENCY_VAD_ENABLED:
+        return None
+    try:
+        return voice_activity(audio)
+    except Exception as e:
+        logger.warning(f"Voice activity detection skipped: {str(e)}")
+        return None
+
+def _decode_voice_activity(source: Union[str, bytes], filename: str) -> Optional[Dict[str, Any]]:
+    """
+    Decodes the recording and runs the voice activity pass; run in a worker
+    thread. A recording that cannot be decoded only loses the audio-based
+    measures, so errors are logged rather than raised.
+    """
+    try:
+        audio = load_audio(source, format_from_filename(filename))
+    except Exception as e:
+        logger.warning(f"Voice activity detection skipped: {str(e)}")
+        return None
+    return _voice_activity(audio)
+
+def _prepare_chunks(source: Union[str, bytes], filename: str, audio_size: int) -> Tuple[Optional[List[AudioChunk]], Optional[Dict[str, Any]]]:
+    """
+    Splits long or oversized recordings into chunks (None when the file can be
+    uploaded as is), and runs the voice activity pass on the same decoded audio.
+    Decodes with ffmpeg, so run in a worker thread.
+    """
+    audio = load_audio(source, format_from_filename(filename))
+    activity = _voice_activity(audio)
+    if len(audio) <= TRANSCRIBE_CHUNK_SECONDS * 1000 and audio_size <= TRANSCRIBE_MAX_UPLOAD_BYTES:
+        return None, activity
+    return split_audio(
+        audio,
+        max_chunk_seconds=TRANSCRIBE_CHUNK_SECONDS,
+        min_silence_ms=TRANSCRIBE_SILENCE_MIN_MS,
+        search_seconds=TRANSCRIBE_SILENCE_SEARCH_SECONDS,
+        export_format=TRANSCRIBE_CHUNK_FORMAT,
+    ), activity
+
+async def _whisper(filename: str, audio_bytes: bytes):
+    client = get_openai_client()
+    started = time.perf_counter()
+    transcript = await call_whisper(lambda: client.audio.transcriptions.create(
+        model="whisper-1", 
+        file=(filename, audio_bytes),
+        response_format="verbose_json",
+        timestamp_granularities=["word", "segment"],
+    ))
+    record_whisper(transcript.duration, time.perf_counter() - started)
+    return transcript
+
+def _segments(transcript, offset: float = 0.0) -> List[Dict[str, Any]]:
+    return [
+        {"start": segment.start + offset, "end": segment.end + offset, "text": segment.text}
+        for segment in (transcript.segments or [])
+    ]
+
+def _words(transcript, offset: float = 0.0) -> List[Dict[str, Any]]:
+    return [
+        {"start": word.start + offset, "end": word.end + offset, "word": word.word}
+        for word in (getattr(transcript, "words", None) or [])
+    ]
+
+async def transcribe_chunk(chunk: AudioChunk) -> Dict[str, Any]:
+    """
+    Transcribes one chunk with its segment and word timestamps placed on the
+    recording's timeline (shifted by the chunk's offset).
+    """
+    transcript = await _whisper(chunk.filename, chunk.data)
+    return {
+        "transcript": transcript.text.strip(),
+        "duration": chunk.duration,
+        "segments": _segments(transcript, chunk.offset),
+        "words": _words(transcript, chunk.offset),
+    }
+
+def merge_transcriptions(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Stitches chunk transcriptions, in recording order, into one transcript.
+    """
+    return {
+        "transcript": " ".join(part["transcript"] for part in parts if part["transcript"]),
+        "duration": round(sum(part["duration"] for part in parts), 3),
+        "segments": [segment for part in parts for segment in part["segments"]],
+        "words": [word for part in parts for word in part["words"]],
+    }
+
+async def _transcribe_chunks(chunks: List[AudioChunk]) -> Dict[str, Any]:
+    """
+    Transcribes chunks concurrently (bounded by TRANSCRIBE_MAX_CONCURRENCY) and
+    stitches text and segment timestamps back onto the recording's timeline.
+    """
+    semaphore = asyncio.Semaphore(TRANSCRIBE_MAX_CONCURRENCY)
+    
+    async def transcribe(chunk: AudioChunk):
+        async with semaphore:
+            return await transcribe_chunk(chunk)
+    
+    return merge_transcriptions(await asyncio.gather(*(transcribe(chunk) for chunk in chunks)))
+
+async def transcribe_audio(state: AgentState) -> AgentState:
     """
     Transcribes audio using OpenAI's Whisper model.
     """
@@ -14,29 +191,56 @@ def transcribe_audio(state: AgentState) -> AgentState:
     try:
         log_step(logger, agent_name, "STARTED")
         
-        audio_path = state["audio_path"]
+        # In-memory audio (small uploads, normalized audio) or the spilled upload file
+        source, filename, upload_size = audio_source(state)
         
-        if not os.path.exists(audio_path):
-            log_step(logger, agent_name, "FAILED")
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        # Long recordings are split at silences and transcribed in parallel
+        chunks = None
+        activity = None
+        activity_task = None
+        if _may_need_chunking(upload_size, state.get("audio_duration")):
+            chunks, activity = await asyncio.to_thread(_prepare_chunks, source, filename, upload_size)
+        elif FLUENCY_VAD_ENABLED:
+            # Voice activity is measured in a worker thread while Whisper runs
+            activity_task = asyncio.create_task(asyncio.to_thread(_decode_voice_activity, source, filename))
         
-        client = OpenAI()
+        try:
+            if chunks:
+                logger.info(f"{agent_name}: transcribing {len(chunks)} chunks")
+                result = await _transcribe_chunks(chunks)
+            else:
+                audio_bytes = source
+                if not isinstance(source, bytes):
+                    # Read the file off the event loop so other requests keep being served
+                    audio_bytes = await asyncio.to_thread(_read_file, source)
+                transcript = await _whisper(filename, audio_bytes)
+                
+                # Extract text, duration and segment / word timestamps
+                result = {
+                    "transcript": transcript.text,
+                    "duration": transcript.duration,
+                    "segments": _segments(transcript),
+                    "words": _words(transcript),
+                }
+            if activity_task is not None:
+                activity = await activity_task
+        finally:
+            if activity_task is not None and not activity_task.done():
+                activity_task.cancel()
         
-        with open(audio_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1", 
-                file=audio_file,
-                response_format="verbose_json"
-            )
+        result["fluency_features"] = extract_fluency_features(
+            result["transcript"], result["duration"], result["words"], result["segments"], activity,
+        )
+        result["lexical_profile"] = profile_lexis(result["transcript"])
         
-        # Extract text and duration
-        text = transcript.text
-        duration = transcript.duration
+        audio_hash = state.get("audio_hash")
+        if audio_hash:
+            audio_size = state.get("audio_size") or upload_size
+            get_transcript_cache().set(audio_hash, {**result, "audio_size": audio_size})
         
-        result = {
-            "transcript": text,
-            "duration": duration
-        }
+        # The audio is not needed past this point; later checkpoints of the run
+        # (and a failed run kept for resuming) no longer hold it
+        result["audio_bytes"] = None
         
         log_step(logger, agent_name, "COMPLETED")
         return result
@@ -1,14 +1,54 @@
+from typing import Any, Dict
 from langchain_core.prompts import ChatPromptTemplate
 from src.utils.state import AgentState
-from src.utils.config import get_llm
+from src.utils.config import get_structured_llm
 from src.schemas.schema import VocabularyFeedback
+from src.utils.cache import memoize_analysis, analysis_version, transcript_key
+from src.utils.limits import invoke_llm
+from src.utils.routing import routed_model
+from src.utils.hedging import node_deadline
+from src.utils.lexical_profile import profile_lexis, format_lexical_profile, format_excerpts
 from src.utils.logger import setup_logger, log_step
 
 logger = setup_logger(__name__)
 
-def analyze_vocabulary(state: AgentState) -> AgentState:
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert IELTS Speaking examiner specializing in Lexical Resource."),
+    ("user", """
+    Assess the candidate's vocabulary usage.
+    
+    Lexical profile, measured over the whole transcript (interpret these, do not recompute them):
+{profile}
+    
+    Excerpts from the transcript (sentences with repeated words, basic words or idioms):
+{excerpts}
+    
+    Judge range and diversity from the profile, and precision and idiomatic use from the excerpts.
+    
+    Provide a structured assessment including:
+    1. score (0-9): Vocabulary score based on IELTS criteria
+    2. evaluation: List of evaluation details with criteria (e.g., 'Strengths', 'Weaknesses', 'Improvements') and detailed descriptions
+    3. errors: List of vocabulary improvements with:
+       - original: The word or phrase used, quoted from the excerpts
+       - suggested: A better synonym, idiom, or more advanced vocabulary
+       - explanation: Context and reason for the suggestion
+    4. feedback: General feedback on lexical resource
+    """)
+])
+
+def get_lexical_profile(state: AgentState) -> Dict[str, Any]:
     """
-    Analyzes lexical resource (vocabulary).
+    Returns the lexical profile computed at transcription, or profiles the
+    transcript now (e.g. a transcript cached before profiles existed).
+    """
+    return state.get("lexical_profile") or profile_lexis(state.get("transcript", ""))
+
+@node_deadline("vocabulary", ["vocabulary_analysis"])
+@memoize_analysis("vocabulary", analysis_version(PROMPT, VocabularyFeedback), transcript_key)
+async def analyze_vocabulary(state: AgentState) -> AgentState:
+    """
+    Analyzes lexical resource (vocabulary) from the local lexical profile and
+    the flagged excerpts rather than the full transcript.
     """
     agent_name = "Vocabulary Analyzer"
     
@@ -21,29 +61,14 @@ def analyze_vocabulary(state: AgentState) -> AgentState:
             log_step(logger, agent_name, "SKIPPED")
             return {"vocabulary_analysis": None}
         
-        llm = get_llm()
-        structured_llm = llm.with_structured_output(VocabularyFeedback)
-        
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert IELTS Speaking examiner specializing in Lexical Resource."),
-            ("user", """
-            Analyze the following transcript for Vocabulary usage.
-            
-            Transcript: {transcript}
-            
-            Provide a structured assessment including:
-            1. score (0-9): Vocabulary score based on IELTS criteria
-            2. evaluation: List of evaluation details with criteria (e.g., 'Strengths', 'Weaknesses', 'Improvements') and detailed descriptions
-            3. errors: List of vocabulary improvements with:
-               - original: The word or phrase used
-               - suggested: A better synonym, idiom, or more advanced vocabulary
-               - explanation: Context and reason for the suggestion
-            4. feedback: General feedback on lexical resource
-            """)
-        ])
+        structured_llm = get_structured_llm(VocabularyFeedback, routed_model("vocabulary", transcript))
         
-        chain = prompt | structured_llm
-        response = chain.invoke({"transcript": transcript})
+        chain = PROMPT | structured_llm
+        profile = get_lexical_profile(state)
+        response = await invoke_llm(chain, {
+            "profile": format_lexical_profile(profile),
+            "excerpts": format_excerpts(profile),
+        }, hedge="vocabulary")
         
         result = {"vocabulary_analysis": response.model_dump()}
         
@@ -1,18 +1,69 @@
 import os
-import shutil
-import uuid
+import re
+import json
+import asyncio
+from datetime import datetime, timezone
 import time
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from src.workflows.wf_speaking_feedback import create_graph
-from src.schemas.schema import IELTSFeedback
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import Any, Dict, List, Optional, Tuple
+from src.workflows.wf_speaking_feedback import get_graph, invoke_graph
+from src.workflows.jobs import get_job_runner, QueueFullError
+from src.workflows.streaming import stream_node_events
+from src.workflows.batch import run_batch, BatchItem
+from src.workflows.session import run_session, SessionPart
+from src.workflows.live import LiveSession
+from src.workflows.history import get_assessment_recorder, get_assessment_store
+from src.schemas.schema import IELTSFeedback, JobResponse, SessionFeedback, AssessmentDetail, AssessmentPage
+from src.agents.transcriber import lookup_transcript, get_transcript_cache
+from src.utils.cache import get_analysis_cache_stats
+from src.utils.limits import assessment_priority, get_governor_stats
+from src.utils.hedging import get_hedge_stats
+from src.utils.metrics import render_metrics
+from src.utils.assessment_store import AssessmentFilter, SCORE_COLUMNS, TREND_INTERVALS
+from src.utils.checkpoints import open_checkpointer, close_checkpointer, get_run_values, new_run_id, start_checkpoint_sweeper
+from src.utils.config import (
+    close_clients,
+    FEEDBACK_MODES,
+    ANALYSIS_MODES,
+    BATCH_MAX_FILES,
+    BATCH_SPOOL_MAX_BYTES,
+    LIVE_MAX_SECONDS,
+    LIVE_SAMPLE_RATES,
+    ASSESSMENT_PAGE_MAX,
+)
+from src.api.ingest import receive_upload, ReceivedForm, ReceivedUpload
+from src.api.middleware import RequestContextMiddleware
 from src.utils.logger import setup_logger, log_step
 import uvicorn
 
 logger = setup_logger(__name__)
 
-app = FastAPI(title="IELTS Speaking Feedback API")
+JOB_RETRY_AFTER_SECONDS = 5
+# Candidate ids are stored and filtered on, so they are kept short and plain
+VALID_CANDIDATE_ID = re.compile(r"^[A-Za-z0-9._@:-]{1,128}$")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The checkpoint saver must be open before the workflow is compiled
+    await open_checkpointer()
+    start_checkpoint_sweeper()
+    # Compile the workflow once per process instead of once per request
+    get_graph()
+    runner = get_job_runner()
+    await runner.start()
+    recorder = get_assessment_recorder()
+    await recorder.start()
+    yield
+    await runner.stop()
+    # After the job runner, so jobs finishing during shutdown are still recorded
+    await recorder.stop()
+    await close_checkpointer()
+    await close_clients()
+
+app = FastAPI(title="IELTS Speaking Feedback API", lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -21,61 +72,137 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "X-Run-ID"],
 )
 
-@app.post("/process/speaking", response_model=IELTSFeedback)
-async def process_speaking(
-    file: UploadFile = File(...),
-    questions: Optional[List[str]] = Form(None)
-):
+# Request id for logs and the X-Request-ID header, plus HTTP metrics
+app.add_middleware(RequestContextMiddleware)
+
+# Documents the multipart body that process_speaking parses itself
+SPEAKING_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        "questions": {"type": "array", "items": {"type": "string"}},
+                        "feedback_mode": {"type": "string", "enum": list(FEEDBACK_MODES)},
+                        "analysis_mode": {"type": "string", "enum": list(ANALYSIS_MODES)},
+                        "candidate_id": {"type": "string", "description": "Stored with the result in the assessment history."},
+                    },
+                }
+            }
+        },
+    }
+}
+
+def read_candidate_id(value: Optional[str]) -> Optional[str]:
+    if value is not None and not VALID_CANDIDATE_ID.match(value):
+        raise HTTPException(status_code=400, detail="Invalid candidate_id. Expected 1-128 letters, digits or ._@:- characters.")
+    return value
+
+def read_modes(form: ReceivedForm) -> Tuple[Optional[str], Optional[str]]:
     """
-    Process an audio file and return IELTS speaking feedback.
+    Validates the feedback_mode and analysis_mode form options.
     """
+    feedback_mode = form.get("feedback_mode")
+    analysis_mode = form.get("analysis_mode")
+    
+    if feedback_mode is not None and feedback_mode not in FEEDBACK_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid feedback_mode. Expected one of: {', '.join(FEEDBACK_MODES)}.")
+    
+    if analysis_mode is not None and analysis_mode not in ANALYSIS_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid analysis_mode. Expected one of: {', '.join(ANALYSIS_MODES)}.")
+    
+    return feedback_mode, analysis_mode
 
+def build_upload_state(
+    upload: ReceivedUpload,
+    questions: List[str],
+    feedback_mode: Optional[str],
+    analysis_mode: Optional[str] = None,
+    candidate_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Builds the workflow's initial state for one uploaded recording.
+    """
+    initial_state = {
+        **upload.to_state(),
+        "questions": questions,
+        "feedback_mode": feedback_mode,
+        "analysis_mode": analysis_mode,
+        "candidate_id": candidate_id,
+    }
+    
+    # Reuse the transcript of an identical earlier upload and skip Whisper
+    cached_transcript = lookup_transcript(upload.sha256)
+    if cached_transcript:
+        logger.info(f"Transcript cache hit: {upload.sha256[:12]}")
+        initial_state.update(cached_transcript)
+        # Not needed any more; kept out of the run's checkpoints
+        initial_state["audio_bytes"] = None
+    
+    return initial_state
 
-    request_id = str(uuid.uuid4())[:8]
+def build_initial_state(form: ReceivedForm) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Validates the form options and builds the workflow's initial state.
+    
+    Returns:
+        The initial state and the requested analysis mode (graph variant)
+    """
+    feedback_mode, analysis_mode = read_modes(form)
+    candidate_id = read_candidate_id(form.get("candidate_id"))
+    initial_state = build_upload_state(form.files[0], form.get_list("questions"), feedback_mode, analysis_mode, candidate_id)
+    return initial_state, analysis_mode
+
+@app.post("/process/speaking", response_model=IELTSFeedback, openapi_extra=SPEAKING_FORM_SCHEMA)
+async def process_speaking(request: Request):
+    """
+    Process an audio file and return IELTS speaking feedback.
+    
+    The multipart body is streamed: oversized or non-audio uploads are rejected
+    before the rest of the body is read, and small files never touch the disk.
+    
+    If the workflow fails, the 500 response carries an X-Run-ID header: POST
+    /runs/{run_id}/resume continues the run from its last checkpoint.
+    """
+    form = await receive_upload(request)
+    run_id = new_run_id()
+    upload = form.files[0]
+    questions = form.get_list("questions")
     
     logger.info("=" * 80)
-    logger.info(f"[REQUEST {request_id}] Processing audio: {file.filename}")
-    logger.info(f"[REQUEST {request_id}] Content-Type: {file.content_type}")
+    logger.info(f"Processing audio: {upload.filename}")
+    logger.info(f"Content-Type: {upload.content_type}")
+    logger.info(f"Size: {upload.size} bytes ({'disk' if upload.path else 'memory'})")
     logger.info("=" * 80)
     
     logger.info(f"Questions: {questions}")
-    # Validate file type
-    if not file.filename.lower().endswith(('.mp3', '.wav', '.m4a', '.ogg')):
-        logger.error(f"[REQUEST {request_id}] Invalid file format: {file.filename}")
-        raise HTTPException(status_code=400, detail="Invalid file format. Please upload an audio file.")
-    
-    # Save uploaded file temporarily
-    temp_filename = f"temp_{uuid.uuid4()}_{file.filename}"
-    temp_path = os.path.join("/tmp", temp_filename)
     
     try:
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Initialize graph
-        graph = create_graph()
+        initial_state, analysis_mode = build_initial_state(form)
+        graph = get_graph(analysis_mode)
         
         # Run workflow
-        log_step(logger, f"[REQUEST {request_id}] Workflow Execution", "STARTED")
-        
-        initial_state = {
-            "audio_path": temp_path,
-            "questions": questions or []
-        }
+        log_step(logger, "Workflow Execution", "STARTED")
         
-        result = graph.invoke(initial_state)
+        with assessment_priority():
+            result = await invoke_graph(graph, initial_state, run_id)
         
-        log_step(logger, f"[REQUEST {request_id}] Workflow Execution", "COMPLETED")
+        log_step(logger, "Workflow Execution", "COMPLETED")
         
         final_feedback = result.get("final_feedback")
         
         if not final_feedback:
-            logger.error(f"[REQUEST {request_id}] No feedback generated")
+            logger.error("No feedback generated")
             raise HTTPException(status_code=500, detail="Failed to generate feedback.")
         
-        logger.info(f"[REQUEST {request_id}] ✓ Request completed successfully")
+        logger.info("✓ Request completed successfully")
         logger.info("=" * 80)
         
         return final_feedback
@@ -83,21 +210,591 @@ async def process_speaking(
     except HTTPException:
         raise
     except Exception as e:
-        log_step(logger, f"[REQUEST {request_id}] Workflow Execution", "FAILED")
-        logger.error(f"[REQUEST {request_id}] Error: {str(e)}")
+        log_step(logger, "Workflow Execution", "FAILED")
+        logger.error(f"Error: {str(e)} (run {run_id})")
         logger.info("=" * 80)
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e), headers={"X-Run-ID": run_id})
         
     finally:
         # Cleanup
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        await form.cleanup()
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/process/speaking/stream", openapi_extra=SPEAKING_FORM_SCHEMA)
+async def process_speaking_stream(request: Request):
+    """
+    Process an audio file and stream partial results as Server-Sent Events.
+    
+    Emits one event per finished graph node, named after the node: "transcribe"
+    (transcript and duration), "analyze_*" (the finished sections),
+    "generate_feedback" (the full report), then "done". Failures are reported
+    as an "error" event, since the response status has already been sent; it
+    carries the run_id to resume with POST /runs/{run_id}/resume.
+    """
+    
+    form = await receive_upload(request)
+    try:
+        initial_state, analysis_mode = build_initial_state(form)
+        graph = get_graph(analysis_mode)
+    except Exception:
+        await form.cleanup()
+        raise
+    
+    logger.info(f"Streaming assessment of {form.files[0].filename}")
+    
+    async def events():
+        step_name = "Workflow Execution"
+        run_id = new_run_id()
+        try:
+            log_step(logger, step_name, "STARTED")
+            async for node, payload in stream_node_events(graph, initial_state, run_id):
+                yield format_sse(node, payload)
+            yield format_sse("done", {})
+            log_step(logger, step_name, "COMPLETED")
+        except Exception as e:
+            log_step(logger, step_name, "FAILED")
+            logger.error(f"Error: {str(e)}")
+            yield format_sse("error", {"detail": str(e), "run_id": run_id})
+        finally:
+            await form.cleanup()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def start_live_session(message: Dict[str, Any]) -> LiveSession:
+    """
+    Validates the start message of a live session and opens the session.
+    """
+    if not isinstance(message, dict) or message.get("type") != "start":
+        raise ValueError('The first message must be {"type": "start", ...}.')
+    
+    sample_rate = message.get("sample_rate", 16000)
+    if sample_rate not in LIVE_SAMPLE_RATES:
+        raise ValueError(f"Invalid sample_rate. Expected one of: {', '.join(map(str, LIVE_SAMPLE_RATES))}.")
+    
+    questions = message.get("questions") or []
+    if not isinstance(questions, list) or not all(isinstance(question, str) for question in questions):
+        raise ValueError("questions must be a list of strings.")
+    
+    feedback_mode = message.get("feedback_mode")
+    if feedback_mode is not None and feedback_mode not in FEEDBACK_MODES:
+        raise ValueError(f"Invalid feedback_mode. Expected one of: {', '.join(FEEDBACK_MODES)}.")
+    
+    analysis_mode = message.get("analysis_mode")
+    if analysis_mode is not None and analysis_mode not in ANALYSIS_MODES:
+        raise ValueError(f"Invalid analysis_mode. Expected one of: {', '.join(ANALYSIS_MODES)}.")
+    
+    candidate_id = message.get("candidate_id")
+    if candidate_id is not None and not (isinstance(candidate_id, str) and VALID_CANDIDATE_ID.match(candidate_id)):
+        raise ValueError("Invalid candidate_id. Expected 1-128 letters, digits or ._@:- characters.")
+    
+    return LiveSession(sample_rate, questions, feedback_mode, analysis_mode, candidate_id)
+
+async def send_live(websocket: WebSocket, event: str, data: Dict[str, Any]):
+    await websocket.send_json({"event": event, "data": data})
+
+@app.websocket("/process/speaking/live")
+async def process_speaking_live(websocket: WebSocket):
+    """
+    Live assessment over a WebSocket, while the candidate speaks.
+    
+    The client sends {"type": "start", "sample_rate", "questions",
+    "feedback_mode", "analysis_mode", "candidate_id"}, then binary frames of 16-bit
+    little-endian mono PCM, then {"type": "stop"}. Each utterance is
+    transcribed as soon as the candidate pauses, and reported as an
+    "utterance" event with the running WPM and pause measures. After stop,
+    only the last utterance is transcribed before the analyses run over the
+    accumulated transcript; the events that follow are the ones of
+    /process/speaking/stream ("transcribe", "analyze_*", "generate_feedback",
+    "done"). Messages are {"event": ..., "data": {...}}.
+    """
+    await websocket.accept()
+    step_name = "Live Workflow Execution"
+    run_id = None
+    session = None
+    sender = None
+    try:
+        try:
+            session = start_live_session(await websocket.receive_json())
+        except (ValueError, KeyError, TypeError) as e:
+            await send_live(websocket, "error", {"detail": str(e)})
+            await websocket.close(code=1008)
+            return
+        
+        log_step(logger, step_name, "STARTED")
+        
+        async def forward_events():
+            while True:
+                event = await session.events.get()
+                if event is None:
+                    return
+                await send_live(websocket, *event)
+        
+        sender = asyncio.create_task(forward_events())
+        await session.events.put(("ready", {"sample_rate": session.segmenter.sample_rate, "max_seconds": LIVE_MAX_SECONDS}))
+        
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                session.feed(message["bytes"])
+                if session.duration >= LIVE_MAX_SECONDS:
+                    await session.events.put(("limit", {"max_seconds": LIVE_MAX_SECONDS}))
+                    break
+            elif message.get("text") and json.loads(message["text"]).get("type") == "stop":
+                break
+        
+        initial_state = await session.finish()
+        await session.events.put(None)
+        await sender
+        await send_live(websocket, "transcribe", {
+            "transcript": initial_state["transcript"],
+            "duration": initial_state["duration"],
+            "fluency_features": initial_state["fluency_features"],
+        })
+        
+        run_id = new_run_id()
+        graph = get_graph(initial_state["analysis_mode"])
+        async for node, payload in stream_node_events(graph, initial_state, run_id):
+            # The transcript was sent above, with the stream's own measures
+            if node != "transcribe":
+                await send_live(websocket, node, payload)
+        await send_live(websocket, "done", {})
+        await websocket.close()
+        log_step(logger, step_name, "COMPLETED")
+    except WebSocketDisconnect:
+        logger.info("Live session closed by the client")
+    except Exception as e:
+        log_step(logger, step_name, "FAILED")
+        logger.error(f"Error: {str(e)}")
+        try:
+            await send_live(websocket, "error", {"detail": str(e), "run_id": run_id})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        if sender is not None and not sender.done():
+            sender.cancel()
+        if session is not None:
+            await session.close()
+
+@app.post("/jobs", response_model=JobResponse, status_code=202, openapi_extra=SPEAKING_FORM_SCHEMA)
+async def submit_job(request: Request):
+    """
+    Queue an audio file for assessment and return a job id immediately.
+    
+    Poll GET /jobs/{job_id} for the result. Returns 429 when the queue is full.
+    """
+    runner = get_job_runner()
+    
+    # Shed load before reading the upload
+    if runner.queue_depth >= runner.max_queue_depth:
+        raise HTTPException(status_code=429, detail="Job queue is full, retry later.", headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)})
+    
+    form = await receive_upload(request)
+    try:
+        initial_state, analysis_mode = build_initial_state(form)
+        job = await runner.submit(initial_state, analysis_mode, cleanup=form.cleanup)
+    except QueueFullError as e:
+        await form.cleanup()
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)})
+    except Exception:
+        await form.cleanup()
+        raise
+    
+    logger.info(f"Queued job {job['job_id']} ({form.files[0].filename})")
+    return job
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Return the status of a job, and its feedback once completed.
+    """
+    job = await get_job_runner().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+async def load_resumable_run(run_id: str) -> Dict[str, Any]:
+    """
+    Returns the checkpointed state of a run that can be resumed: 404 if the
+    run has no checkpoint, 409 if it still needs the recording (not yet
+    transcribed) and the spilled upload has already been deleted.
+    """
+    values = await get_run_values(run_id)
+    if values is None:
+        raise HTTPException(status_code=404, detail="Run not found or no longer resumable.")
+    audio_path = values.get("audio_path")
+    if not values.get("transcript") and audio_path and not os.path.exists(audio_path):
+        raise HTTPException(status_code=409, detail="The recording of this run is no longer available, upload it again.")
+    return values
+
+@app.post("/jobs/{job_id}/retry", response_model=JobResponse, status_code=202)
+async def retry_job(job_id: str):
+    """
+    Re-queue a failed job. It resumes from its last checkpoint, so only the
+    steps that had not finished are run again.
+    """
+    runner = get_job_runner()
+    job = await runner.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if job["status"] != "failed":
+        raise HTTPException(status_code=409, detail=f"Only failed jobs can be retried (job is {job['status']}).")
+    values = await load_resumable_run(job_id)
+    try:
+        return await runner.retry(job_id, values.get("analysis_mode"))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)})
+
+@app.post("/runs/{run_id}/resume", response_model=IELTSFeedback)
+async def resume_run(run_id: str):
+    """
+    Resume a failed assessment from its last checkpoint.
+    
+    The run id comes from the X-Run-ID header of a failed /process/speaking
+    response, the error event of a stream, or a failed batch line. Finished
+    steps (transcription, completed analyses) are not run again.
+    """
+    values = await load_resumable_run(run_id)
+    if values.get("final_feedback"):
+        return values["final_feedback"]
+    
+    try:
+        graph = get_graph(values.get("analysis_mode"))
+        log_step(logger, f"[RUN {run_id[:8]}] Resume", "STARTED")
+        with assessment_priority():
+            result = await invoke_graph(graph, None, run_id)
+        final_feedback = result.get("final_feedback")
+        if not final_feedback:
+            raise RuntimeError("Failed to generate feedback.")
+        log_step(logger, f"[RUN {run_id[:8]}] Resume", "COMPLETED")
+        return final_feedback
+    except Exception as e:
+        log_step(logger, f"[RUN {run_id[:8]}] Resume", "FAILED")
+        logger.error(f"Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e), headers={"X-Run-ID": run_id})
+
+# Documents the multipart body that process_batch parses itself
+BATCH_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["files"],
+                    "properties": {
+                        "files": {"type": "array", "items": {"type": "string", "format": "binary"}},
+                        "questions": {"type": "string", "description": "JSON array with one list of questions per file, in upload order."},
+                        "feedback_mode": {"type": "string", "enum": list(FEEDBACK_MODES)},
+                        "analysis_mode": {"type": "string", "enum": list(ANALYSIS_MODES)},
+                        "respond": {"type": "string", "enum": ["ndjson", "jobs"]},
+                        "candidate_ids": {"type": "string", "description": "JSON array with one candidate id (or null) per file, in upload order."},
+                    },
+                }
+            }
+        },
+    }
+}
+
+def read_batch_questions(form: ReceivedForm) -> List[List[str]]:
+    """
+    Parses the batch "questions" field: a JSON array holding one list of
+    questions per uploaded file. Missing entries default to no questions.
+    """
+    raw = form.get("questions")
+    if not raw:
+        return [[] for _ in form.files]
+    try:
+        questions = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="questions must be a JSON array of question lists.")
+    if (
+        not isinstance(questions, list)
+        or len(questions) > len(form.files)
+        or not all(isinstance(item, list) and all(isinstance(q, str) for q in item) for item in questions)
+    ):
+        raise HTTPException(status_code=400, detail="questions must be a JSON array with at most one question list per file.")
+    return questions + [[] for _ in range(len(form.files) - len(questions))]
+
+def read_batch_candidate_ids(form: ReceivedForm) -> List[Optional[str]]:
+    """
+    Parses the batch "candidate_ids" field: a JSON array holding one candidate
+    id (or null) per uploaded file. Missing entries default to none.
+    """
+    raw = form.get("candidate_ids")
+    if not raw:
+        return [None for _ in form.files]
+    try:
+        candidate_ids = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="candidate_ids must be a JSON array of candidate ids.")
+    if not isinstance(candidate_ids, list) or len(candidate_ids) > len(form.files):
+        raise HTTPException(status_code=400, detail="candidate_ids must be a JSON array with at most one candidate id per file.")
+    for candidate_id in candidate_ids:
+        if candidate_id is not None:
+            read_candidate_id(candidate_id if isinstance(candidate_id, str) else "")
+    return candidate_ids + [None for _ in range(len(form.files) - len(candidate_ids))]
+
+@app.post("/batch", openapi_extra=BATCH_FORM_SCHEMA)
+async def process_batch(request: Request):
+    """
+    Assess many recordings in one request.
+    
+    With respond=ndjson (default) results are streamed as newline-delimited JSON,
+    one line per file in completion order: {index, filename, status, result | error,
+    seconds, elapsed}. With respond=jobs every file is queued on the job runner
+    and the job records are returned at once (429 if the queue cannot take them all).
+    
+    Whisper and LLM calls share the process-wide concurrency budgets with
+    single-file requests, so a large batch cannot exhaust the API quota.
+    """
+    
+    form = await receive_upload(request, max_files=BATCH_MAX_FILES, spool_max_bytes=BATCH_SPOOL_MAX_BYTES)
+    try:
+        feedback_mode, analysis_mode = read_modes(form)
+        respond = form.get("respond") or "ndjson"
+        if respond not in ("ndjson", "jobs"):
+            raise HTTPException(status_code=400, detail="Invalid respond. Expected one of: ndjson, jobs.")
+        questions = read_batch_questions(form)
+        candidate_ids = read_batch_candidate_ids(form)
+        states = [
+            build_upload_state(upload, questions[index], feedback_mode, analysis_mode, candidate_ids[index])
+            for index, upload in enumerate(form.files)
+        ]
+    except Exception:
+        await form.cleanup()
+        raise
+    
+    logger.info(f"Batch of {len(form.files)} files ({respond})")
+    
+    if respond == "jobs":
+        runner = get_job_runner()
+        if runner.queue_depth + len(form.files) > runner.max_queue_depth:
+            await form.cleanup()
+            raise HTTPException(status_code=429, detail="Job queue cannot take the whole batch, retry later.", headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)})
+        jobs = []
+        submitted = 0
+        try:
+            for upload, state in zip(form.files, states):
+                job = await runner.submit(state, analysis_mode, cleanup=upload.cleanup)
+                submitted += 1
+                jobs.append({"filename": upload.filename, **job})
+        except QueueFullError as e:
+            for upload in form.files[submitted:]:
+                await upload.cleanup()
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)})
+        except Exception:
+            for upload in form.files[submitted:]:
+                await upload.cleanup()
+            raise
+        return JSONResponse(status_code=202, content={"jobs": jobs})
+    
+    items = [
+        BatchItem(index, upload.filename, state, upload.cleanup)
+        for index, (upload, state) in enumerate(zip(form.files, states))
+    ]
+    
+    async def lines():
+        step_name = "Batch Execution"
+        try:
+            log_step(logger, step_name, "STARTED")
+            async for outcome in run_batch(items, analysis_mode):
+                yield json.dumps(outcome) + "\n"
+            log_step(logger, step_name, "COMPLETED")
+        finally:
+            await form.cleanup()
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+# Form field names of the recordings of a test session, by part number
+SESSION_PARTS = {"part1": 1, "part2": 2, "part3": 3}
+
+# Documents the multipart body that process_session parses itself
+SESSION_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        **{
+                            field: {"type": "string", "format": "binary"}
+                            for field in SESSION_PARTS
+                        },
+                        **{
+                            f"{field}_questions": {"type": "array", "items": {"type": "string"}}
+                            for field in SESSION_PARTS
+                        },
+                        "feedback_mode": {"type": "string", "enum": list(FEEDBACK_MODES)},
+                        "analysis_mode": {"type": "string", "enum": list(ANALYSIS_MODES)},
+                    },
+                }
+            }
+        },
+    }
+}
+
+def build_session_parts(form: ReceivedForm) -> List[SessionPart]:
+    """
+    Maps the uploaded recordings to test parts by field name (part1, part2,
+    part3), each with its own partN_questions.
+    """
+    parts = []
+    for upload in form.files:
+        number = SESSION_PARTS.get(upload.field_name)
+        if number is None:
+            raise HTTPException(status_code=400, detail=f"Unexpected file field: {upload.field_name}. Expected one of: {', '.join(SESSION_PARTS)}.")
+        if any(part.part == number for part in parts):
+            raise HTTPException(status_code=400, detail=f"More than one recording for {upload.field_name}.")
+        questions = form.get_list(f"{upload.field_name}_questions")
+        parts.append(SessionPart(number, upload.filename, build_upload_state(upload, questions, None)))
+    return sorted(parts, key=lambda part: part.part)
+
+@app.post("/process/session", response_model=SessionFeedback, openapi_extra=SESSION_FORM_SCHEMA)
+async def process_session(request: Request):
+    """
+    Assess a full speaking test recorded as separate parts.
+    
+    Upload one recording per part as part1, part2 and/or part3, with the
+    questions of each part as repeated partN_questions fields. The parts are
+    transcribed and analyzed concurrently, then a single report scores the
+    whole session and breaks the analyses down per part.
+    """
+    form = await receive_upload(request, max_files=len(SESSION_PARTS))
+    
+    try:
+        feedback_mode, analysis_mode = read_modes(form)
+        parts = build_session_parts(form)
+        
+        logger.info(f"Session with parts {[part.part for part in parts]}")
+        
+        log_step(logger, "Session Execution", "STARTED")
+        final_feedback = await run_session(parts, analysis_mode, feedback_mode)
+        log_step(logger, "Session Execution", "COMPLETED")
+        
+        return final_feedback
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_step(logger, "Session Execution", "FAILED")
+        logger.error(f"Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+        
+    finally:
+        await form.cleanup()
+
+def history_store():
+    store = get_assessment_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Assessment history is disabled (ASSESSMENT_STORE=none).")
+    return store
+
+def to_timestamp(value: Optional[datetime]) -> Optional[float]:
+    """Query datetimes without a time zone are taken as UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+@app.get("/assessments", response_model=AssessmentPage)
+async def list_assessments(
+    candidate_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    band_min: Optional[float] = Query(None, ge=0, le=9),
+    band_max: Optional[float] = Query(None, ge=0, le=9),
+    limit: int = Query(50, ge=1, le=ASSESSMENT_PAGE_MAX),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Assessment history, newest first, filtered by candidate, date (ISO 8601)
+    and overall band. Results are written in the background, so an assessment
+    shows up here about a second after it finished.
+    """
+    filters = AssessmentFilter(candidate_id, to_timestamp(since), to_timestamp(until), band_min, band_max)
+    items, total = await history_store().query(filters, limit, offset)
+    return {"items": items, "total": total, "limit": limit, "offset": offset}
+
+@app.get("/assessments/distribution")
+async def assessment_distribution(
+    candidate_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """
+    Count, mean, min, max and half-band histogram of the overall band and of
+    each criterion, over the matching assessments.
+    """
+    filters = AssessmentFilter(candidate_id, to_timestamp(since), to_timestamp(until))
+    return {"candidate_id": candidate_id, "criteria": await history_store().distribution(filters)}
+
+@app.get("/assessments/{assessment_id}", response_model=AssessmentDetail)
+async def get_assessment(assessment_id: str):
+    """
+    One stored assessment with its transcript, full feedback and node timings.
+    """
+    assessment = await history_store().get(assessment_id)
+    if assessment is None:
+        raise HTTPException(status_code=404, detail="Assessment not found.")
+    return assessment
+
+@app.get("/candidates/{candidate_id}/trend")
+async def candidate_trend(
+    candidate_id: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    interval: Optional[str] = None,
+):
+    """
+    A candidate's scores over time, oldest first: one point per assessment,
+    or averages per day, week or month with interval. "change" is the
+    difference between the last and the first point of each criterion.
+    """
+    if interval is not None and interval not in TREND_INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Invalid interval. Expected one of: {', '.join(TREND_INTERVALS)}.")
+    filters = AssessmentFilter(candidate_id, to_timestamp(since), to_timestamp(until))
+    points = await history_store().trend(filters, interval)
+    change = {}
+    for column in SCORE_COLUMNS.values():
+        scores = [point[column] for point in points if point[column] is not None]
+        change[column] = round(scores[-1] - scores[0], 2) if scores else None
+    return {"candidate_id": candidate_id, "interval": interval, "points": points, "change": change}
 
 @app.get("/")
 async def root():
     """Health check endpoint."""
     return {"status": "healthy", "service": "IELTS Speaking Feedback API"}
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Cache hit rates and upstream bytes saved, for sizing the caches."""
+    return {
+        "transcripts": get_transcript_cache().get_stats(),
+        "analyses": get_analysis_cache_stats(),
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: per-node latency, LLM tokens and cost, Whisper usage, in-flight gauges."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/limits/stats")
+async def limits_stats():
+    """Rate governor state, plus per-node latency percentiles, hedges, timeouts and degraded sections."""
+    return {**get_governor_stats(), "nodes": get_hedge_stats()}
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     logger.info(f"Starting IELTS Speaking Feedback API server on port {port}...")
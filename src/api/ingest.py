@@ -0,0 +1,271 @@
+import os
+import asyncio
+import hashlib
+import uuid
+from typing import Dict, List, Optional
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+from src.utils.config import MAX_UPLOAD_BYTES, UPLOAD_SPOOL_MAX_BYTES, UPLOAD_DIR
+
+ALLOWED_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.ogg')
+
+# Room for multipart boundaries, headers and form fields on top of the audio itself
+FORM_OVERHEAD_BYTES = 1024 * 1024
+MAX_FIELD_BYTES = 64 * 1024
+SNIFF_BYTES = 12
+
+def sniff_audio_format(head: bytes) -> Optional[str]:
+    """
+    Identifies an audio container from its first bytes, or returns None.
+    """
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:3] == b"ID3":
+        return "mp3"
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        # MPEG audio frame sync (also matches ADTS AAC)
+        return "mp3"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[4:8] == b"ftyp":
+        return "m4a"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"\x1aE\xdf\xa3":
+        return "webm"
+    return None
+
+class ReceivedUpload:
+    """
+    An uploaded audio file, hashed while it was received.
+
+    Small files stay in memory (data); once a file grows past the spool
+    threshold it is spilled to a temporary file (path) and streamed there.
+    """
+    def __init__(self, field_name: str, filename: str, content_type: Optional[str], spool_max_bytes: int):
+        self.field_name = field_name
+        self.filename = filename
+        self.content_type = content_type
+        self.format: Optional[str] = None
+        self.size = 0
+        self.path: Optional[str] = None
+        self._spool_max_bytes = spool_max_bytes
+        self._hasher = hashlib.sha256()
+        self._buffer = bytearray()
+        self._file = None
+
+    @property
+    def sha256(self) -> str:
+        return self._hasher.hexdigest()
+
+    @property
+    def data(self) -> Optional[bytes]:
+        return None if self.path else bytes(self._buffer)
+
+    async def write(self, chunk: bytes):
+        self._hasher.update(chunk)
+        self.size += len(chunk)
+        if self._file is None and len(self._buffer) + len(chunk) <= self._spool_max_bytes:
+            self._buffer += chunk
+            return
+        if self._file is None:
+            await self._spill()
+        await asyncio.to_thread(self._file.write, chunk)
+
+    async def _spill(self):
+        self.path = os.path.join(UPLOAD_DIR, f"temp_{uuid.uuid4()}_{os.path.basename(self.filename)}")
+        self._file = await asyncio.to_thread(open, self.path, "wb")
+        await asyncio.to_thread(self._file.write, bytes(self._buffer))
+        self._buffer = bytearray()
+
+    async def finish(self):
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+
+    async def cleanup(self):
+        """
+        Releases the buffer and deletes the spilled file, if any.
+        """
+        await self.finish()
+        self._buffer = bytearray()
+        if self.path:
+            try:
+                await asyncio.to_thread(os.remove, self.path)
+            except FileNotFoundError:
+                pass
+
+    def to_state(self) -> Dict:
+        """
+        The audio source fields of AgentState for this upload.
+        """
+        return {
+            "audio_path": self.path,
+            "audio_bytes": self.data,
+            "audio_filename": os.path.basename(self.filename),
+            "audio_hash": self.sha256,
+            "audio_size": self.size,
+        }
+
+class ReceivedForm:
+    """
+    Parsed multipart form: text fields (repeated names collected into lists) and audio files.
+    """
+    def __init__(self):
+        self.fields: Dict[str, List[str]] = {}
+        self.files: List[ReceivedUpload] = []
+
+    def get(self, name: str) -> Optional[str]:
+        values = self.fields.get(name)
+        return values[-1] if values else None
+
+    def get_list(self, name: str) -> List[str]:
+        return self.fields.get(name, [])
+
+    async def cleanup(self):
+        for upload in self.files:
+            await upload.cleanup()
+
+class _PartState:
+    def __init__(self):
+        self.headers: Dict[str, str] = {}
+        self.header_field = b""
+        self.header_value = b""
+        self.name: Optional[str] = None
+        self.upload: Optional[ReceivedUpload] = None
+        self.is_file = False
+        self.value = bytearray()
+        self.head = bytearray()
+
+async def receive_upload(
+    request: Request,
+    max_file_bytes: int = MAX_UPLOAD_BYTES,
+    spool_max_bytes: int = UPLOAD_SPOOL_MAX_BYTES,
+    max_files: int = 1,
+) -> ReceivedForm:
+    """
+    Streams a multipart/form-data body, validating audio parts as they arrive.
+
+    Rejects oversized bodies from Content-Length before reading them (413),
+    stops reading as soon as a file exceeds max_file_bytes (413), and rejects a
+    file whose extension or leading bytes are not audio, or do not agree on
+    the format (400). File parts are
+    hashed and spooled in the same pass.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload.")
+
+    max_body_bytes = max_files * max_file_bytes + FORM_OVERHEAD_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_body_bytes:
+        raise HTTPException(status_code=413, detail="Upload too large.")
+
+    form = ReceivedForm()
+    part = _PartState()
+    pending: List[tuple] = []
+    errors: List[HTTPException] = []
+
+    def on_part_begin():
+        nonlocal part
+        part = _PartState()
+
+    def on_header_field(data, start, end):
+        part.header_field += data[start:end]
+
+    def on_header_value(data, start, end):
+        part.header_value += data[start:end]
+
+    def on_header_end():
+        part.headers[part.header_field.decode("latin-1").lower()] = part.header_value.decode("latin-1")
+        part.header_field = b""
+        part.header_value = b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(part.headers.get("content-disposition", ""))
+        part.name = disposition.get(b"name", b"").decode("utf-8")
+        filename = disposition.get(b"filename")
+        if filename is None:
+            return
+        filename = filename.decode("utf-8")
+        part.is_file = True
+        if len(form.files) >= max_files:
+            errors.append(HTTPException(status_code=400, detail=f"Too many files (max {max_files})."))
+        elif not filename.lower().endswith(ALLOWED_EXTENSIONS):
+            errors.append(HTTPException(status_code=400, detail="Invalid file format. Please upload an audio file."))
+        else:
+            part.upload = ReceivedUpload(part.name, filename, part.headers.get("content-type"), spool_max_bytes)
+            form.files.append(part.upload)
+
+    def on_part_data(data, start, end):
+        chunk = data[start:end]
+        if part.is_file and part.upload is None:
+            # Rejected file; the error is raised after this parser write
+            return
+        if part.upload is None:
+            part.value += chunk
+            if len(part.value) > MAX_FIELD_BYTES:
+                errors.append(HTTPException(status_code=413, detail=f"Form field too large: {part.name}"))
+            return
+        if part.upload.format is None:
+            part.head += chunk[:SNIFF_BYTES - len(part.head)]
+            if len(part.head) >= SNIFF_BYTES:
+                _sniff(part)
+        pending.append((part.upload, chunk))
+
+    def on_part_end():
+        if not part.is_file:
+            form.fields.setdefault(part.name, []).append(part.value.decode("utf-8", errors="replace"))
+        elif part.upload is not None and part.upload.format is None:
+            _sniff(part)
+
+    def _sniff(part: _PartState):
+        part.upload.format = sniff_audio_format(bytes(part.head))
+        if part.upload.format is None:
+            errors.append(HTTPException(status_code=400, detail="Uploaded file is not a recognized audio format."))
+            part.upload.format = "unknown"
+        elif not part.upload.filename.lower().endswith(f".{part.upload.format}"):
+            # Decoders pick the format from the extension, so it must match the content
+            errors.append(HTTPException(
+                status_code=400,
+                detail=f"File content is {part.upload.format}, which does not match the file extension.",
+            ))
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    try:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_body_bytes:
+                raise HTTPException(status_code=413, detail="Upload too large.")
+            parser.write(chunk)
+            if errors:
+                raise errors[0]
+            # Flush file data outside the parser callbacks so disk writes can be awaited
+            for upload, data in pending:
+                if upload.size + len(data) > max_file_bytes:
+                    raise HTTPException(status_code=413, detail="Upload too large.")
+                await upload.write(data)
+            pending.clear()
+        parser.finalize()
+        for upload in form.files:
+            await upload.finish()
+    except Exception:
+        await form.cleanup()
+        raise
+
+    if not form.files:
+        await form.cleanup()
+        raise HTTPException(status_code=400, detail="No audio file uploaded.")
+
+    return form
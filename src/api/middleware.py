@@ -0,0 +1,62 @@
+import re
+import time
+import uuid
+from src.utils.logger import set_request_id, reset_request_id
+from src.utils.metrics import HTTP_DURATION, HTTP_IN_FLIGHT
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Client-supplied ids are accepted only if they are short and log-safe
+VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+def _request_id(scope) -> str:
+    request_id = dict(scope["headers"]).get(REQUEST_ID_HEADER, b"").decode("latin-1")
+    if not VALID_REQUEST_ID.match(request_id):
+        request_id = uuid.uuid4().hex[:8]
+    return request_id
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware that assigns each HTTP request an id (X-Request-ID, or a new
+    one), makes it available to every log line of the request, echoes it in the
+    response, and records request duration and in-flight metrics. WebSocket
+    sessions get an id for their log lines too, but are not timed.
+
+    Implemented as plain ASGI rather than BaseHTTPMiddleware so the id's context
+    reaches the endpoint and streamed response bodies, and so streaming
+    responses are timed until their last chunk.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "websocket":
+            token = set_request_id(_request_id(scope))
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                reset_request_id(token)
+            return
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id(scope)
+        token = set_request_id(request_id)
+        status = 500
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+        async def send_with_request_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER, request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_DURATION.labels(scope["method"], route, str(status)).observe(time.perf_counter() - started)
+            reset_request_id(token)
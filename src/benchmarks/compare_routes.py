@@ -0,0 +1,92 @@
+"""
+Model routing comparison: replays a transcript corpus with a baseline model
+and with each candidate routing, reporting latency, tokens, cost and score
+drift against the baseline.
+
+    python -m src.benchmarks.compare_routes                      # fake backend
+    python -m src.benchmarks.compare_routes --backend live --baseline-runs 2 --json routes.json
+    python -m src.benchmarks.compare_routes --routing "mini-text:pronunciation=gpt-4o-mini,fluency=gpt-4o-mini"
+
+--backend live uses the configured endpoint (OpenAI, or LLM_BASE_URL for an
+OpenAI-compatible server) and costs real tokens.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+
+DEFAULT_ROUTINGS = (
+    "mini-text-nodes:pronunciation=gpt-4o-mini,fluency=gpt-4o-mini",
+    "mini-analyses:fluency=gpt-4o-mini,pronunciation=gpt-4o-mini,grammar=gpt-4o-mini,vocabulary=gpt-4o-mini",
+    "mini-report:feedback=gpt-4o-mini,suggestions=gpt-4o-mini",
+    "all-mini:default=gpt-4o-mini",
+    "short-fallback:fallback=gpt-4o-mini,fallback_max_words=80",
+)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare per-node model routings on a transcript corpus.")
+    parser.add_argument("--backend", choices=["fake", "live"], default="fake", help="Fake chat backend, or the configured endpoint")
+    parser.add_argument("--corpus", help="JSONL corpus (id, transcript, duration, questions); defaults to the bundled one")
+    parser.add_argument("--baseline-model", default="gpt-4o")
+    parser.add_argument("--routing", action="append", help="NAME:node=model,... (repeatable); defaults to a built-in set")
+    parser.add_argument("--baseline-runs", type=int, default=1, help="Replay the baseline more than once to measure its own drift")
+    parser.add_argument("--max-drift", type=float, default=0.5, help="Acceptable mean absolute drift per criterion (bands)")
+    parser.add_argument("--analysis-mode", choices=["per_criterion", "combined"], default="per_criterion")
+    parser.add_argument("--feedback-mode", choices=["llm", "assembled", "fast"], default="llm")
+    parser.add_argument("--concurrency", type=int, default=4, help="Transcripts in flight")
+    parser.add_argument("--chat-latency", type=float, default=2.0, help="Fake backend: mean response time of the baseline model")
+    parser.add_argument("--fast-model", default="gpt-4o-mini", help="Fake backend: model that answers faster")
+    parser.add_argument("--fast-latency", type=float, default=0.8, help="Fake backend: mean response time of --fast-model")
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="Keep the application's INFO logs")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    # Configuration is read from the environment at import time
+    os.environ["CACHE_DB_PATH"] = ""
+    if args.backend == "fake":
+        os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    import httpx
+    from src.benchmarks.fake_openai import BackendProfile, FakeOpenAI
+    from src.benchmarks.routing import CORPUS_PATH, compare_routings, format_comparison, load_corpus, parse_routing
+    from src.utils.config import close_clients, set_http_client
+    from src.utils.routing import ModelRoutes
+
+    corpus = load_corpus(args.corpus or CORPUS_PATH)
+    routings = [parse_routing(spec, args.baseline_model) for spec in (args.routing or DEFAULT_ROUTINGS)]
+
+    async def run():
+        if args.backend == "fake":
+            backend = FakeOpenAI(
+                chat=BackendProfile(latency=args.chat_latency, jitter=args.chat_latency / 5),
+                models={args.fast_model: BackendProfile(latency=args.fast_latency, jitter=args.fast_latency / 5)},
+            )
+            await set_http_client(httpx.AsyncClient(transport=backend.transport()))
+        try:
+            return await compare_routings(
+                corpus,
+                routings,
+                ModelRoutes(default=args.baseline_model),
+                baseline_runs=args.baseline_runs,
+                max_drift=args.max_drift,
+                analysis_mode=args.analysis_mode,
+                feedback_mode=args.feedback_mode,
+                concurrency=args.concurrency,
+            )
+        finally:
+            await close_clients()
+
+    report = asyncio.run(run())
+    print(format_comparison(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import io
+import json
+import random
+import time
+import wave
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+WORDS = (
+    "I think that my hometown is quite a lovely place to live because there are many parks "
+    "and the people are friendly although the traffic can be terrible during rush hour so "
+    "I usually take the bus or ride my bicycle to work and in my free time I enjoy reading "
+    "books about history and travelling with my family to the countryside where we relax um uh"
+).split()
+
+class BackendProfile(NamedTuple):
+    """
+    Latency and failure behaviour of one fake endpoint.
+    """
+    latency: float = 1.0            # mean response time (seconds)
+    jitter: float = 0.2             # standard deviation of the response time
+    error_rate: float = 0.0         # fraction of 500 responses
+    rate_limit_rate: float = 0.0    # fraction of 429 responses (with Retry-After)
+    tail_rate: float = 0.0          # fraction of straggler responses
+    tail_multiplier: float = 5.0    # how much slower a straggler is
+    retry_after: float = 1.0        # Retry-After sent with 429s (seconds)
+
+def sample_from_schema(schema: Dict[str, Any], defs: Dict[str, Any], rng: random.Random, name: str = "") -> Any:
+    """
+    Builds a plausible instance of a JSON schema (pydantic-generated), e.g. the
+    FluencyFeedback / GrammarFeedback / LLMFeedback structured outputs.
+    """
+    if "$ref" in schema:
+        return sample_from_schema(defs[schema["$ref"].split("/")[-1]], defs, rng, name)
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return sample_from_schema(options[0], defs, rng, name) if options else None
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            key: sample_from_schema(value, defs, rng, key)
+            for key, value in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [sample_from_schema(schema.get("items", {}), defs, rng, name) for _ in range(rng.randint(1, 3))]
+    if kind == "number":
+        if "score" in name:
+            return rng.choice([5.0, 5.5, 6.0, 6.5, 7.0, 7.5, 8.0])
+        return round(rng.uniform(90, 160), 2)
+    if kind == "integer":
+        return rng.randint(0, 10)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12))).capitalize() + "."
+
+def audio_duration(data: bytes) -> float:
+    """
+    Duration of a WAV file, or a rough estimate (16 kB/s) for other formats.
+    """
+    if data[:4] == b"RIFF":
+        try:
+            with wave.open(io.BytesIO(data)) as wav:
+                return wav.getnframes() / wav.getframerate()
+        except wave.Error:
+            pass
+    return len(data) / 16000
+
+class FakeOpenAI:
+    """
+    Local stand-in for the OpenAI chat-completions and Whisper endpoints.
+
+    Serves /v1/chat/completions (structured output for whatever schema the
+    request carries, via response_format or tools) and /v1/audio/transcriptions
+    (verbose_json). Responses are deterministic for a given seed and request.
+    Use transport() to route the app's shared HTTP client to it in-process, or
+    serve .app with uvicorn and point OPENAI_BASE_URL (or LLM_BASE_URL) at it.
+    models gives chat models their own latency profile, matched by name prefix
+    (e.g. a faster "gpt-4o-mini"); responses name the model that was requested.
+    """
+    def __init__(
+        self,
+        chat: BackendProfile = BackendProfile(latency=2.0, jitter=0.5),
+        whisper: BackendProfile = BackendProfile(latency=1.5, jitter=0.3),
+        seed: int = 0,
+        words_per_minute: float = 130,
+        model: str = "gpt-4o-2024-08-06",
+        models: Optional[Dict[str, BackendProfile]] = None,
+    ):
+        self.chat = chat
+        self.whisper = whisper
+        self.seed = seed
+        self.words_per_minute = words_per_minute
+        self.model = model
+        self.models = models or {}
+        self.counts: Counter = Counter()
+        self._attempts: Counter = Counter()
+        self.app = self._build_app()
+
+    def transport(self) -> httpx.AsyncBaseTransport:
+        return httpx.ASGITransport(app=self.app)
+
+    def _rng(self, endpoint: str, payload: bytes) -> random.Random:
+        # Seeded per request content and attempt, so retries draw a fresh outcome
+        key = hashlib.sha256(payload).hexdigest()
+        self._attempts[key] += 1
+        return random.Random(f"{self.seed}:{endpoint}:{key}:{self._attempts[key]}")
+
+    async def _simulate(self, endpoint: str, profile: BackendProfile, rng: random.Random) -> Optional[JSONResponse]:
+        """
+        Sleeps for the simulated response time; returns an error response if this request fails.
+        """
+        self.counts[f"{endpoint}_requests"] += 1
+        latency = max(0.0, rng.gauss(profile.latency, profile.jitter))
+        if rng.random() < profile.tail_rate:
+            latency *= profile.tail_multiplier
+        roll = rng.random()
+        if roll < profile.rate_limit_rate:
+            await asyncio.sleep(min(latency, 0.05))
+            self.counts[f"{endpoint}_429"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": f"{profile.retry_after:g}"},
+                content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+            )
+        await asyncio.sleep(latency)
+        if roll < profile.rate_limit_rate + profile.error_rate:
+            self.counts[f"{endpoint}_500"] += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "Internal error", "type": "server_error"}})
+        return None
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake OpenAI")
+
+        @app.post("/v1/chat/completions")
+        async def chat_completions(request: Request):
+            raw = await request.body()
+            body = json.loads(raw)
+            rng = self._rng("chat", raw)
+            error = await self._simulate("chat", self._chat_profile(body.get("model") or self.model), rng)
+            if error is not None:
+                return error
+            return self._chat_response(body, rng)
+
+        @app.post("/v1/audio/transcriptions")
+        async def transcriptions(request: Request):
+            form = await request.form()
+            data = await form["file"].read()
+            rng = self._rng("whisper", data)
+            error = await self._simulate("whisper", self.whisper, rng)
+            if error is not None:
+                return error
+            return self._transcription_response(data, "word" in form.getlist("timestamp_granularities[]"))
+
+        return app
+
+    def _chat_profile(self, model: str) -> BackendProfile:
+        for prefix in sorted(self.models, key=len, reverse=True):
+            if model.startswith(prefix):
+                return self.models[prefix]
+        return self.chat
+
+    def _chat_response(self, body: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+        message: Dict[str, Any] = {"role": "assistant", "content": None}
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format["json_schema"]["schema"]
+            message["content"] = json.dumps(sample_from_schema(schema, schema.get("$defs", {}), rng))
+            completion = message["content"]
+        else:
+            function = body["tools"][0]["function"]
+            schema = function["parameters"]
+            arguments = json.dumps(sample_from_schema(schema, schema.get("$defs", {}), rng))
+            message["tool_calls"] = [{"id": f"call_{rng.getrandbits(32):08x}", "type": "function", "function": {"name": function["name"], "arguments": arguments}}]
+            completion = arguments
+
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        completion_tokens = len(completion) // 4
+        return {
+            "id": f"chatcmpl-{rng.getrandbits(64):016x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or self.model,
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def _transcription_response(self, data: bytes, with_words: bool = False) -> Dict[str, Any]:
+        duration = audio_duration(data)
+        # Same audio, same transcript: keeps transcript/analysis cache behaviour realistic
+        rng = random.Random(hashlib.sha256(data).hexdigest())
+        word_count = max(1, int(duration / 60 * self.words_per_minute))
+        words = [rng.choice(WORDS) for _ in range(word_count)]
+
+        segments: List[Dict[str, Any]] = []
+        per_segment = max(1, int(10 / 60 * self.words_per_minute))
+        seconds_per_word = duration / word_count
+        for index, start in enumerate(range(0, word_count, per_segment)):
+            chunk = words[start:start + per_segment]
+            segments.append({
+                "id": index,
+                "seek": 0,
+                "start": round(start * seconds_per_word, 3),
+                "end": round((start + len(chunk)) * seconds_per_word, 3),
+                "text": " " + " ".join(chunk),
+                "tokens": [],
+                "temperature": 0.0,
+                "avg_logprob": -0.2,
+                "compression_ratio": 1.4,
+                "no_speech_prob": 0.01,
+            })
+        response = {
+            "task": "transcribe",
+            "language": "english",
+            "duration": round(duration, 3),
+            "text": " ".join(words),
+            "segments": segments,
+        }
+        if with_words:
+            # Words take part of their slot, leaving gaps that read as short pauses
+            response["words"] = [
+                {
+                    "word": word,
+                    "start": round(index * seconds_per_word, 3),
+                    "end": round((index + rng.uniform(0.3, 0.95)) * seconds_per_word, 3),
+                }
+                for index, word in enumerate(words)
+            ]
+        return response
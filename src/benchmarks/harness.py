@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import io
+import random
+import resource
+import time
+import tracemalloc
+import wave
+from collections import defaultdict
+from typing import Any, Dict, List, NamedTuple, Optional
+import httpx
+from src.benchmarks.fake_openai import FakeOpenAI
+from src.workflows.wf_speaking_feedback import get_graph, invoke_graph
+from src.agents.transcriber import lookup_transcript
+from src.utils.config import set_http_client
+from src.utils.limits import assessment_priority
+from src.utils.metrics import add_node_listener, remove_node_listener
+
+QUESTIONS = ["Describe your hometown.", "What do you like to do in your free time?"]
+
+class BenchmarkConfig(NamedTuple):
+    target: str = "graph"                   # "graph" (compiled graph) or "api" (FastAPI app)
+    requests: int = 50
+    concurrency: int = 8
+    analysis_mode: str = "per_criterion"
+    feedback_mode: str = "llm"
+    audio_seconds: float = 45.0
+    unique_audio: bool = True               # False: every request sends the same recording
+    trace_memory: bool = False              # tracemalloc peak (slows the run down)
+
+def make_wav(seconds: float, seed: int, sample_rate: int = 16000) -> bytes:
+    """
+    Mono 16-bit WAV of low-level noise; different seeds give different bytes.
+    """
+    rng = random.Random(seed)
+    frames = bytes(b & 0x0F for b in rng.randbytes(int(seconds * sample_rate) * 2))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(frames)
+    return buffer.getvalue()
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    def rounded(value):
+        return round(value, 4) if value is not None else None
+    return {
+        "count": len(samples),
+        "mean": rounded(sum(samples) / len(samples)) if samples else None,
+        "p50": rounded(percentile(samples, 50)),
+        "p95": rounded(percentile(samples, 95)),
+        "p99": rounded(percentile(samples, 99)),
+        "max": rounded(max(samples)) if samples else None,
+    }
+
+async def _run_graph(config: BenchmarkConfig, audio: bytes, filename: str):
+    state = {
+        "audio_bytes": audio,
+        "audio_filename": filename,
+        "audio_hash": hashlib.sha256(audio).hexdigest(),
+        "audio_size": len(audio),
+        "questions": QUESTIONS,
+        "feedback_mode": config.feedback_mode,
+    }
+    cached_transcript = lookup_transcript(state["audio_hash"])
+    if cached_transcript:
+        state.update(cached_transcript)
+    with assessment_priority():
+        result = await invoke_graph(get_graph(config.analysis_mode), state, checkpoint=False)
+    if not result.get("final_feedback"):
+        raise RuntimeError("No feedback generated")
+
+async def _run_api(client: httpx.AsyncClient, config: BenchmarkConfig, audio: bytes, filename: str):
+    response = await client.post(
+        "/process/speaking",
+        files={"file": (filename, audio, "audio/wav")},
+        data={"questions": QUESTIONS, "feedback_mode": config.feedback_mode, "analysis_mode": config.analysis_mode},
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+async def run_benchmark(config: BenchmarkConfig, backend: FakeOpenAI) -> Dict[str, Any]:
+    """
+    Drives the compiled graph or the FastAPI app against the fake backend and
+    reports throughput, end-to-end and per-node latency percentiles, upstream
+    request counts and memory.
+    """
+    node_samples: Dict[str, List[float]] = defaultdict(list)
+    node_statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def on_node(name: str, status: str, seconds: float):
+        node_samples[name].append(seconds)
+        node_statuses[name][status] += 1
+
+    shared_audio = make_wav(config.audio_seconds, seed=0)
+    latencies: List[float] = []
+    errors: List[str] = []
+    semaphore = asyncio.Semaphore(config.concurrency)
+
+    async def one(index: int, run):
+        audio = make_wav(config.audio_seconds, seed=index + 1) if config.unique_audio else shared_audio
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await run(audio, f"bench_{index}.wav")
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    if config.trace_memory:
+        tracemalloc.start()
+    http_client = httpx.AsyncClient(transport=backend.transport())
+    previous_client = await set_http_client(http_client, close_previous=False)
+    add_node_listener(on_node)
+    started = time.perf_counter()
+    try:
+        if config.target == "api":
+            from src.api.handler import app, lifespan
+
+            async with lifespan(app):
+                async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=None) as client:
+                    await asyncio.gather(*(
+                        one(index, lambda audio, name: _run_api(client, config, audio, name))
+                        for index in range(config.requests)
+                    ))
+        elif config.target == "graph":
+            await asyncio.gather(*(
+                one(index, lambda audio, name: _run_graph(config, audio, name))
+                for index in range(config.requests)
+            ))
+        else:
+            raise ValueError(f"Unknown benchmark target: {config.target}")
+    finally:
+        wall_seconds = time.perf_counter() - started
+        remove_node_listener(on_node)
+        await set_http_client(previous_client, close_previous=False)
+        await http_client.aclose()
+        traced_peak = tracemalloc.get_traced_memory()[1] if config.trace_memory else None
+        if config.trace_memory:
+            tracemalloc.stop()
+
+    return {
+        "config": config._asdict(),
+        "requests": config.requests,
+        "succeeded": len(latencies),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(latencies) / wall_seconds, 3) if wall_seconds else None,
+        "latency": summarize(latencies),
+        "nodes": {
+            name: {**summarize(samples), "statuses": dict(node_statuses[name])}
+            for name, samples in sorted(node_samples.items())
+        },
+        "upstream": dict(backend.counts),
+        "memory": {
+            # ru_maxrss is in KiB on Linux
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "tracemalloc_peak_mb": round(traced_peak / 1024 / 1024, 1) if traced_peak is not None else None,
+        },
+    }
+
+def format_report(report: Dict[str, Any]) -> str:
+    config = report["config"]
+    latency = report["latency"]
+    lines = [
+        f"target={config['target']} analysis_mode={config['analysis_mode']} feedback_mode={config['feedback_mode']} "
+        f"requests={config['requests']} concurrency={config['concurrency']} unique_audio={config['unique_audio']}",
+        f"succeeded {report['succeeded']}/{report['requests']} in {report['wall_seconds']}s "
+        f"-> {report['throughput_rps']} req/s",
+        f"end-to-end  p50={latency['p50']}s p95={latency['p95']}s p99={latency['p99']}s max={latency['max']}s",
+        "",
+        f"{'node':<24}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}  statuses",
+    ]
+    for name, stats in report["nodes"].items():
+        lines.append(
+            f"{name:<24}{stats['count']:>7}{stats['p50']:>9.3f}{stats['p95']:>9.3f}{stats['p99']:>9.3f}  {stats['statuses']}"
+        )
+    lines.append("")
+    lines.append(f"upstream: {report['upstream']}")
+    lines.append(f"memory: {report['memory']}")
+    for error in report["error_samples"]:
+        lines.append(f"error: {error}")
+    return "\n".join(lines)
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+from src.benchmarks.harness import summarize
+from src.workflows.wf_speaking_feedback import get_graph, invoke_graph
+from src.agents.feedback import SECTION_STATE_KEYS
+from src.utils.cache import invalidate_analysis_cache
+from src.utils.config import parse_node_settings
+from src.utils.limits import assessment_priority
+from src.utils.metrics import add_llm_listener, remove_llm_listener, estimate_cost
+from src.utils.routing import ModelRoutes, ROUTED_NODES, set_routes
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "corpus.jsonl")
+
+# Routing-level settings accepted in a routing spec besides node names
+ROUTE_OPTIONS = ("default", "fallback", "fallback_max_words", "fallback_queue_depth")
+
+def load_corpus(path: str = CORPUS_PATH) -> List[Dict[str, Any]]:
+    """
+    Reads a transcript corpus: one JSON object per line with id, transcript,
+    duration (seconds) and questions.
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def parse_routing(spec: str, default: str) -> Tuple[str, ModelRoutes]:
+    """
+    Parses "name:node=model,..." into a named routing table. Besides node
+    names, default=, fallback=, fallback_max_words= and fallback_queue_depth=
+    are accepted; an unset default is the baseline model.
+    """
+    name, _, settings = spec.partition(":")
+    values = parse_node_settings(settings)
+    unknown = set(values) - set(ROUTED_NODES) - set(ROUTE_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown keys in routing {name}: {', '.join(sorted(unknown))}")
+    return name, ModelRoutes(
+        default=values.get("default", default),
+        nodes={node: model for node, model in values.items() if node in ROUTED_NODES},
+        fallback=values.get("fallback", ""),
+        fallback_max_words=int(values.get("fallback_max_words", 0)),
+        fallback_queue_depth=int(values.get("fallback_queue_depth", 0)),
+    )
+
+def extract_scores(feedback: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Overall and per-criterion band scores of a report; unavailable sections are left out.
+    """
+    unavailable = set(feedback.get("unavailable_sections") or [])
+    scores = {"overall": feedback["overall_score"]}
+    for section in SECTION_STATE_KEYS:
+        if section not in unavailable:
+            scores[section] = feedback["details"][section]["score"]
+    return scores
+
+def score_drift(baseline: Dict[str, Dict[str, float]], scores: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """
+    Per-criterion score differences against the baseline, over the corpus
+    items both runs scored: mean signed delta (bias), mean and max absolute
+    delta, and the share of items within half a band.
+    """
+    deltas: Dict[str, List[float]] = defaultdict(list)
+    for item_id, item_scores in scores.items():
+        for criterion, score in item_scores.items():
+            reference = baseline.get(item_id, {}).get(criterion)
+            if reference is not None:
+                deltas[criterion].append(score - reference)
+    return {
+        criterion: {
+            "items": len(values),
+            "bias": round(sum(values) / len(values), 3),
+            "mean_abs": round(sum(abs(value) for value in values) / len(values), 3),
+            "max_abs": round(max(abs(value) for value in values), 3),
+            "within_half_band": round(sum(abs(value) <= 0.5 for value in values) / len(values), 3),
+        }
+        for criterion, values in sorted(deltas.items())
+    }
+
+async def replay_corpus(
+    corpus: List[Dict[str, Any]],
+    routes: ModelRoutes,
+    analysis_mode: str = "per_criterion",
+    feedback_mode: str = "llm",
+    concurrency: int = 4,
+) -> Dict[str, Any]:
+    """
+    Assesses every transcript of the corpus with one routing table (Whisper
+    is skipped: the runs start from the transcript) and reports latency,
+    token usage and cost by model, and the scores of every item.
+    """
+    set_routes(routes)
+    # Results cached under another routing would hide this one's latency
+    invalidate_analysis_cache()
+    graph = get_graph(analysis_mode)
+    semaphore = asyncio.Semaphore(concurrency)
+    usage: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0})
+    latencies: Dict[str, float] = {}
+    scores: Dict[str, Dict[str, float]] = {}
+    errors: Dict[str, str] = {}
+
+    def on_llm_call(node: str, model: str, prompt_tokens: int, completion_tokens: int, seconds: float):
+        model_usage = usage[model]
+        model_usage["calls"] += 1
+        model_usage["prompt_tokens"] += prompt_tokens
+        model_usage["completion_tokens"] += completion_tokens
+        model_usage["cost_usd"] += estimate_cost(model, prompt_tokens, completion_tokens)
+
+    async def assess(item: Dict[str, Any]):
+        state = {
+            "transcript": item["transcript"],
+            "duration": item.get("duration"),
+            "questions": item.get("questions", []),
+            "feedback_mode": feedback_mode,
+            "analysis_mode": analysis_mode,
+        }
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                with assessment_priority():
+                    result = await invoke_graph(graph, state, checkpoint=False)
+                feedback = result.get("final_feedback")
+                if not feedback:
+                    raise RuntimeError("No feedback generated")
+                latencies[item["id"]] = time.perf_counter() - started
+                scores[item["id"]] = extract_scores(feedback)
+            except Exception as e:
+                errors[item["id"]] = f"{type(e).__name__}: {e}"
+
+    add_llm_listener(on_llm_call)
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(assess(item) for item in corpus))
+    finally:
+        remove_llm_listener(on_llm_call)
+        set_routes(None)
+
+    return {
+        "routes": routes.to_dict(),
+        "succeeded": len(scores),
+        "errors": errors,
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "latency": summarize(list(latencies.values())),
+        "tokens": {
+            "prompt": sum(model_usage["prompt_tokens"] for model_usage in usage.values()),
+            "completion": sum(model_usage["completion_tokens"] for model_usage in usage.values()),
+        },
+        "cost_usd": round(sum(model_usage["cost_usd"] for model_usage in usage.values()), 5),
+        "models": {model: {**model_usage, "cost_usd": round(model_usage["cost_usd"], 5)} for model, model_usage in usage.items()},
+        "item_seconds": {item_id: round(seconds, 3) for item_id, seconds in latencies.items()},
+        "scores": scores,
+    }
+
+async def compare_routings(
+    corpus: List[Dict[str, Any]],
+    routings: List[Tuple[str, ModelRoutes]],
+    baseline: ModelRoutes,
+    baseline_runs: int = 1,
+    max_drift: float = 0.5,
+    **replay_options: Any,
+) -> Dict[str, Any]:
+    """
+    Replays the corpus with the baseline routing, then with each candidate,
+    and reports each candidate's latency, tokens, cost and score drift
+    against the baseline. With baseline_runs > 1 the baseline is replayed
+    again and its drift against itself is reported as the noise floor.
+
+    The recommendation is the candidate with the lowest p50 latency whose
+    mean absolute drift stays within max_drift bands on every criterion.
+    """
+    reference = await replay_corpus(corpus, baseline, **replay_options)
+    report: Dict[str, Any] = {"corpus_items": len(corpus), "max_drift": max_drift, "baseline": reference, "routings": {}}
+    if baseline_runs > 1:
+        noise = []
+        for _ in range(baseline_runs - 1):
+            rerun = await replay_corpus(corpus, baseline, **replay_options)
+            noise.append(score_drift(reference["scores"], rerun["scores"]))
+        report["baseline_noise"] = noise
+
+    for name, routes in routings:
+        result = await replay_corpus(corpus, routes, **replay_options)
+        result["drift"] = score_drift(reference["scores"], result["scores"])
+        result["within_max_drift"] = bool(result["drift"]) and result["succeeded"] == len(corpus) and all(
+            stats["mean_abs"] <= max_drift for stats in result["drift"].values()
+        )
+        report["routings"][name] = result
+
+    acceptable = [
+        (result["latency"]["p50"], name)
+        for name, result in report["routings"].items()
+        if result["within_max_drift"] and result["latency"]["p50"] is not None
+    ]
+    report["recommended"] = min(acceptable)[1] if acceptable else None
+    return report
+
+def describe_routes(routes: Dict[str, Any]) -> str:
+    parts = [f"default={routes['default']}", *(f"{node}={model}" for node, model in routes["nodes"].items())]
+    if routes["fallback"]:
+        parts.append(f"fallback={routes['fallback']} (<{routes['fallback_max_words']} words, queue>={routes['fallback_queue_depth']})")
+    return ", ".join(parts)
+
+def _row(name: str, result: Dict[str, Any]) -> str:
+    latency = result["latency"]
+    overall = (result.get("drift") or {}).get("overall", {})
+    drift = f"{overall['mean_abs']:>6.2f}{overall['max_abs']:>6.2f}{overall['within_half_band']:>7.0%}" if overall else f"{'-':>6}{'-':>6}{'-':>7}"
+    return (
+        f"{name:<24}{result['succeeded']:>4}{latency['p50'] or 0:>8.2f}{latency['p95'] or 0:>8.2f}"
+        f"{result['tokens']['prompt'] + result['tokens']['completion']:>10}{result['cost_usd']:>10.4f}{drift}"
+    )
+
+def format_comparison(report: Dict[str, Any]) -> str:
+    lines = [
+        f"corpus: {report['corpus_items']} transcripts, max drift {report['max_drift']} bands (mean absolute, per criterion)",
+        "",
+        f"{'routing':<24}{'ok':>4}{'p50 s':>8}{'p95 s':>8}{'tokens':>10}{'cost $':>10}{'|d|':>6}{'max':>6}{'<=0.5':>7}",
+        _row("baseline", report["baseline"]),
+    ]
+    lines.extend(_row(name, result) for name, result in report["routings"].items())
+    for noise in report.get("baseline_noise", []):
+        overall = noise.get("overall")
+        if overall:
+            lines.append(f"baseline noise: overall mean |d| {overall['mean_abs']}, max {overall['max_abs']}")
+    lines.append("")
+    for name, result in report["routings"].items():
+        criteria = ", ".join(f"{criterion} {stats['mean_abs']:.2f}" for criterion, stats in result["drift"].items())
+        lines.append(f"{name}: {describe_routes(result['routes'])}")
+        lines.append(f"  mean |d| {criteria or 'n/a'}")
+        for item_id, error in result["errors"].items():
+            lines.append(f"  error {item_id}: {error}")
+    lines.append("")
+    lines.append(f"recommended: {report['recommended'] or 'none within the drift limit'}")
+    return "\n".join(lines)
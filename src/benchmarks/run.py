@@ -0,0 +1,79 @@
+"""
+Offline benchmark: runs assessments against local fake Whisper / chat backends.
+
+    python -m src.benchmarks.run --target graph --requests 100 --concurrency 16
+    python -m src.benchmarks.run --analysis-mode combined --feedback-mode assembled
+    python -m src.benchmarks.run --no-cache --chat-tail-rate 0.05 --json report.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline benchmark with fake Whisper / chat backends.")
+    parser.add_argument("--target", choices=["graph", "api"], default="graph", help="Drive the compiled graph or the FastAPI app")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8, help="Assessments in flight (1 = sequential)")
+    parser.add_argument("--analysis-mode", choices=["per_criterion", "combined"], default="per_criterion")
+    parser.add_argument("--feedback-mode", choices=["llm", "assembled", "fast"], default="llm")
+    parser.add_argument("--audio-seconds", type=float, default=45.0)
+    parser.add_argument("--repeat-audio", action="store_true", help="Send the same recording every time (cache hits)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the analysis cache")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true", help="Report the tracemalloc peak (slower)")
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="Keep the application's INFO logs")
+    for name, latency, jitter in (("chat", 2.0, 0.5), ("whisper", 1.5, 0.3)):
+        parser.add_argument(f"--{name}-latency", type=float, default=latency, help=f"Mean {name} response time (seconds)")
+        parser.add_argument(f"--{name}-jitter", type=float, default=jitter, help=f"Std dev of the {name} response time")
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0, help=f"Fraction of {name} 500s")
+        parser.add_argument(f"--{name}-rate-limit-rate", type=float, default=0.0, help=f"Fraction of {name} 429s")
+        parser.add_argument(f"--{name}-tail-rate", type=float, default=0.0, help=f"Fraction of slow {name} responses")
+        parser.add_argument(f"--{name}-tail-multiplier", type=float, default=5.0)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    # Configuration is read from the environment at import time
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["CACHE_DB_PATH"] = ""
+    if args.no_cache:
+        os.environ["ANALYSIS_CACHE_ENABLED"] = "false"
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    from src.benchmarks.fake_openai import BackendProfile, FakeOpenAI
+    from src.benchmarks.harness import BenchmarkConfig, format_report, run_benchmark
+
+    def profile(name: str) -> BackendProfile:
+        return BackendProfile(
+            latency=getattr(args, f"{name}_latency"),
+            jitter=getattr(args, f"{name}_jitter"),
+            error_rate=getattr(args, f"{name}_error_rate"),
+            rate_limit_rate=getattr(args, f"{name}_rate_limit_rate"),
+            tail_rate=getattr(args, f"{name}_tail_rate"),
+            tail_multiplier=getattr(args, f"{name}_tail_multiplier"),
+        )
+
+    backend = FakeOpenAI(chat=profile("chat"), whisper=profile("whisper"), seed=args.seed)
+    config = BenchmarkConfig(
+        target=args.target,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        analysis_mode=args.analysis_mode,
+        feedback_mode=args.feedback_mode,
+        audio_seconds=args.audio_seconds,
+        unique_audio=not args.repeat_audio,
+        trace_memory=args.trace_memory,
+    )
+    report = asyncio.run(run_benchmark(config, backend))
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
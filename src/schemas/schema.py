@@ -34,9 +34,65 @@ class DetailsFeedback(BaseModel):
     grammar: GrammarFeedback = Field(description="Grammatical range and accuracy feedback")
     vocabulary: VocabularyFeedback = Field(description="Lexical resource feedback")
 
-class IELTSFeedback(BaseModel):
+# What the feedback LLM is asked for; fields the workflow fills in itself are on IELTSFeedback only
+class LLMFeedback(BaseModel):
     overall_score: float = Field(description="Overall IELTS Band Score (0-9)")
     questions: List[str] = Field(default_factory=list, description="List of questions asked")
     transcript: str = Field(description="Transcribed text from the audio")
     details: DetailsFeedback = Field(description="Detailed breakdown by section")
     general_suggestions: List[str] = Field(default_factory=list, description="General suggestions for improvement")
+
+class IELTSFeedback(LLMFeedback):
+    unavailable_sections: List[str] = Field(default_factory=list, description="Sections whose analysis was unavailable (e.g. timed out); excluded from overall_score")
+
+class PartFeedback(BaseModel):
+    part: int = Field(description="Test part (1, 2 or 3)")
+    questions: List[str] = Field(default_factory=list, description="Questions asked in this part")
+    transcript: str = Field(description="Transcribed text of this part")
+    duration: Optional[float] = Field(default=None, description="Recording length in seconds")
+    overall_score: float = Field(description="Band score of this part alone (0-9)")
+    details: DetailsFeedback = Field(description="Section analyses of this part")
+    unavailable_sections: List[str] = Field(default_factory=list, description="Sections whose analysis was unavailable in this part")
+
+class SessionFeedback(IELTSFeedback):
+    parts: List[PartFeedback] = Field(default_factory=list, description="Per-part breakdown, in part order")
+
+class GeneralSuggestions(BaseModel):
+    general_suggestions: List[str] = Field(default_factory=list, description="General suggestions for improvement")
+
+class JobResponse(BaseModel):
+    job_id: str = Field(description="Identifier to poll with GET /jobs/{job_id}")
+    status: str = Field(description="queued, running, completed or failed")
+    created_at: float = Field(description="Submission time (Unix timestamp)")
+    updated_at: float = Field(description="Time of the last status change (Unix timestamp)")
+    result: Optional[IELTSFeedback] = Field(default=None, description="Feedback, once the job has completed")
+    error: Optional[str] = Field(default=None, description="Error message, if the job failed")
+
+class AssessmentSummary(BaseModel):
+    assessment_id: str = Field(description="Run id of the assessment (the job id for jobs)")
+    candidate_id: Optional[str] = Field(default=None, description="Candidate given with the upload")
+    created_at: float = Field(description="Time the assessment finished (Unix timestamp)")
+    overall_score: float = Field(description="Overall IELTS Band Score (0-9)")
+    fluency_score: Optional[float] = Field(default=None, description="Unset when the section was unavailable")
+    pronunciation_score: Optional[float] = None
+    grammar_score: Optional[float] = None
+    vocabulary_score: Optional[float] = None
+    analysis_mode: Optional[str] = None
+    feedback_mode: Optional[str] = None
+    duration: Optional[float] = Field(default=None, description="Length of the recording in seconds")
+    seconds: float = Field(description="Processing time in seconds")
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = Field(default=0.0, description="Estimated chat-completion cost")
+
+class AssessmentDetail(AssessmentSummary):
+    transcript: Optional[str] = None
+    feedback: IELTSFeedback
+    node_seconds: Dict[str, float] = Field(default_factory=dict, description="Time spent in each graph node")
+
+class AssessmentPage(BaseModel):
+    items: List[AssessmentSummary]
+    total: int = Field(description="Assessments matching the filters")
+    limit: int
+    offset: int
@@ -0,0 +1,265 @@
+import abc
+import json
+import sqlite3
+import threading
+import asyncio
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Score columns: the overall band and one per report section
+SCORE_COLUMNS = {
+    "overall": "overall_score",
+    "fluency": "fluency_score",
+    "pronunciation": "pronunciation_score",
+    "grammar": "grammar_score",
+    "vocabulary": "vocabulary_score",
+}
+
+# Trend buckets (strftime formats over the assessment time, UTC)
+TREND_INTERVALS = {
+    "day": "%Y-%m-%d",
+    "week": "%Y-W%W",
+    "month": "%Y-%m",
+}
+
+SUMMARY_COLUMNS = (
+    "assessment_id", "candidate_id", "created_at", *SCORE_COLUMNS.values(),
+    "analysis_mode", "feedback_mode", "duration", "seconds",
+    "llm_calls", "prompt_tokens", "completion_tokens", "cost_usd",
+)
+
+class AssessmentRecord(NamedTuple):
+    """
+    A finished assessment as handed to the store. Serialization happens in
+    the store's worker thread, not on the request path.
+    """
+    assessment_id: str  # the run id
+    created_at: float  # Unix timestamp
+    candidate_id: Optional[str]
+    feedback: Dict[str, Any]  # IELTSFeedback
+    transcript: Optional[str]
+    duration: Optional[float]  # audio seconds
+    analysis_mode: Optional[str]
+    feedback_mode: Optional[str]
+    seconds: float  # processing time
+    usage: Dict[str, Any]  # llm_calls, prompt_tokens, completion_tokens, cost_usd and node seconds
+
+class AssessmentFilter(NamedTuple):
+    candidate_id: Optional[str] = None
+    since: Optional[float] = None  # Unix timestamps, inclusive
+    until: Optional[float] = None
+    band_min: Optional[float] = None  # overall band, inclusive
+    band_max: Optional[float] = None
+
+class AssessmentStore(abc.ABC):
+    """
+    Storage interface for assessment history: finished reports with their
+    transcript, per-section scores, timing and token usage, queried by
+    candidate, date and band.
+    """
+    @abc.abstractmethod
+    async def add_many(self, records: List[AssessmentRecord]) -> int:
+        """
+        Writes a batch of records in one transaction. Records that cannot be
+        stored (e.g. a report without an overall score) are skipped; returns
+        the number skipped.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get(self, assessment_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def query(self, filters: AssessmentFilter, limit: int, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        One page of assessment summaries, newest first, and the total matching.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def trend(self, filters: AssessmentFilter, interval: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Scores over time, oldest first: one point per assessment, or averages
+        per TREND_INTERVALS bucket.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def distribution(self, filters: AssessmentFilter) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-criterion count, mean, min, max and half-band histogram.
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+def _where(filters: AssessmentFilter) -> Tuple[str, list]:
+    clauses, params = [], []
+    for column, operator, value in (
+        ("candidate_id", "=", filters.candidate_id),
+        ("created_at", ">=", filters.since),
+        ("created_at", "<=", filters.until),
+        ("overall_score", ">=", filters.band_min),
+        ("overall_score", "<=", filters.band_max),
+    ):
+        if value is not None:
+            clauses.append(f"{column} {operator} ?")
+            params.append(value)
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+def _row(record: AssessmentRecord) -> tuple:
+    feedback = record.feedback
+    unavailable = set(feedback.get("unavailable_sections") or [])
+    details = feedback.get("details") or {}
+    section_scores = [
+        None if section in unavailable or section not in details else details[section]["score"]
+        for section in list(SCORE_COLUMNS)[1:]
+    ]
+    if feedback["overall_score"] is None:
+        raise ValueError("no overall score")
+    usage = record.usage
+    return (
+        record.assessment_id, record.candidate_id, record.created_at,
+        feedback["overall_score"], *section_scores,
+        record.analysis_mode, record.feedback_mode, record.duration, round(record.seconds, 3),
+        usage.get("llm_calls", 0), usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0),
+        round(usage.get("cost_usd", 0.0), 6),
+        record.transcript, json.dumps(feedback), json.dumps(usage.get("nodes") or {}),
+    )
+
+class SQLiteAssessmentStore(AssessmentStore):
+    """
+    Keeps assessment history in SQLite, indexed by candidate, date and band.
+    Queries run in a worker thread; a batch of records is one transaction.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS assessments (
+                assessment_id TEXT PRIMARY KEY,
+                candidate_id TEXT,
+                created_at REAL NOT NULL,
+                overall_score REAL NOT NULL,
+                fluency_score REAL,
+                pronunciation_score REAL,
+                grammar_score REAL,
+                vocabulary_score REAL,
+                analysis_mode TEXT,
+                feedback_mode TEXT,
+                duration REAL,
+                seconds REAL,
+                llm_calls INTEGER,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                cost_usd REAL,
+                transcript TEXT,
+                feedback TEXT NOT NULL,
+                node_seconds TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_candidate ON assessments (candidate_id, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_created ON assessments (created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_assessments_band ON assessments (overall_score, created_at)")
+        self._conn.commit()
+
+    async def add_many(self, records: List[AssessmentRecord]) -> int:
+        return await asyncio.to_thread(self._insert, records)
+
+    async def get(self, assessment_id: str) -> Optional[Dict[str, Any]]:
+        rows = await asyncio.to_thread(self._fetchall,
+            f"SELECT {', '.join(SUMMARY_COLUMNS)}, transcript, feedback, node_seconds FROM assessments WHERE assessment_id = ?",
+            (assessment_id,),
+        )
+        if not rows:
+            return None
+        assessment = dict(rows[0])
+        assessment["feedback"] = json.loads(assessment["feedback"])
+        assessment["node_seconds"] = json.loads(assessment["node_seconds"] or "{}")
+        return assessment
+
+    async def query(self, filters: AssessmentFilter, limit: int, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        where, params = _where(filters)
+        return await asyncio.to_thread(self._page, where, params, limit, offset)
+
+    async def trend(self, filters: AssessmentFilter, interval: Optional[str] = None) -> List[Dict[str, Any]]:
+        where, params = _where(filters)
+        if interval is None:
+            columns = ", ".join(SCORE_COLUMNS.values())
+            sql = f"SELECT assessment_id, created_at, {columns} FROM assessments {where} ORDER BY created_at"
+        else:
+            averages = ", ".join(f"ROUND(AVG({column}), 2) AS {column}" for column in SCORE_COLUMNS.values())
+            sql = (
+                f"SELECT strftime(?, created_at, 'unixepoch') AS period, COUNT(*) AS assessments, "
+                f"MIN(created_at) AS first_at, {averages} FROM assessments {where} GROUP BY period ORDER BY period"
+            )
+            params = [TREND_INTERVALS[interval], *params]
+        return [dict(row) for row in await asyncio.to_thread(self._fetchall, sql, tuple(params))]
+
+    async def distribution(self, filters: AssessmentFilter) -> Dict[str, Dict[str, Any]]:
+        where, params = _where(filters)
+        return await asyncio.to_thread(self._distribution, where, params)
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _insert(self, records: List[AssessmentRecord]) -> int:
+        # One malformed record must not cost the rest of the batch
+        rows = []
+        for record in records:
+            try:
+                rows.append(_row(record))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipped assessment {record.assessment_id[:8]} for the history store: {e!r}")
+        if rows:
+            placeholders = ", ".join("?" for _ in rows[0])
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany(f"INSERT OR REPLACE INTO assessments VALUES ({placeholders})", rows)
+        return len(records) - len(rows)
+
+    def _page(self, where: str, params: list, limit: int, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM assessments {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM assessments {where} "
+                "ORDER BY created_at DESC, assessment_id DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def _distribution(self, where: str, params: list) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        with self._lock:
+            for criterion, column in SCORE_COLUMNS.items():
+                scored = f"{where} AND {column} IS NOT NULL" if where else f"WHERE {column} IS NOT NULL"
+                count, mean, low, high = self._conn.execute(
+                    f"SELECT COUNT(*), AVG({column}), MIN({column}), MAX({column}) FROM assessments {scored}", params,
+                ).fetchone()
+                # Scores are bucketed to the nearest half band
+                histogram = self._conn.execute(
+                    f"SELECT ROUND({column} * 2) / 2 AS band, COUNT(*) FROM assessments {scored} GROUP BY band ORDER BY band",
+                    params,
+                ).fetchall()
+                result[criterion] = {
+                    "count": count,
+                    "mean": round(mean, 2) if mean is not None else None,
+                    "min": low,
+                    "max": high,
+                    "histogram": {f"{band:.1f}": band_count for band, band_count in histogram},
+                }
+        return result
+
+    def _fetchall(self, sql: str, params: tuple) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
@@ -0,0 +1,134 @@
+import io
+import os
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+from pydub import AudioSegment
+from pydub.silence import detect_silence, detect_leading_silence
+
+class AudioChunk(NamedTuple):
+    """
+    A slice of a recording, encoded and ready to upload.
+    """
+    offset: float  # start of the chunk within the recording, in seconds
+    duration: float  # in seconds
+    filename: str
+    data: bytes
+
+def format_from_filename(filename: Optional[str]) -> Optional[str]:
+    """
+    Returns the decoder format hint for a file name (its extension), if any.
+    """
+    extension = os.path.splitext(filename or "")[1].lstrip(".").lower()
+    return extension or None
+
+def load_audio(source: Union[str, bytes], format: Optional[str] = None) -> AudioSegment:
+    """
+    Decodes audio from a path or in-memory bytes (ffmpeg is needed for anything but WAV).
+    """
+    if isinstance(source, bytes):
+        return AudioSegment.from_file(io.BytesIO(source), format=format)
+    return AudioSegment.from_file(source, format=format)
+
+def audio_source(state: Dict[str, Any]) -> Tuple[Union[str, bytes], str, int]:
+    """
+    Returns the audio to process from state (in-memory bytes, else the file path),
+    its file name and its size in bytes.
+    """
+    data = state.get("audio_bytes")
+    if data is not None:
+        return data, state.get("audio_filename") or "audio", len(data)
+    path = state.get("audio_path")
+    if not path or not os.path.exists(path):
+        raise FileNotFoundError(f"Audio file not found: {path}")
+    return path, state.get("audio_filename") or os.path.basename(path), os.path.getsize(path)
+
+def trim_silence(audio: AudioSegment, silence_thresh_offset: float = 20.0, padding_ms: int = 200) -> AudioSegment:
+    """
+    Trims leading and trailing silence, keeping a little padding around speech.
+    """
+    if audio.dBFS == -math.inf:
+        return audio
+    silence_thresh = audio.dBFS - silence_thresh_offset
+    start = detect_leading_silence(audio, silence_threshold=silence_thresh)
+    end = len(audio) - detect_leading_silence(audio.reverse(), silence_threshold=silence_thresh)
+    if end <= start:
+        return audio
+    return audio[max(0, start - padding_ms):min(len(audio), end + padding_ms)]
+
+def normalize_audio(audio: AudioSegment, sample_rate: int) -> AudioSegment:
+    """
+    Downmixes to 16-bit mono at sample_rate and trims silence at both ends,
+    which is all Whisper needs.
+    """
+    audio = audio.set_channels(1).set_frame_rate(sample_rate).set_sample_width(2)
+    return trim_silence(audio)
+
+def find_cut_points(
+    audio: AudioSegment,
+    max_chunk_ms: int,
+    min_silence_ms: int,
+    search_ms: int,
+    silence_thresh_offset: float = 16.0,
+) -> List[int]:
+    """
+    Picks chunk boundaries (in ms) at most max_chunk_ms apart.
+
+    Each boundary is placed in the middle of the last silence found within the
+    final search_ms of the window, so words are not cut in half. Only that
+    window is scanned, which keeps the cost independent of recording length.
+    Without a silence in the window, the chunk is cut hard at max_chunk_ms.
+
+    Returns:
+        Boundaries including 0 and len(audio)
+    """
+    total_ms = len(audio)
+    # Silence is relative to the recording's own loudness
+    silence_thresh = audio.dBFS - silence_thresh_offset
+    cuts = [0]
+
+    while total_ms - cuts[-1] > max_chunk_ms:
+        window_end = cuts[-1] + max_chunk_ms
+        window_start = max(cuts[-1] + 1, window_end - search_ms)
+        silences = detect_silence(
+            audio[window_start:window_end],
+            min_silence_len=min_silence_ms,
+            silence_thresh=silence_thresh,
+            seek_step=10,
+        )
+        if silences:
+            start, end = silences[-1]
+            cuts.append(window_start + (start + end) // 2)
+        else:
+            cuts.append(window_end)
+
+    cuts.append(total_ms)
+    return cuts
+
+def split_audio(
+    audio: AudioSegment,
+    max_chunk_seconds: float,
+    min_silence_ms: int,
+    search_seconds: float,
+    export_format: str,
+) -> List[AudioChunk]:
+    """
+    Splits a decoded recording at silence boundaries into encoded chunks.
+    """
+    cuts = find_cut_points(
+        audio,
+        max_chunk_ms=int(max_chunk_seconds * 1000),
+        min_silence_ms=min_silence_ms,
+        search_ms=int(search_seconds * 1000),
+    )
+
+    chunks = []
+    for index, (start, end) in enumerate(zip(cuts, cuts[1:])):
+        buffer = io.BytesIO()
+        audio[start:end].export(buffer, format=export_format)
+        chunks.append(AudioChunk(
+            offset=start / 1000,
+            duration=(end - start) / 1000,
+            filename=f"chunk_{index}.{export_format}",
+            data=buffer.getvalue(),
+        ))
+    return chunks
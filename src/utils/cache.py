@@ -0,0 +1,338 @@
+import copy
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from pydantic import BaseModel
+from langchain_core.prompts import ChatPromptTemplate
+from src.utils.config import (
+    CACHE_DB_PATH,
+    LLM_MODEL,
+    ANALYSIS_CACHE_ENABLED,
+    ANALYSIS_CACHE_MAX_ENTRIES,
+    ANALYSIS_CACHE_TTL,
+)
+from src.utils.routing import select_model, pin_model
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class CacheStats:
+    """
+    Hit/miss counters for a cache, plus upstream bytes avoided by hits.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes_saved": self.bytes_saved,
+        }
+
+class MemoryCache:
+    """
+    In-process LRU cache bounded by entry count and total serialized size,
+    with optional time-to-live.
+    """
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 0, ttl: float = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, expires_at = entry
+            if expires_at and expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, size: Optional[int] = None):
+        if size is None:
+            size = len(json.dumps(value))
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._size += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes and self._size > self.max_bytes)
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+class SQLiteCache:
+    """
+    On-disk cache tier that survives restarts. Entries live in a shared table,
+    partitioned by namespace, and are stored as JSON.
+    """
+    def __init__(self, path: str, namespace: str, ttl: float = 0):
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None:
+            return None
+        value, created_at = row
+        if self.ttl and created_at + self.ttl < time.time():
+            self.delete(key)
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), time.time()),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+            self._conn.commit()
+
+    def delete_stale(self, prefix: str) -> int:
+        """
+        Deletes every entry in the namespace whose key does not start with prefix.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND substr(key, 1, ?) != ?",
+                (self.namespace, len(prefix), prefix),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+class TieredCache:
+    """
+    Memory LRU in front of an optional SQLite tier. Disk hits are promoted to memory.
+    """
+    def __init__(self, memory: MemoryCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.to_dict()
+        stats["evictions"] = self.memory.stats.evictions
+        stats["entries"] = len(self.memory)
+        stats["disk"] = self.disk is not None
+        return stats
+
+def create_cache(namespace: str, max_entries: int, max_bytes: int = 0, ttl: float = 0) -> TieredCache:
+    """
+    Builds a tiered cache; the SQLite tier is enabled when CACHE_DB_PATH is set.
+    """
+    disk = SQLiteCache(CACHE_DB_PATH, namespace, ttl=ttl) if CACHE_DB_PATH else None
+    return TieredCache(MemoryCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl), disk)
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Returns a short stable digest of JSON-serializable parts.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def normalize_transcript(transcript: str) -> str:
+    """
+    Collapses whitespace so formatting-only differences share a cache entry.
+    """
+    return " ".join(transcript.split())
+
+def analysis_version(prompt: ChatPromptTemplate, schema: type[BaseModel], model: str = LLM_MODEL) -> str:
+    """
+    Versions an analysis by its prompt template, output schema and model, so any
+    edit to the template or schema invalidates previously cached results.
+    """
+    templates = [message.prompt.template for message in prompt.messages]
+    return fingerprint(templates, schema.model_json_schema(), model)
+
+_analysis_caches: Dict[str, TieredCache] = {}
+_analysis_caches_lock = threading.Lock()
+
+def get_analysis_cache(namespace: str, version: str) -> TieredCache:
+    """
+    Returns the result cache for an analysis node. When first opened, disk
+    entries written under any other version are purged.
+    """
+    cache = _analysis_caches.get(namespace)
+    if cache is None:
+        with _analysis_caches_lock:
+            cache = _analysis_caches.get(namespace)
+            if cache is None:
+                cache = create_cache(
+                    f"analysis:{namespace}",
+                    max_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+                    ttl=ANALYSIS_CACHE_TTL,
+                )
+                if cache.disk is not None:
+                    purged = cache.disk.delete_stale(f"{version}:")
+                    if purged:
+                        logger.info(f"Purged {purged} stale {namespace} analyses (version changed)")
+                _analysis_caches[namespace] = cache
+    return cache
+
+def invalidate_analysis_cache(namespace: Optional[str] = None):
+    """
+    Clears one analysis cache, or all of them, in memory and on disk.
+    """
+    with _analysis_caches_lock:
+        caches = [_analysis_caches[namespace]] if namespace else list(_analysis_caches.values())
+    for cache in caches:
+        cache.clear()
+
+def get_analysis_cache_stats() -> Dict[str, Any]:
+    return {namespace: cache.get_stats() for namespace, cache in _analysis_caches.items()}
+
+def memoize_analysis(namespace: str, version: str, key_fn: Callable[[Dict[str, Any]], Optional[tuple]]):
+    """
+    Caches an async analysis node's state update by (version, routed model, key_fn(state)).
+    
+    Args:
+        namespace: Cache name for this node (e.g. "grammar")
+        version: Prompt/schema/model version, see analysis_version()
+        key_fn: Returns the inputs the node's output depends on, or None to bypass the cache
+    """
+    def decorator(node):
+        @functools.wraps(node)
+        async def wrapper(state):
+            # The model is picked once: the routed model is part of the key, so
+            # results of the fallback model are never served to requests routed
+            # to the primary one, and the node calls the model the key names
+            model = select_model(namespace, state.get("transcript"))
+            with pin_model(namespace, model):
+                if not ANALYSIS_CACHE_ENABLED:
+                    return await node(state)
+                key_parts = key_fn(state)
+                if key_parts is None:
+                    return await node(state)
+                
+                cache = get_analysis_cache(namespace, version)
+                key = f"{version}:{fingerprint(model, *key_parts)}"
+                cached = cache.get(key)
+                if cached is not None:
+                    logger.info(f"[CACHED] {namespace} analysis")
+                    # Copies both ways: graph reducers and callers may mutate
+                    # the update, which must not change the cached entry
+                    return copy.deepcopy(cached)
+                
+                result = await node(state)
+                if result and all(value is not None for value in result.values()):
+                    cache.set(key, copy.deepcopy(result))
+                return result
+        return wrapper
+    return decorator
+
+def transcript_key(state: Dict[str, Any]) -> Optional[tuple]:
+    """
+    Cache key inputs for analyses that depend only on the transcript.
+    """
+    transcript = state.get("transcript")
+    return (normalize_transcript(transcript),) if transcript else None
+
+def transcript_duration_key(state: Dict[str, Any]) -> Optional[tuple]:
+    """
+    Cache key inputs for analyses that also use the recording duration.
+    """
+    transcript = state.get("transcript")
+    if not transcript:
+        return None
+    return (normalize_transcript(transcript), round(state.get("duration") or 0, 2))
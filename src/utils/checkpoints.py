@@ -0,0 +1,184 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.types import RetryPolicy
+from src.utils.config import (
+    CHECKPOINT_SAVER,
+    CHECKPOINT_DB_PATH,
+    CHECKPOINT_TTL,
+    CHECKPOINT_SWEEP_INTERVAL,
+    NODE_RETRY_MAX_ATTEMPTS,
+    NODE_RETRY_INITIAL_INTERVAL,
+)
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_sqlite_conn = None
+_sweeper: Optional[asyncio.Task] = None
+
+async def open_checkpointer() -> Optional[BaseCheckpointSaver]:
+    """
+    Opens the saver selected by CHECKPOINT_SAVER ("memory", "sqlite" or
+    "none"). Call before the graphs are compiled (the FastAPI lifespan does);
+    the SQLite saver needs the event loop to open its connection.
+    """
+    global _checkpointer, _sqlite_conn
+    if _checkpointer is not None or CHECKPOINT_SAVER == "none":
+        return _checkpointer
+    if CHECKPOINT_SAVER == "memory":
+        _checkpointer = InMemorySaver()
+    elif CHECKPOINT_SAVER == "sqlite":
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        _sqlite_conn = await aiosqlite.connect(CHECKPOINT_DB_PATH)
+        _checkpointer = AsyncSqliteSaver(_sqlite_conn)
+        await _checkpointer.setup()
+    else:
+        raise ValueError(f"Unknown CHECKPOINT_SAVER: {CHECKPOINT_SAVER}")
+    logger.info(f"Workflow checkpoints: {CHECKPOINT_SAVER}")
+    return _checkpointer
+
+def get_checkpointer() -> Optional[BaseCheckpointSaver]:
+    """
+    Returns the process-wide saver. The in-memory saver is created on first
+    use; the SQLite saver only exists once open_checkpointer() has run.
+    """
+    global _checkpointer
+    if _checkpointer is None and CHECKPOINT_SAVER == "memory":
+        _checkpointer = InMemorySaver()
+    return _checkpointer
+
+async def close_checkpointer():
+    global _checkpointer, _sqlite_conn
+    await stop_checkpoint_sweeper()
+    _checkpointer = None
+    if _sqlite_conn is not None:
+        await _sqlite_conn.close()
+        _sqlite_conn = None
+
+def node_retry_policy() -> RetryPolicy:
+    """
+    Retry policy for graph nodes: a node whose upstream call still fails after
+    the rate governor's own retries is re-run in place, up to
+    NODE_RETRY_MAX_ATTEMPTS times in total.
+    """
+    return RetryPolicy(max_attempts=NODE_RETRY_MAX_ATTEMPTS, initial_interval=NODE_RETRY_INITIAL_INTERVAL)
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex
+
+def run_config(run_id: str) -> Dict[str, Any]:
+    """
+    Graph config that checkpoints a run under its id (the LangGraph thread id).
+    """
+    return {"configurable": {"thread_id": run_id}}
+
+async def get_run_values(run_id: str) -> Optional[Dict[str, Any]]:
+    """
+    The state saved at the last checkpoint of a run, or None if there is none.
+    """
+    checkpointer = get_checkpointer()
+    if checkpointer is None:
+        return None
+    saved = await checkpointer.aget_tuple(run_config(run_id))
+    if saved is None:
+        return None
+    return dict(saved.checkpoint.get("channel_values") or {})
+
+async def _delete_run(checkpointer: BaseCheckpointSaver, run_id: str):
+    try:
+        await checkpointer.adelete_thread(run_id)
+    except Exception as e:
+        logger.warning(f"Could not delete checkpoints of run {run_id}: {str(e)}")
+
+async def _keep_latest(checkpointer: BaseCheckpointSaver, run_id: str):
+    """
+    Reduces a failed run to its last checkpoint and the pending writes of the
+    nodes that finished after it: all a resume needs. Earlier checkpoints
+    still hold what later steps dropped (the uploaded audio, once
+    transcribed), which would otherwise stay in the saver until the run expires.
+    """
+    saved = await checkpointer.aget_tuple(run_config(run_id))
+    if saved is None:
+        return
+    await checkpointer.adelete_thread(run_id)
+    config = await checkpointer.aput(
+        {"configurable": {"thread_id": run_id, "checkpoint_ns": ""}},
+        saved.checkpoint,
+        saved.metadata,
+        saved.checkpoint["channel_versions"],
+    )
+    writes: Dict[str, List[Tuple[str, Any]]] = {}
+    for task_id, channel, value in saved.pending_writes or ():
+        writes.setdefault(task_id, []).append((channel, value))
+    for task_id, task_writes in writes.items():
+        await checkpointer.aput_writes(config, task_writes, task_id)
+
+async def sweep_expired_runs(ttl: float = CHECKPOINT_TTL) -> int:
+    """
+    Drops runs whose last checkpoint is more than ttl seconds old. Goes by
+    the timestamps the saver keeps with each checkpoint, so failed runs left
+    behind by an earlier process (SQLite saver) expire as well. Returns the
+    number of runs dropped.
+    """
+    checkpointer = get_checkpointer()
+    if checkpointer is None:
+        return 0
+    now = time.time()
+    latest: Dict[str, float] = {}
+    async for saved in checkpointer.alist(None):
+        run_id = saved.config["configurable"]["thread_id"]
+        saved_at = datetime.fromisoformat(saved.checkpoint["ts"]).timestamp()
+        latest[run_id] = max(saved_at, latest.get(run_id, 0.0))
+    expired = [run_id for run_id, saved_at in latest.items() if saved_at + ttl < now]
+    for run_id in expired:
+        await _delete_run(checkpointer, run_id)
+    if expired:
+        logger.info(f"Dropped checkpoints of {len(expired)} expired runs")
+    return len(expired)
+
+async def _sweep_periodically(interval: float):
+    while True:
+        try:
+            await sweep_expired_runs()
+        except Exception as e:
+            logger.error(f"Checkpoint sweep failed: {str(e)}")
+        await asyncio.sleep(interval)
+
+def start_checkpoint_sweeper(interval: float = CHECKPOINT_SWEEP_INTERVAL):
+    """
+    Sweeps expired runs now and then every interval seconds, in the
+    background (started from the FastAPI lifespan, stopped by close_checkpointer()).
+    """
+    global _sweeper
+    if _sweeper is None and get_checkpointer() is not None:
+        _sweeper = asyncio.create_task(_sweep_periodically(interval))
+
+async def stop_checkpoint_sweeper():
+    global _sweeper
+    sweeper, _sweeper = _sweeper, None
+    if sweeper is not None:
+        sweeper.cancel()
+        await asyncio.gather(sweeper, return_exceptions=True)
+
+async def finish_run(run_id: str, succeeded: bool):
+    """
+    Drops a finished run's checkpoints. A failed run is cut down to its last
+    checkpoint and kept for CHECKPOINT_TTL seconds so it can be resumed.
+    """
+    checkpointer = get_checkpointer()
+    if checkpointer is None:
+        return
+    if succeeded:
+        await _delete_run(checkpointer, run_id)
+        return
+    try:
+        await _keep_latest(checkpointer, run_id)
+    except Exception as e:
+        logger.warning(f"Could not compact checkpoints of run {run_id}: {str(e)}")
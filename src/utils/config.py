@@ -1,15 +1,299 @@
 import os
+import threading
+from typing import Dict, Optional, Tuple, Type
+import httpx
+from openai import AsyncOpenAI
+from pydantic import BaseModel
+from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_llm():
+# HTTP connection pool shared by every OpenAI call in this process
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "10"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "120"))
+# SDK-level retries; rate limits and transient errors are retried by the governor in utils/limits.py
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "0"))
+
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o")
+
+def parse_node_settings(spec: str) -> Dict[str, str]:
     """
-    Returns a configured ChatOpenAI instance.
+    Parses "node=value,node=value" overrides (e.g. NODE_DEADLINES, LLM_ROUTES).
     """
+    return {
+        name.strip(): value.strip()
+        for name, value in (item.split("=", 1) for item in spec.split(",") if "=" in item)
+    }
+
+# Model routing (see utils/routing.py): per-node models overriding LLM_MODEL, e.g.
+# "pronunciation=gpt-4o-mini,fluency=gpt-4o-mini" (nodes: fluency, pronunciation, grammar,
+# vocabulary, combined, feedback, suggestions), and a faster fallback model used for transcripts
+# under LLM_FALLBACK_MAX_WORDS words or while LLM_FALLBACK_QUEUE_DEPTH LLM calls are queued (0 disables)
+LLM_ROUTES = parse_node_settings(os.getenv("LLM_ROUTES", ""))
+LLM_FALLBACK_MODEL = os.getenv("LLM_FALLBACK_MODEL", "gpt-4o-mini")
+LLM_FALLBACK_MAX_WORDS = int(os.getenv("LLM_FALLBACK_MAX_WORDS", "0"))
+LLM_FALLBACK_QUEUE_DEPTH = int(os.getenv("LLM_FALLBACK_QUEUE_DEPTH", "0"))
+
+# OpenAI-compatible chat endpoint (vLLM, llama.cpp, Ollama, the benchmark's fake backend) instead
+# of OpenAI; Whisper stays on OPENAI_BASE_URL. Servers without json_schema support can set the
+# structured output method to "function_calling" or "json_mode".
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "")
+LLM_API_KEY = os.getenv("LLM_API_KEY", "")
+LLM_STRUCTURED_OUTPUT_METHOD = os.getenv("LLM_STRUCTURED_OUTPUT_METHOD", "")
+
+# How the final report is produced: "llm", "assembled" or "fast" (see agents/feedback.py)
+FEEDBACK_MODES = ("llm", "assembled", "fast")
+FEEDBACK_MODE = os.getenv("FEEDBACK_MODE", "llm")
+
+# How the transcript is analyzed: four parallel "per_criterion" calls or one "combined" call
+ANALYSIS_MODES = ("per_criterion", "combined")
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "per_criterion")
+
+# Upload ingestion: hard size limit, and how much of an upload is kept in memory before spilling to disk
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+UPLOAD_SPOOL_MAX_BYTES = int(os.getenv("UPLOAD_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/tmp")
+
+# Asynchronous job API: worker pool size, admission limit and result storage ("memory" or "sqlite")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "8"))
+JOB_QUEUE_MAX_DEPTH = int(os.getenv("JOB_QUEUE_MAX_DEPTH", "100"))
+JOB_STORE = os.getenv("JOB_STORE", "memory")
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "jobs.db")
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+
+# Assessment history ("sqlite" or "none"): finished assessments are queued and written by a background
+# task, up to ASSESSMENT_BATCH_SIZE per transaction, at most ASSESSMENT_FLUSH_SECONDS after they finish
+ASSESSMENT_STORE = os.getenv("ASSESSMENT_STORE", "sqlite")
+ASSESSMENT_DB_PATH = os.getenv("ASSESSMENT_DB_PATH", "assessments.db")
+ASSESSMENT_BATCH_SIZE = int(os.getenv("ASSESSMENT_BATCH_SIZE", "100"))
+ASSESSMENT_FLUSH_SECONDS = float(os.getenv("ASSESSMENT_FLUSH_SECONDS", "1.0"))
+ASSESSMENT_QUEUE_MAX = int(os.getenv("ASSESSMENT_QUEUE_MAX", "10000"))
+ASSESSMENT_PAGE_MAX = int(os.getenv("ASSESSMENT_PAGE_MAX", "200"))
+
+# Workflow checkpoints ("memory", "sqlite" or "none"), how long a failed run stays resumable,
+# how often expired runs are swept, and how often a failing node is re-run in place before the run fails
+CHECKPOINT_SAVER = os.getenv("CHECKPOINT_SAVER", "memory")
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.db")
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", "3600"))
+CHECKPOINT_SWEEP_INTERVAL = float(os.getenv("CHECKPOINT_SWEEP_INTERVAL", "300"))
+NODE_RETRY_MAX_ATTEMPTS = int(os.getenv("NODE_RETRY_MAX_ATTEMPTS", "2"))
+NODE_RETRY_INITIAL_INTERVAL = float(os.getenv("NODE_RETRY_INITIAL_INTERVAL", "1.0"))
+
+# Batch scoring: files per request, assessments in flight per batch, in-memory spool per file
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "200"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+BATCH_SPOOL_MAX_BYTES = int(os.getenv("BATCH_SPOOL_MAX_BYTES", str(1024 * 1024)))
+
+# Result caches: in-memory LRU, plus a SQLite tier when CACHE_DB_PATH is set
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "1024"))
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+TRANSCRIPT_CACHE_TTL = float(os.getenv("TRANSCRIPT_CACHE_TTL", str(7 * 24 * 3600)))
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "4096"))
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", str(30 * 24 * 3600)))
+
+# Upstream concurrency shared by all requests in the process
+WHISPER_MAX_CONCURRENCY = int(os.getenv("WHISPER_MAX_CONCURRENCY", "16"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "64"))
+
+# Rate governor: per-minute budgets (0 disables a bucket) and backoff for 429s / transient errors
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "5000"))
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "800000"))
+WHISPER_RPM_LIMIT = int(os.getenv("WHISPER_RPM_LIMIT", "500"))
+LLM_PROMPT_OVERHEAD_TOKENS = int(os.getenv("LLM_PROMPT_OVERHEAD_TOKENS", "1000"))
+LLM_COMPLETION_TOKENS = int(os.getenv("LLM_COMPLETION_TOKENS", "1000"))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "6"))
+RATE_LIMIT_BACKOFF_BASE = float(os.getenv("RATE_LIMIT_BACKOFF_BASE", "1"))
+RATE_LIMIT_BACKOFF_MAX = float(os.getenv("RATE_LIMIT_BACKOFF_MAX", "60"))
+
+# Tail latency: per-node deadlines ("grammar=30,vocabulary=45" overrides the default, 0 disables),
+# what to do with a section that misses its deadline ("unavailable" or "fail"), and request hedging
+NODE_DEADLINE_SECONDS = float(os.getenv("NODE_DEADLINE_SECONDS", "90"))
+NODE_DEADLINES = {
+    name: float(seconds) for name, seconds in parse_node_settings(os.getenv("NODE_DEADLINES", "")).items()
+}
+DEGRADED_SECTION_POLICY = os.getenv("DEGRADED_SECTION_POLICY", "unavailable")
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "90"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "1"))
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "200"))
+
+# Long recordings are split at silences and transcribed concurrently
+TRANSCRIBE_CHUNK_MIN_BYTES = int(os.getenv("TRANSCRIBE_CHUNK_MIN_BYTES", str(2 * 1024 * 1024)))
+TRANSCRIBE_CHUNK_SECONDS = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", "180"))
+TRANSCRIBE_MAX_UPLOAD_BYTES = int(os.getenv("TRANSCRIBE_MAX_UPLOAD_BYTES", str(24 * 1024 * 1024)))
+TRANSCRIBE_MAX_CONCURRENCY = int(os.getenv("TRANSCRIBE_MAX_CONCURRENCY", "4"))
+TRANSCRIBE_SILENCE_MIN_MS = int(os.getenv("TRANSCRIBE_SILENCE_MIN_MS", "400"))
+TRANSCRIBE_SILENCE_SEARCH_SECONDS = float(os.getenv("TRANSCRIBE_SILENCE_SEARCH_SECONDS", "30"))
+TRANSCRIBE_CHUNK_FORMAT = os.getenv("TRANSCRIBE_CHUNK_FORMAT", "mp3")
+
+# Server-side normalization of large uploads before transcription
+NORMALIZE_AUDIO_ENABLED = os.getenv("NORMALIZE_AUDIO_ENABLED", "true").lower() == "true"
+NORMALIZE_MIN_BYTES = int(os.getenv("NORMALIZE_MIN_BYTES", str(4 * 1024 * 1024)))
+NORMALIZE_SAMPLE_RATE = int(os.getenv("NORMALIZE_SAMPLE_RATE", "16000"))
+NORMALIZE_FORMAT = os.getenv("NORMALIZE_FORMAT", "ogg")
+NORMALIZE_CODEC = os.getenv("NORMALIZE_CODEC", "libopus")
+NORMALIZE_BITRATE = os.getenv("NORMALIZE_BITRATE", "32k")
+
+# Local fluency measures: pause thresholds (seconds) and the energy-based voice activity pass
+FLUENCY_PAUSE_MIN_SECONDS = float(os.getenv("FLUENCY_PAUSE_MIN_SECONDS", "0.25"))
+FLUENCY_LONG_PAUSE_SECONDS = float(os.getenv("FLUENCY_LONG_PAUSE_SECONDS", "1.0"))
+FLUENCY_VAD_ENABLED = os.getenv("FLUENCY_VAD_ENABLED", "true").lower() == "true"
+FLUENCY_VAD_FRAME_MS = int(os.getenv("FLUENCY_VAD_FRAME_MS", "20"))
+FLUENCY_VAD_THRESHOLD_DB = float(os.getenv("FLUENCY_VAD_THRESHOLD_DB", "30"))
+
+# Live mode (WebSocket, 16-bit mono PCM): an utterance closes after LIVE_UTTERANCE_SILENCE_SECONDS of
+# silence (or at LIVE_UTTERANCE_MAX_SECONDS) and is transcribed right away; utterances with less than
+# LIVE_UTTERANCE_MIN_SECONDS of speech are dropped. Frames quieter than LIVE_VAD_FLOOR_DBFS are never speech.
+LIVE_UTTERANCE_SILENCE_SECONDS = float(os.getenv("LIVE_UTTERANCE_SILENCE_SECONDS", "0.8"))
+LIVE_UTTERANCE_MAX_SECONDS = float(os.getenv("LIVE_UTTERANCE_MAX_SECONDS", "30"))
+LIVE_UTTERANCE_MIN_SECONDS = float(os.getenv("LIVE_UTTERANCE_MIN_SECONDS", "0.3"))
+LIVE_UTTERANCE_PADDING_SECONDS = float(os.getenv("LIVE_UTTERANCE_PADDING_SECONDS", "0.2"))
+LIVE_VAD_FLOOR_DBFS = float(os.getenv("LIVE_VAD_FLOOR_DBFS", "-50"))
+LIVE_VAD_WINDOW_SECONDS = float(os.getenv("LIVE_VAD_WINDOW_SECONDS", "30"))
+LIVE_MAX_SECONDS = float(os.getenv("LIVE_MAX_SECONDS", "1200"))
+LIVE_SAMPLE_RATES = (8000, 16000, 22050, 24000, 44100, 48000)
+
+# Local lexical profile: MTLD threshold, repetition cut-off and how much of the transcript the vocabulary prompt gets
+LEXICAL_MTLD_THRESHOLD = float(os.getenv("LEXICAL_MTLD_THRESHOLD", "0.72"))
+LEXICAL_REPEAT_MIN = int(os.getenv("LEXICAL_REPEAT_MIN", "3"))
+LEXICAL_MAX_LISTED = int(os.getenv("LEXICAL_MAX_LISTED", "15"))
+LEXICAL_MAX_EXCERPTS = int(os.getenv("LEXICAL_MAX_EXCERPTS", "12"))
+LEXICAL_EXCERPT_MAX_WORDS = int(os.getenv("LEXICAL_EXCERPT_MAX_WORDS", "40"))
+
+# Grammar pre-pass: sentences of context around each flagged one, caps on what the grammar prompt gets
+GRAMMAR_CONTEXT_SENTENCES = int(os.getenv("GRAMMAR_CONTEXT_SENTENCES", "1"))
+GRAMMAR_MAX_FLAGGED = int(os.getenv("GRAMMAR_MAX_FLAGGED", "40"))
+GRAMMAR_RANGE_SAMPLES = int(os.getenv("GRAMMAR_RANGE_SAMPLES", "3"))
+GRAMMAR_MAX_SENTENCE_WORDS = int(os.getenv("GRAMMAR_MAX_SENTENCE_WORDS", "50"))
+
+_http_client: Optional[httpx.AsyncClient] = None
+_openai_client: Optional[AsyncOpenAI] = None
+_llms: Dict[str, ChatOpenAI] = {}
+_structured_llms: Dict[Tuple[Type[BaseModel], str], Runnable] = {}
+_clients_lock = threading.Lock()
+
+def _check_api_key():
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY not found in environment variables.")
-    
-    return ChatOpenAI(model="gpt-4o", temperature=0)
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide keep-alive HTTP client used for OpenAI requests.
+    """
+    global _http_client
+    if _http_client is None:
+        with _clients_lock:
+            if _http_client is None:
+                _http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+                    ),
+                    timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+                )
+    return _http_client
+
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Returns the shared AsyncOpenAI client (used for Whisper transcription).
+    """
+    global _openai_client
+    if _openai_client is None:
+        _check_api_key()
+        http_client = get_http_client()
+        with _clients_lock:
+            if _openai_client is None:
+                _openai_client = AsyncOpenAI(
+                    http_client=http_client,
+                    timeout=OPENAI_TIMEOUT,
+                    max_retries=OPENAI_MAX_RETRIES,
+                )
+    return _openai_client
+
+def get_llm(model: Optional[str] = None) -> ChatOpenAI:
+    """
+    Returns the shared, configured ChatOpenAI instance for a model (LLM_MODEL
+    by default), on LLM_BASE_URL when set.
+    """
+    model = model or LLM_MODEL
+    llm = _llms.get(model)
+    if llm is None:
+        if not LLM_BASE_URL:
+            _check_api_key()
+        http_client = get_http_client()
+        with _clients_lock:
+            llm = _llms.get(model)
+            if llm is None:
+                llm = ChatOpenAI(
+                    model=model,
+                    temperature=0,
+                    http_async_client=http_client,
+                    request_timeout=OPENAI_TIMEOUT,
+                    max_retries=OPENAI_MAX_RETRIES,
+                    # Local servers usually ignore the key, but the client requires one
+                    base_url=LLM_BASE_URL or None,
+                    api_key=(LLM_API_KEY or os.getenv("OPENAI_API_KEY") or "local") if LLM_BASE_URL else None,
+                )
+                _llms[model] = llm
+    return llm
+
+def get_structured_llm(schema: Type[BaseModel], model: Optional[str] = None) -> Runnable:
+    """
+    Returns the shared LLM bound to a structured-output schema, cached per schema class and model.
+    """
+    key = (schema, model or LLM_MODEL)
+    structured_llm = _structured_llms.get(key)
+    if structured_llm is None:
+        options = {"method": LLM_STRUCTURED_OUTPUT_METHOD} if LLM_STRUCTURED_OUTPUT_METHOD else {}
+        structured_llm = get_llm(model).with_structured_output(schema, **options)
+        with _clients_lock:
+            structured_llm = _structured_llms.setdefault(key, structured_llm)
+    return structured_llm
+
+async def set_http_client(
+    http_client: Optional[httpx.AsyncClient],
+    close_previous: bool = True,
+) -> Optional[httpx.AsyncClient]:
+    """
+    Replaces the shared HTTP pool (e.g. with one routed to a fake backend in
+    benchmarks) and drops the clients built on the previous one. The previous
+    pool is closed; with close_previous=False it is returned instead, for the
+    caller to put back later.
+    """
+    global _http_client, _openai_client
+    with _clients_lock:
+        previous = _http_client
+        _http_client = http_client
+        _openai_client = None
+        _llms.clear()
+        _structured_llms.clear()
+    if not close_previous:
+        return previous
+    if previous is not None and previous is not http_client:
+        await previous.aclose()
+    return None
+
+async def close_clients():
+    """
+    Closes the shared HTTP pool and drops every cached client.
+    """
+    global _http_client, _openai_client
+    with _clients_lock:
+        http_client = _http_client
+        _http_client = None
+        _openai_client = None
+        _llms.clear()
+        _structured_llms.clear()
+    if http_client is not None:
+        await http_client.aclose()
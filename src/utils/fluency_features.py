@@ -0,0 +1,186 @@
+import re
+from typing import Any, Dict, List, Optional
+import numpy as np
+from pydub import AudioSegment
+from src.utils.config import (
+    FLUENCY_PAUSE_MIN_SECONDS,
+    FLUENCY_LONG_PAUSE_SECONDS,
+    FLUENCY_VAD_FRAME_MS,
+    FLUENCY_VAD_THRESHOLD_DB,
+)
+
+# Hesitation sounds counted as filled pauses (Whisper drops some of them)
+FILLED_PAUSES = {"um", "umm", "uh", "uhm", "er", "erm", "ah", "eh", "hmm", "mm"}
+
+# Voiced runs shorter than this are clicks or breaths, not speech
+MIN_VOICED_SECONDS = 0.06
+
+_TOKEN = re.compile(r"[a-z']+")
+
+def voice_activity(
+    audio: AudioSegment,
+    frame_ms: int = FLUENCY_VAD_FRAME_MS,
+    threshold_db: float = FLUENCY_VAD_THRESHOLD_DB,
+    min_pause: float = FLUENCY_PAUSE_MIN_SECONDS,
+) -> Dict[str, Any]:
+    """
+    Energy-based voice activity detection over a decoded recording.
+
+    Frames whose RMS level is within threshold_db of the recording's loud end
+    (95th percentile) count as speech. Silences shorter than min_pause are
+    treated as part of the surrounding speech.
+
+    Returns:
+        speech_start / speech_end (seconds), speech_seconds (voiced time between
+        them) and pauses ([start, end] silences inside the speech)
+    """
+    samples = audio.get_array_of_samples()
+    signal = np.frombuffer(samples, dtype=samples.typecode).astype(np.float32)
+    if audio.channels > 1:
+        signal = signal[:len(signal) - len(signal) % audio.channels].reshape(-1, audio.channels).mean(axis=1)
+
+    frame_length = max(1, audio.frame_rate * frame_ms // 1000)
+    frame_count = len(signal) // frame_length
+    if frame_count == 0:
+        return {"speech_start": None, "speech_end": None, "speech_seconds": 0.0, "pauses": []}
+
+    frames = signal[:frame_count * frame_length].reshape(frame_count, frame_length)
+    level = 20 * np.log10(np.maximum(np.sqrt(np.mean(np.square(frames), axis=1)), 1e-6))
+    # Relative to the loud end, but never below the noise floor
+    threshold = max(np.percentile(level, 95) - threshold_db, np.percentile(level, 10) + 3)
+    voiced = level > threshold
+
+    # Voiced runs as [start, end) frame indices
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+    frame_seconds = frame_length / audio.frame_rate
+    starts, ends = edges[0::2] * frame_seconds, edges[1::2] * frame_seconds
+    keep = ends - starts >= MIN_VOICED_SECONDS
+    starts, ends = starts[keep], ends[keep]
+    if len(starts) == 0:
+        return {"speech_start": None, "speech_end": None, "speech_seconds": 0.0, "pauses": []}
+
+    gap_starts, gap_ends = ends[:-1], starts[1:]
+    is_pause = gap_ends - gap_starts >= min_pause
+    pauses = np.stack([gap_starts[is_pause], gap_ends[is_pause]], axis=1)
+    speech_seconds = (ends[-1] - starts[0]) - float(np.sum(pauses[:, 1] - pauses[:, 0]))
+    return {
+        "speech_start": round(float(starts[0]), 3),
+        "speech_end": round(float(ends[-1]), 3),
+        "speech_seconds": round(float(speech_seconds), 3),
+        "pauses": np.round(pauses, 3).tolist(),
+    }
+
+def _timeline(words: Optional[List[Dict[str, Any]]], segments: Optional[List[Dict[str, Any]]]):
+    """
+    Timed units of speech: word timestamps when available, else segments.
+
+    Returns:
+        (source, starts, ends, word counts), or None without timestamps
+    """
+    if words:
+        starts = np.array([word["start"] for word in words], dtype=float)
+        ends = np.array([word["end"] for word in words], dtype=float)
+        return "words", starts, ends, np.ones(len(words))
+    if segments:
+        starts = np.array([segment["start"] for segment in segments], dtype=float)
+        ends = np.array([segment["end"] for segment in segments], dtype=float)
+        counts = np.array([len(segment["text"].split()) for segment in segments], dtype=float)
+        return "segments", starts, ends, counts
+    return None
+
+def _pause_distribution(lengths: np.ndarray, min_pause: float, long_pause: float) -> Dict[str, int]:
+    bins = sorted({min_pause, 0.5, long_pause, 2.0})
+    bins = [edge for edge in bins if edge >= min_pause] + [np.inf]
+    counts, _ = np.histogram(lengths, bins=bins)
+    labels = [f"{low:g}-{high:g}s" if np.isfinite(high) else f"{low:g}s+" for low, high in zip(bins, bins[1:])]
+    return dict(zip(labels, counts.tolist()))
+
+def extract_fluency_features(
+    transcript: str,
+    duration: Optional[float],
+    words: Optional[List[Dict[str, Any]]] = None,
+    segments: Optional[List[Dict[str, Any]]] = None,
+    activity: Optional[Dict[str, Any]] = None,
+    min_pause: float = FLUENCY_PAUSE_MIN_SECONDS,
+    long_pause: float = FLUENCY_LONG_PAUSE_SECONDS,
+) -> Dict[str, Any]:
+    """
+    Computes temporal fluency measures from Whisper timestamps and, when given,
+    the voice activity of the recording.
+
+    Pauses come from the voice activity pass if available (Whisper timestamps
+    tend to stretch words over short silences), else from the gaps between
+    timed words or segments. Rates are in words per minute.
+    """
+    duration = duration or 0.0
+    tokens = _TOKEN.findall(transcript.lower())
+    word_count = len(transcript.split())
+    filled_pauses = sum(token in FILLED_PAUSES for token in tokens)
+    timeline = _timeline(words, segments)
+
+    if activity and activity.get("speech_start") is not None:
+        pauses = np.array(activity["pauses"], dtype=float).reshape(-1, 2)
+        phonation_seconds = activity["speech_seconds"]
+        pause_source = "audio"
+    elif timeline is not None:
+        _, starts, ends, _ = timeline
+        gaps = starts[1:] - ends[:-1]
+        is_pause = gaps >= min_pause
+        pauses = np.stack([ends[:-1][is_pause], starts[1:][is_pause]], axis=1)
+        phonation_seconds = float(ends[-1] - starts[0] - np.sum(gaps[is_pause]))
+        pause_source = timeline[0]
+    else:
+        pauses = np.empty((0, 2))
+        phonation_seconds = duration
+        pause_source = "none"
+
+    lengths = pauses[:, 1] - pauses[:, 0]
+    long_pauses = lengths >= long_pause
+
+    # Mean length of run: words between consecutive pauses, placing each timed
+    # unit by its midpoint
+    if timeline is not None and len(pauses):
+        _, starts, ends, counts = timeline
+        run_index = np.searchsorted(pauses[:, 0], (starts + ends) / 2)
+        runs = np.bincount(run_index, weights=counts)
+        runs = runs[runs > 0]
+        mean_length_of_run = float(np.mean(runs)) if len(runs) else float(word_count)
+    else:
+        mean_length_of_run = float(word_count)
+
+    minutes = duration / 60
+    return {
+        "word_count": word_count,
+        "speech_rate": round(word_count / minutes, 2) if minutes > 0 else 0.0,
+        "articulation_rate": round(word_count / (phonation_seconds / 60), 2) if phonation_seconds > 0 else 0.0,
+        "phonation_ratio": round(min(1.0, phonation_seconds / duration), 3) if duration > 0 else 0.0,
+        "pause_count": int(len(lengths)),
+        "pauses_per_minute": round(len(lengths) / minutes, 2) if minutes > 0 else 0.0,
+        "mean_pause": round(float(np.mean(lengths)), 3) if len(lengths) else 0.0,
+        "median_pause": round(float(np.median(lengths)), 3) if len(lengths) else 0.0,
+        "p90_pause": round(float(np.percentile(lengths, 90)), 3) if len(lengths) else 0.0,
+        "max_pause": round(float(np.max(lengths)), 3) if len(lengths) else 0.0,
+        "pause_distribution": _pause_distribution(lengths, min_pause, long_pause),
+        "long_pause_count": int(np.sum(long_pauses)),
+        "long_pause_ratio": round(float(np.mean(long_pauses)), 3) if len(lengths) else 0.0,
+        "mean_length_of_run": round(mean_length_of_run, 2),
+        "filled_pause_count": filled_pauses,
+        "filled_pauses_per_100_words": round(filled_pauses / word_count * 100, 2) if word_count else 0.0,
+        "pause_source": pause_source,
+    }
+
+def format_fluency_features(features: Dict[str, Any]) -> str:
+    """
+    Renders the measures as compact prompt lines.
+    """
+    distribution = ", ".join(f"{label}: {count}" for label, count in features["pause_distribution"].items())
+    return "\n".join([
+        f"- Speech rate: {features['speech_rate']:.1f} WPM; articulation rate (excluding pauses): {features['articulation_rate']:.1f} WPM",
+        f"- Phonation time ratio: {features['phonation_ratio']:.0%}",
+        f"- Pauses: {features['pause_count']} ({features['pauses_per_minute']:.1f}/min), "
+        f"mean {features['mean_pause']:.2f}s, median {features['median_pause']:.2f}s, p90 {features['p90_pause']:.2f}s, max {features['max_pause']:.2f}s",
+        f"- Pause lengths: {distribution}",
+        f"- Long pauses: {features['long_pause_count']} ({features['long_pause_ratio']:.0%} of pauses)",
+        f"- Mean length of run: {features['mean_length_of_run']:.1f} words between pauses",
+        f"- Filled pauses (um, uh, er): {features['filled_pause_count']} ({features['filled_pauses_per_100_words']:.1f} per 100 words)",
+    ])
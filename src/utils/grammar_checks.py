@@ -0,0 +1,241 @@
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Pattern, Tuple
+from src.utils.config import (
+    GRAMMAR_CONTEXT_SENTENCES,
+    GRAMMAR_MAX_FLAGGED,
+    GRAMMAR_RANGE_SAMPLES,
+    GRAMMAR_MAX_SENTENCE_WORDS,
+)
+
+class GrammarCheck(NamedTuple):
+    """
+    One pattern-based check, run over a lowercased sentence.
+    """
+    name: str
+    category: str   # agreement, article, tense, verb form, plural or interference
+    pattern: Pattern
+
+_SENTENCE = re.compile(r"[^.!?]+[.!?]*")
+_WORD = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+_BASE_VERBS = r"(?:go|like|want|work|live|need|think|make|take|come|know|say|get|play|study|love|enjoy|have|do|watch|feel|try|use|look|seem|help|spend)"
+_PAST_FORMS = r"(?:went|saw|came|took|made|got|had|was|were|ate|bought|did|gave|told|said|found|thought|felt|left|met)"
+# Subjects of a bare infinitive ("does he go", "let it go") are not finite verbs
+_BARE_INFINITIVE_LOOKBEHIND = (
+    r"(?<!\bdoes )(?<!\bdid )(?<!\bcan )(?<!\bwill )(?<!\bmay )(?<!\bmust )(?<!\bwould )(?<!\bcould )"
+    r"(?<!\bshould )(?<!\bmight )(?<!\bmake )(?<!\bmade )(?<!\blet )(?<!\bhelp )(?<!\bsee )(?<!\bwatch )"
+)
+
+CHECKS = (
+    GrammarCheck("subject-verb agreement", "agreement", re.compile(
+        r"\b(?:he|she|it|this|everybody|everyone|nobody|somebody|someone)\s+(?:are|were|have|do|don't)\b"
+        r"|\b(?:i|you|we|they)\s+(?:is|has|does|doesn't)\b"
+        r"|\b(?:you|we|they)\s+was\b"
+        r"|\bpeople\s+(?:is|was|has|does)\b"
+        r"|\bthere\s+(?:is|was)\s+(?:many|a lot of|lots of|several|some people|two|three|four|five)\b"
+    )),
+    GrammarCheck("third person -s", "agreement", re.compile(
+        _BARE_INFINITIVE_LOOKBEHIND + r"\b(?:he|she|it|my (?:mother|father|brother|sister|friend))\s+(?:always |usually |often |never |really |also )?" + _BASE_VERBS + r"\b"
+    )),
+    GrammarCheck("article before vowel sound", "article", re.compile(
+        r"\ba\s+(?!(?:uni|use|usu|euro|one|once)\w*)[aeiou]\w*|\ban\s+(?!(?:hour|honest|honour|heir)\w*)[b-df-hj-np-tv-z]\w*"
+    )),
+    GrammarCheck("missing article", "article", re.compile(
+        r"\b(?:is|was|have|has|had|it's)\s+(?:very\s+|really\s+)?(?:good|great|big|nice|small|bad|long|new|important)\s+"
+        r"(?:idea|place|job|time|way|experience|person|city|house|problem|chance|opportunity|day)\b"
+    )),
+    GrammarCheck("article with a general noun", "article", re.compile(
+        r"\bthe\s+(?:society|nature|technology|happiness|money|education)\s+(?:is|are|has|have|can|should)\b"
+    )),
+    GrammarCheck("modal followed by to", "verb form", re.compile(
+        r"\b(?:can|could|should|must|will|would|may|might)\s+(?:not\s+)?to\s+[a-z]+"
+    )),
+    GrammarCheck("tense after did or will", "tense", re.compile(
+        r"\b(?:did|didn't|did not|will|won't|will not)\s+" + _PAST_FORMS + r"\b|\bwill\s+[a-z]+ed\b"
+    )),
+    GrammarCheck("be with a base verb", "verb form", re.compile(
+        r"\b(?:i am|i'm|he is|she is|we are|they are)\s+(?:live|work|study|go|like|want|agree|come|play)\b"
+    )),
+    GrammarCheck("plural after a quantity", "plural", re.compile(
+        r"\b(?:two|three|four|five|six|seven|eight|nine|ten|many|several|few|various|these|those)\s+"
+        r"(?:year|month|day|week|time|friend|thing|book|country|city|hour|reason|member|student|problem|place|child)\b"
+        r"|\bone of (?:the|my|his|her|our|their)\s+(?:\w+\s+)?"
+        r"(?:friend|thing|reason|place|person|problem|city|country|way|member|student|hobby|book)\b"
+    )),
+    GrammarCheck("uncountable noun as plural", "plural", re.compile(
+        r"\b(?:informations|advices|furnitures|equipments|homeworks|knowledges|researches|luggages|peoples|staffs|evidences)\b"
+    )),
+    GrammarCheck("double comparative", "interference", re.compile(
+        r"\bmore\s+(?:better|bigger|easier|happier|cheaper|faster|larger|smaller|worse|older|younger|healthier)\b"
+        r"|\bmost\s+(?:best|biggest|easiest|happiest|cheapest|largest|smallest|worst)\b"
+    )),
+    GrammarCheck("common learner pattern", "interference", re.compile(
+        r"\b(?:discuss about|explain me|i am agree|i'm agree|despite of|return back|married with|i very like"
+        r"|make me to|let me to|since \w+ (?:years|months|days) ago|although\b[^,]*,\s*but|because of [a-z]+ (?:is|are|was))\b"
+    )),
+)
+
+_PAST_MARKERS = re.compile(r"\b(?:yesterday|ago|last (?:week|month|year|night|summer|winter|weekend)|when i was (?:a )?(?:child|kid|young|little)|in (?:19|20)\d\d)\b")
+_PRESENT_AFTER_SUBJECT = re.compile(r"\b(?:i|we|they|he|she)\s+(?:go|have|take|come|see|eat|buy|visit|is|are|do|make)\b")
+
+# Complexity markers
+_SUBORDINATORS = re.compile(
+    r"\b(?:because|although|though|while|whereas|unless|if|since|until|whenever|wherever|even though|so that"
+    r"|which|who|whom|whose|where|when|after|before)\b"
+)
+_CLAUSE_COORDINATION = re.compile(r"\b(?:and|but|or|so)\s+(?:i|you|he|she|it|we|they|there|this|that)\b")
+_RELATIVE = re.compile(r"\b(?:which|who|whom|whose)\b")
+_CONDITIONAL = re.compile(r"\b(?:if|unless)\b")
+_PASSIVE = re.compile(r"\b(?:is|are|was|were|been|being|be)\s+(?:\w+ly\s+)?(?:[a-z]+ed|built|made|given|taken|known|seen|done|written|born|told|held|found)\b")
+_PERFECT = re.compile(r"\b(?:have|has|had|i've|we've|they've|you've)\s+(?:\w+ly\s+)?(?:been|[a-z]+ed|gone|done|seen|made|taken|had|known|become)\b")
+_CONTINUOUS = re.compile(r"\b(?:am|is|are|was|were|i'm|we're|they're)\s+[a-z]+ing\b")
+_FUTURE = re.compile(r"\b(?:will|won't|i'll|we'll|going to)\b")
+_PAST = re.compile(r"\b(?:[a-z]+ed|" + _PAST_FORMS + r")\b")
+
+def split_sentences(transcript: str, max_words: int = GRAMMAR_MAX_SENTENCE_WORDS) -> List[str]:
+    """
+    Splits a transcript at sentence punctuation; unpunctuated runs longer than
+    max_words are cut into max_words pieces.
+    """
+    sentences = []
+    for text in _SENTENCE.findall(transcript):
+        words = text.split()
+        for start in range(0, len(words), max_words):
+            sentences.append(" ".join(words[start:start + max_words]))
+    return sentences
+
+TENSE_CONSISTENCY = GrammarCheck("tense consistency", "tense", _PAST_MARKERS)
+
+def check_sentence(sentence: str) -> List[GrammarCheck]:
+    """
+    The checks a sentence trips, in CHECKS order. Tense consistency flags a
+    past time marker next to a present-tense verb.
+    """
+    lower = sentence.lower()
+    found = [check for check in CHECKS if check.pattern.search(lower)]
+    if _PAST_MARKERS.search(lower) and _PRESENT_AFTER_SUBJECT.search(lower):
+        found.append(TENSE_CONSISTENCY)
+    return found
+
+def _complexity(sentences: List[str]) -> Tuple[Dict[str, Any], List[int]]:
+    """
+    Clause and structure counts over all sentences, plus per-sentence clause
+    counts (a clause per subordinator or coordinated subject, plus one).
+    """
+    clauses = []
+    subordinate = relative = conditional = passive = 0
+    tenses = {"present": 0, "past": 0, "future": 0, "perfect": 0, "continuous": 0}
+    for sentence in sentences:
+        lower = sentence.lower()
+        subordinators = len(_SUBORDINATORS.findall(lower))
+        clauses.append(1 + subordinators + len(_CLAUSE_COORDINATION.findall(lower)))
+        subordinate += subordinators
+        relative += len(_RELATIVE.findall(lower))
+        conditional += len(_CONDITIONAL.findall(lower))
+        passive += len(_PASSIVE.findall(lower))
+        tenses["past"] += bool(_PAST.search(lower))
+        tenses["future"] += bool(_FUTURE.search(lower))
+        tenses["perfect"] += bool(_PERFECT.search(lower))
+        tenses["continuous"] += bool(_CONTINUOUS.search(lower))
+        tenses["present"] += bool(_PRESENT_AFTER_SUBJECT.search(lower))
+    total_clauses = sum(clauses)
+    word_count = sum(len(_WORD.findall(sentence.lower())) for sentence in sentences)
+    stats = {
+        "sentence_count": len(sentences),
+        "mean_sentence_length": round(word_count / len(sentences), 1) if sentences else 0.0,
+        "clause_count": total_clauses,
+        "clauses_per_sentence": round(total_clauses / len(sentences), 2) if sentences else 0.0,
+        "subordination_ratio": round(subordinate / total_clauses, 3) if total_clauses else 0.0,
+        "complex_sentence_share": round(sum(count > 1 for count in clauses) / len(sentences), 3) if sentences else 0.0,
+        "relative_clauses": relative,
+        "conditionals": conditional,
+        "passives": passive,
+        "sentences_by_tense": tenses,
+    }
+    return stats, clauses
+
+def grammar_prepass(
+    transcript: str,
+    context: int = GRAMMAR_CONTEXT_SENTENCES,
+    max_flagged: int = GRAMMAR_MAX_FLAGGED,
+    range_samples: int = GRAMMAR_RANGE_SAMPLES,
+) -> Dict[str, Any]:
+    """
+    Splits the transcript into sentences, flags the suspicious ones and
+    computes complexity statistics.
+
+    Returns:
+        sentences, flagged ({index, checks}, at most max_flagged), flags per
+        category among them, context (indices of the flagged sentences and their
+        neighbours), range_samples (indices of the most complex clean
+        sentences) and complexity
+    """
+    sentences = split_sentences(transcript)
+    flagged = []
+    suspicious = set()
+    categories: Dict[str, int] = {}
+    for index, sentence in enumerate(sentences):
+        checks = check_sentence(sentence)
+        if not checks:
+            continue
+        # Flagged sentences past the cap are not shown, but are not clean either
+        suspicious.add(index)
+        if len(flagged) < max_flagged:
+            flagged.append({"index": index, "checks": [check.name for check in checks]})
+            # Counted over the sentences shown, so they add up with "flagged"
+            for check in checks:
+                categories[check.category] = categories.get(check.category, 0) + 1
+
+    shown = set()
+    for item in flagged:
+        shown.update(range(max(0, item["index"] - context), min(len(sentences), item["index"] + context + 1)))
+
+    complexity, clauses = _complexity(sentences)
+    clean = sorted((index for index in range(len(sentences)) if index not in shown and index not in suspicious), key=lambda index: (-clauses[index], index))
+    return {
+        "sentences": sentences,
+        "flagged": flagged,
+        "categories": categories,
+        "context": sorted(shown),
+        "range_samples": sorted(clean[:range_samples]),
+        "complexity": complexity,
+    }
+
+def format_flagged(prepass: Dict[str, Any]) -> str:
+    """
+    Renders the flagged sentences with their context as numbered lines;
+    flagged ones are marked with ">>" and the checks they tripped.
+    """
+    sentences = prepass["sentences"]
+    checks = {item["index"]: item["checks"] for item in prepass["flagged"]}
+    lines = []
+    previous: Optional[int] = None
+    for index in prepass["context"]:
+        if previous is not None and index != previous + 1:
+            lines.append("...")
+        if index in checks:
+            lines.append(f">> [{index + 1}] {sentences[index]}  (check: {', '.join(checks[index])})")
+        else:
+            lines.append(f"   [{index + 1}] {sentences[index]}")
+        previous = index
+    return "\n".join(lines) or "(no sentences were flagged)"
+
+def format_range_samples(prepass: Dict[str, Any]) -> str:
+    sentences = prepass["sentences"]
+    return "\n".join(f"- {sentences[index]}" for index in prepass["range_samples"]) or "- (none)"
+
+def format_complexity(prepass: Dict[str, Any]) -> str:
+    """
+    Renders the complexity statistics as compact prompt lines.
+    """
+    stats = prepass["complexity"]
+    tenses = ", ".join(f"{tense} {count}" for tense, count in stats["sentences_by_tense"].items())
+    categories = ", ".join(f"{category} {count}" for category, count in sorted(prepass["categories"].items()))
+    return "\n".join([
+        f"- Sentences: {stats['sentence_count']} (mean {stats['mean_sentence_length']:.1f} words); "
+        f"{len(prepass['flagged'])} flagged by the local checks ({categories or 'none'})",
+        f"- Clauses: {stats['clause_count']} ({stats['clauses_per_sentence']:.2f} per sentence); "
+        f"subordination ratio {stats['subordination_ratio']:.0%}; complex sentences {stats['complex_sentence_share']:.0%}",
+        f"- Relative clauses: {stats['relative_clauses']}; conditionals: {stats['conditionals']}; passives: {stats['passives']}",
+        f"- Sentences using each tense/aspect: {tenses}",
+    ])
@@ -0,0 +1,213 @@
+import asyncio
+import functools
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import openai
+from src.utils.config import (
+    NODE_DEADLINE_SECONDS, NODE_DEADLINES, DEGRADED_SECTION_POLICY,
+    HEDGE_ENABLED, HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES, HEDGE_MIN_DELAY, HEDGE_MAX_RATIO, HEDGE_WINDOW,
+)
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class LatencyTracker:
+    """
+    Recent latencies and hedging counters of one node's LLM calls.
+    """
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self.samples: deque = deque(maxlen=window)
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self.degraded = 0
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def hedge_delay(self, governor=None) -> Optional[float]:
+        """
+        How long to wait before firing a duplicate request, or None to not hedge:
+        hedging is off, there are too few samples yet, the hedge budget
+        (HEDGE_MAX_RATIO of calls) is spent, or the rate governor is congested
+        (a duplicate would only spend quota while calls are waiting or throttled).
+        """
+        if not HEDGE_ENABLED or len(self.samples) < HEDGE_MIN_SAMPLES:
+            return None
+        if self.hedged >= HEDGE_MAX_RATIO * self.calls:
+            return None
+        if governor is not None and governor.congested:
+            return None
+        return max(HEDGE_MIN_DELAY, self.percentile(HEDGE_PERCENTILE))
+
+    def get_stats(self) -> Dict[str, Any]:
+        def rounded(value):
+            return round(value, 3) if value is not None else None
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+            "degraded": self.degraded,
+            "samples": len(self.samples),
+            "p50": rounded(self.percentile(50)),
+            "p90": rounded(self.percentile(90)),
+            "p99": rounded(self.percentile(99)),
+        }
+
+_trackers: Dict[str, LatencyTracker] = {}
+
+def get_tracker(name: str) -> LatencyTracker:
+    tracker = _trackers.get(name)
+    if tracker is None:
+        tracker = _trackers[name] = LatencyTracker()
+    return tracker
+
+def get_hedge_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: tracker.get_stats() for name, tracker in _trackers.items()}
+
+async def hedged_call(name: str, request: Callable[[], Awaitable[Any]], governor=None, tokens: float = 0) -> Any:
+    """
+    Runs request(), firing a duplicate if it has not answered within the node's
+    recent p90 latency, and returns the first successful result.
+
+    Call it inside the rate governor's slot (see invoke_llm), so the delay
+    times the upstream request only. The duplicate needs a slot of its own
+    from governor.try_acquire(); when none is free right away, no duplicate
+    is sent.
+
+    The loser is cancelled. A failed attempt does not fail the call while the
+    other one is still running. The primary attempt's time is recorded for
+    every call, also when it fails or is cancelled (then as a lower bound),
+    so slow calls are not left out of the percentiles.
+    """
+    tracker = get_tracker(name)
+    tracker.calls += 1
+    delay = tracker.hedge_delay(governor)
+
+    async def attempt():
+        started = time.monotonic()
+        try:
+            return await request()
+        finally:
+            tracker.record(time.monotonic() - started)
+
+    async def duplicate():
+        try:
+            return await request()
+        finally:
+            governor.release()
+
+    primary = asyncio.create_task(attempt())
+    tasks = [primary]
+    try:
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and (governor is None or governor.try_acquire(tokens)):
+                tracker.hedged += 1
+                logger.info(f"[HEDGE] {name}: no answer after {delay:.1f}s, sending a duplicate request")
+                tasks.append(asyncio.create_task(duplicate() if governor is not None else request()))
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        tracker.hedge_wins += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Mark the loser's exception as retrieved
+                task.exception()
+
+def get_node_deadline(name: str) -> float:
+    return NODE_DEADLINES.get(name, NODE_DEADLINE_SECONDS)
+
+def unavailable_section(reason: str) -> Dict[str, Any]:
+    """
+    State value recorded for a section whose analysis could not be produced.
+    """
+    return {"unavailable": True, "reason": reason}
+
+def is_unavailable(analysis: Optional[Dict[str, Any]]) -> bool:
+    return isinstance(analysis, dict) and analysis.get("unavailable") is True
+
+class _DeadlineBudget:
+    def __init__(self, seconds: float):
+        self.remaining = seconds
+
+# Upstream time left to the analysis node the current task is running
+_deadline_budget: ContextVar[Optional[_DeadlineBudget]] = ContextVar("deadline_budget", default=None)
+
+def within_node_deadline(request: Callable[[], Awaitable[Any]]) -> Callable[[], Awaitable[Any]]:
+    """
+    Bounds request() by what is left of the current node's deadline. The clock
+    runs only while request() does, i.e. once the rate governor has granted
+    the slot (see invoke_llm): time queued or backing off after a 429 is not
+    counted. Outside a node_deadline() node, request is returned as is.
+    """
+    budget = _deadline_budget.get()
+    if budget is None:
+        return request
+
+    async def bounded():
+        if budget.remaining <= 0:
+            raise asyncio.TimeoutError()
+        started = time.monotonic()
+        try:
+            return await asyncio.wait_for(request(), budget.remaining)
+        finally:
+            budget.remaining -= time.monotonic() - started
+    return bounded
+
+def node_deadline(name: str, state_keys: List[str]):
+    """
+    Bounds the upstream time of an analysis node's LLM calls by its deadline
+    (NODE_DEADLINES / NODE_DEADLINE_SECONDS). Time spent waiting for the rate
+    governor does not count, so local queueing alone never makes a section
+    unavailable.
+
+    With DEGRADED_SECTION_POLICY="unavailable", a node that times out or whose
+    upstream call fails after retries marks its sections unavailable instead of
+    failing the assessment; with "fail" the error propagates. Apply it outside
+    memoize_analysis so degraded results are never cached.
+    """
+    def decorator(node):
+        @functools.wraps(node)
+        async def wrapper(state):
+            deadline = get_node_deadline(name)
+            token = _deadline_budget.set(_DeadlineBudget(deadline) if deadline > 0 else None)
+            try:
+                return await node(state)
+            except (asyncio.TimeoutError, openai.APIError) as e:
+                tracker = get_tracker(name)
+                if isinstance(e, asyncio.TimeoutError):
+                    tracker.timeouts += 1
+                    reason = f"analysis timed out after {deadline:g}s"
+                else:
+                    reason = f"analysis failed ({type(e).__name__})"
+                if DEGRADED_SECTION_POLICY != "unavailable":
+                    raise
+                tracker.degraded += 1
+                logger.warning(f"[DEGRADED] {name}: {reason}")
+                return {key: unavailable_section(reason) for key in state_keys}
+            finally:
+                _deadline_budget.reset(token)
+        return wrapper
+    return decorator
@@ -0,0 +1,175 @@
+import abc
+import json
+import sqlite3
+import threading
+import time
+import asyncio
+from typing import Any, Dict, Optional
+
+# Job lifecycle: queued -> running -> completed | failed
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+class JobStore(abc.ABC):
+    """
+    Storage interface for assessment jobs. A job is a dict with job_id, status,
+    created_at, updated_at, result (final feedback) and error.
+    """
+    @abc.abstractmethod
+    async def create(self, job_id: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def update(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def fail_unfinished(self, error: str) -> int:
+        """
+        Marks queued/running jobs as failed, e.g. after a restart lost their audio.
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+def _new_job(job_id: str) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "created_at": now,
+        "updated_at": now,
+        "result": None,
+        "error": None,
+    }
+
+class InMemoryJobStore(JobStore):
+    """
+    Keeps jobs in a dict; finished jobs are dropped after ttl seconds.
+    """
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    async def create(self, job_id: str) -> Dict[str, Any]:
+        self._evict_expired()
+        job = _new_job(job_id)
+        self._jobs[job_id] = job
+        return dict(job)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def update(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job.update(status=status, result=result, error=error, updated_at=time.time())
+
+    async def fail_unfinished(self, error: str) -> int:
+        count = 0
+        for job in self._jobs.values():
+            if job["status"] in ("queued", "running"):
+                job.update(status="failed", error=error, updated_at=time.time())
+                count += 1
+        return count
+
+    def _evict_expired(self):
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in ("completed", "failed") and job["updated_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+class SQLiteJobStore(JobStore):
+    """
+    Persists jobs and results in SQLite so they can be fetched after a restart;
+    finished jobs are deleted after ttl seconds. Queries run in a worker thread.
+    """
+    def __init__(self, path: str, ttl: float = 3600):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                result TEXT,
+                error TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (status, updated_at)")
+        self._conn.commit()
+
+    async def create(self, job_id: str) -> Dict[str, Any]:
+        job = _new_job(job_id)
+        await asyncio.to_thread(self._insert, job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = await asyncio.to_thread(self._fetchone,
+            "SELECT job_id, status, created_at, updated_at, result, error FROM jobs WHERE job_id = ?",
+            (job_id,),
+        )
+        if row is None:
+            return None
+        return {
+            "job_id": row[0],
+            "status": row[1],
+            "created_at": row[2],
+            "updated_at": row[3],
+            "result": json.loads(row[4]) if row[4] else None,
+            "error": row[5],
+        }
+
+    async def update(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        await asyncio.to_thread(self._execute,
+            "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE job_id = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id),
+        )
+
+    async def fail_unfinished(self, error: str) -> int:
+        return await asyncio.to_thread(self._execute,
+            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE status IN ('queued', 'running')",
+            (error, time.time()),
+        )
+
+    async def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _insert(self, job: Dict[str, Any]):
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?",
+                    (job["created_at"] - self.ttl,),
+                )
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, status, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                    (job["job_id"], job["status"], job["created_at"], job["updated_at"]),
+                )
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor.rowcount
+
+    def _fetchone(self, sql: str, params: tuple):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
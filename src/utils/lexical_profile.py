@@ -0,0 +1,266 @@
+import functools
+import re
+from collections import Counter
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from src.utils.config import (
+    LEXICAL_MTLD_THRESHOLD,
+    LEXICAL_REPEAT_MIN,
+    LEXICAL_MAX_LISTED,
+    LEXICAL_MAX_EXCERPTS,
+    LEXICAL_EXCERPT_MAX_WORDS,
+)
+from src.utils.lexicon import (
+    BAND_1,
+    BAND_2,
+    BASIC_WORDS,
+    CLITICS,
+    FILLERS,
+    FUNCTION_WORDS,
+    IRREGULAR_FORMS,
+    NEGATED_AUXILIARIES,
+    PHRASES,
+)
+
+# Frequency band of each base form (1 = most frequent); built once per process
+WORD_BANDS: Mapping[str, int] = MappingProxyType({
+    **{word: 2 for word in BAND_2.split()},
+    **{word: 1 for word in BAND_1.split()},
+})
+FUNCTION = frozenset(FUNCTION_WORDS.split())
+BASIC = frozenset(BASIC_WORDS.split())
+FILLER = frozenset(FILLERS.split())
+
+_TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+_SENTENCE = re.compile(r"[^.!?]+[.!?]*")
+
+# Suffix rules tried in order: (suffix, replacements)
+_SUFFIXES = (
+    ("ies", ("y",)), ("ves", ("f", "fe")), ("es", ("", "e")), ("s", ("",)),
+    ("ied", ("y",)), ("ed", ("", "e", "-")), ("ing", ("", "e", "-")),
+    ("ier", ("y",)), ("iest", ("y",)), ("er", ("", "e", "-")), ("est", ("", "e", "-")),
+    ("ily", ("y",)), ("ly", ("", "le")),
+)
+
+def _known(word: str) -> bool:
+    return word in WORD_BANDS or word in FUNCTION
+
+@functools.lru_cache(maxsize=16384)
+def lemmatize(word: str) -> str:
+    """
+    Maps a lowercase word form to its base form: irregular forms from the
+    lexicon, else suffix stripping checked against the word lists. Unknown
+    words are returned unchanged.
+
+    Contractions map to the function word they carry: negatives to their
+    auxiliary (don't -> do, wasn't -> be, won't -> will), 're/'m -> be,
+    'll -> will, 've -> have, 'd -> would. Other apostrophes ('s) keep the
+    word before them.
+    """
+    if "'" in word:
+        host, clitic = word.split("'", 1)
+        if clitic == "t" and host.endswith("n") and len(host) > 1:
+            auxiliary = host[:-1]
+            return NEGATED_AUXILIARIES.get(auxiliary) or lemmatize(auxiliary)
+        if clitic in CLITICS:
+            return CLITICS[clitic]
+        word = host or word
+    if word in IRREGULAR_FORMS:
+        return IRREGULAR_FORMS[word]
+    if _known(word):
+        return word
+    for suffix, replacements in _SUFFIXES:
+        if not word.endswith(suffix) or len(word) <= len(suffix) + 1:
+            continue
+        stem = word[:-len(suffix)]
+        for replacement in replacements:
+            # "-" undoes a doubled final consonant (stopped -> stop)
+            candidate = stem[:-1] if replacement == "-" and len(stem) > 2 and stem[-1] == stem[-2] else stem + replacement.strip("-")
+            if _known(candidate):
+                return candidate
+    return word
+
+def _build_phrase_trie(phrases: str) -> Dict[str, Any]:
+    """
+    Nested dicts keyed by lemma; the "" key of a node holds the phrase ending there.
+    """
+    trie: Dict[str, Any] = {}
+    for phrase in phrases.strip().splitlines():
+        node = trie
+        for token in phrase.split():
+            node = node.setdefault(lemmatize(token), {})
+        node[""] = phrase
+    return trie
+
+PHRASE_TRIE: Mapping[str, Any] = MappingProxyType(_build_phrase_trie(PHRASES))
+
+def _match_phrase(lemmas: List[str], start: int) -> Optional[Tuple[str, int]]:
+    """
+    Longest idiom or collocation starting at lemmas[start], as (phrase, end index).
+    """
+    node = PHRASE_TRIE
+    match = None
+    for index in range(start, len(lemmas)):
+        node = node.get(lemmas[index])
+        if node is None:
+            break
+        if "" in node:
+            match = (node[""], index + 1)
+    return match
+
+def _mtld_pass(words: List[str], threshold: float) -> float:
+    """
+    One directional MTLD pass: number of factors (segments whose running
+    type-token ratio falls to the threshold), counting the remainder partially.
+    """
+    factors = 0.0
+    types = set()
+    count = 0
+    for word in words:
+        types.add(word)
+        count += 1
+        if len(types) / count <= threshold:
+            factors += 1
+            types.clear()
+            count = 0
+    if count:
+        factors += (1 - len(types) / count) / (1 - threshold)
+    return factors
+
+def mtld(words: List[str], threshold: float = LEXICAL_MTLD_THRESHOLD) -> float:
+    """
+    Measure of textual lexical diversity: mean of the forward and backward
+    passes. Unlike the type-token ratio it does not fall with text length.
+    """
+    if not words:
+        return 0.0
+    scores = []
+    for sequence in (words, words[::-1]):
+        factors = _mtld_pass(sequence, threshold)
+        scores.append(len(sequence) / factors if factors else float(len(sequence)))
+    return sum(scores) / 2
+
+def profile_lexis(
+    transcript: str,
+    repeat_min: int = LEXICAL_REPEAT_MIN,
+    max_listed: int = LEXICAL_MAX_LISTED,
+    max_excerpts: int = LEXICAL_MAX_EXCERPTS,
+    excerpt_max_words: int = LEXICAL_EXCERPT_MAX_WORDS,
+) -> Dict[str, Any]:
+    """
+    Computes lexical resource statistics for a transcript.
+
+    Returns type-token ratio, MTLD, frequency-band shares of content words,
+    less common words, idioms and collocations, overused basic words,
+    repeated-word hotspots, and excerpts: the sentences holding those
+    findings, for the vocabulary prompt.
+    """
+    words: List[str] = []
+    lemmas: List[str] = []
+    sentence_of: List[int] = []
+    sentences: List[Tuple[str, int]] = []
+    bands = Counter()
+    positions: Dict[str, List[int]] = {}
+    less_common: Dict[str, str] = {}
+    fillers = 0
+    for text in _SENTENCE.findall(transcript):
+        tokens = _TOKEN.findall(text.lower())
+        first = len(words)
+        for word in tokens:
+            if word in FILLER:
+                fillers += 1
+                continue
+            lemma = lemmatize(word)
+            if lemma not in FUNCTION:
+                band = WORD_BANDS.get(lemma, 3)
+                bands[band] += 1
+                found = positions.get(lemma)
+                if found is None:
+                    positions[lemma] = [len(words)]
+                    if band > 1 and len(lemma) > 2:
+                        less_common[lemma] = word
+                else:
+                    found.append(len(words))
+            words.append(word)
+            lemmas.append(lemma)
+            sentence_of.append(len(sentences))
+        if len(words) > first:
+            sentences.append((text.strip(), len(words) - first))
+
+    phrases: Dict[str, int] = {}
+    for index, lemma in enumerate(lemmas):
+        if lemma in PHRASE_TRIE:
+            match = _match_phrase(lemmas, index)
+            if match is not None:
+                phrases.setdefault(match[0], index)
+
+    content_count = sum(bands.values())
+    repeated = sorted(
+        (lemma for lemma, found in positions.items() if len(found) >= repeat_min),
+        key=lambda lemma: (-len(positions[lemma]), positions[lemma][0]),
+    )[:max_listed]
+    basic = {lemma: len(positions[lemma]) for lemma in BASIC if len(positions.get(lemma, ())) >= 2}
+
+    # Sentences with the most repeated / basic words first, padded with the rest
+    flagged = Counter()
+    for lemma in {*repeated, *basic}:
+        for index in positions[lemma]:
+            flagged[sentence_of[index]] += 1
+    for index in phrases.values():
+        flagged[sentence_of[index]] += 1
+    ranked = sorted(range(len(sentences)), key=lambda sentence: (-flagged[sentence], sentence))
+    excerpts = []
+    for sentence in sorted(ranked[:max_excerpts]):
+        text, length = sentences[sentence]
+        excerpts.append(text if length <= excerpt_max_words else " ".join(text.split()[:excerpt_max_words]) + " ...")
+
+    token_count = len(words)
+    return {
+        "token_count": token_count,
+        "type_count": len(set(words)),
+        "lemma_count": len(set(lemmas)),
+        "type_token_ratio": round(len(set(words)) / token_count, 3) if token_count else 0.0,
+        "mtld": round(mtld(words), 2),
+        "content_word_count": content_count,
+        "band_1_share": round(bands[1] / content_count, 3) if content_count else 0.0,
+        "band_2_share": round(bands[2] / content_count, 3) if content_count else 0.0,
+        "off_list_share": round(bands[3] / content_count, 3) if content_count else 0.0,
+        "less_common_share": round((bands[2] + bands[3]) / content_count, 3) if content_count else 0.0,
+        "filler_count": fillers,
+        "less_common_words": list(less_common.values())[:max_listed],
+        "phrases": list(phrases),
+        "basic_words": basic,
+        "repeated_words": [
+            {
+                "word": lemma,
+                "count": len(positions[lemma]),
+                "per_100_words": round(len(positions[lemma]) / token_count * 100, 2),
+                "sentences": len({sentence_of[index] for index in positions[lemma]}),
+            }
+            for lemma in repeated
+        ],
+        "sentence_count": len(sentences),
+        "excerpts": excerpts,
+    }
+
+def format_lexical_profile(profile: Dict[str, Any]) -> str:
+    """
+    Renders the statistics and flagged words as compact prompt lines.
+    """
+    repeated = ", ".join(
+        f"{item['word']} x{item['count']} ({item['sentences']} sentences)" for item in profile["repeated_words"]
+    )
+    basic = ", ".join(f"{word} x{count}" for word, count in sorted(profile["basic_words"].items()))
+    return "\n".join([
+        f"- Words: {profile['token_count']} ({profile['type_count']} distinct forms, {profile['lemma_count']} distinct lemmas)",
+        f"- Type-token ratio: {profile['type_token_ratio']:.2f}; MTLD (length-independent diversity): {profile['mtld']:.1f}",
+        f"- Content words: {profile['content_word_count']}; most frequent 1,000 words {profile['band_1_share']:.0%}, "
+        f"next 1,000 {profile['band_2_share']:.0%}, less common {profile['off_list_share']:.0%}",
+        f"- Less common words used (may include names or mis-transcriptions): {', '.join(profile['less_common_words']) or 'none'}",
+        f"- Idioms and collocations: {', '.join(profile['phrases']) or 'none'}",
+        f"- Overused basic words: {basic or 'none'}",
+        f"- Repeated content words: {repeated or 'none'}",
+    ])
+
+def format_excerpts(profile: Dict[str, Any]) -> str:
+    return "\n".join(f"- {excerpt}" for excerpt in profile["excerpts"]) or "- (empty)"
@@ -0,0 +1,277 @@
+"""
+Word lists used by the lexical profiler (utils/lexical_profile.py).
+
+Band 1 holds roughly the 1,000 most frequent English word families, band 2
+the next 1,000 or so as they occur in spoken English. Words outside both
+count as less common. Entries are base forms; inflections are resolved by
+the profiler's lemmatizer.
+"""
+
+FUNCTION_WORDS = """
+a about above across after again against all almost along also although always am among an and
+another any anybody anyone anything anywhere are around as at be because been before behind being
+below beside between beyond both but by can could did do does doing done down during each either
+else enough even ever every everybody everyone everything everywhere few for from had has have
+having he her here hers herself him himself his how however i if in inside into is it its itself
+just least less let like many may me might mine more most much must my myself near neither never
+no nobody none nor not nothing now of off often on once one only onto or other others otherwise
+our ours ourselves out outside over own per perhaps quite rather really same shall she should since
+so some somebody someone something sometimes somewhere still such than that the their theirs them
+themselves then there therefore these they this those though through throughout till to together
+too toward towards under unless until up upon us very was we were what whatever when whenever where
+whereas wherever whether which while who whoever whole whom whose why will with within without
+would yes yet you your yours yourself yourselves
+"""
+
+BAND_1 = """
+ability able accept accident account act action activity actually add address admit adult advice
+afford afraid afternoon age ago agree ahead air allow alone already animal answer apartment appear
+apply area arm army arrive art article ask attack attention aunt autumn available average avoid
+away baby back bad bag ball bank bar base basic bath beach bear beautiful become bed bedroom beer
+begin believe belong best better big bike bill bird birthday bit black blood blue board boat body
+book born borrow boss bother bottle bottom box boy brain bread break breakfast bring brother brown
+build building burn bus business busy buy cake call camera camp car card care career careful carry
+case cat catch cause centre century certain certainly chair chance change cheap check cheese child
+choice choose church cinema city class classroom clean clear clearly climb clock close clothes club
+coat coffee cold college colour come comfortable common company complete computer concert condition
+continue control cook cool copy corner correct cost country couple course cousin cover crazy create
+cross crowd cry culture cup customer cut dad damage dance danger dangerous dark date daughter day
+dead deal dear death decide decision deep definitely describe design desk detail develop die
+difference different difficult dinner direction dirty discuss doctor dog dollar door double doubt
+dream dress drink drive driver drop dry early earn earth easily east easy eat education effect egg
+eight eighteen eighty electric eleven email employ empty end energy engine english enjoy enter
+environment especially evening event exactly exam example excellent except exciting excuse exercise
+expect expensive experience explain eye face fact factory fail fair fall family famous fan far farm
+fast fat father favourite fear feel feeling field fifteen fifth fifty fight fill film final finally
+find fine finger finish fire first fish five fix flat floor flower fly follow food foot football
+force foreign forest forget form forty forward four fourteen free fresh friend friendly front fruit
+full fun funny future game garden gas general get gift girl give glass go goal gold good government
+grade grandfather grandmother great green grey ground group grow guess guest guitar guy hair half
+hall hand hang happen happy hard hardly hat hate head health healthy hear heart heat heavy hello help
+high hill history hit hobby hold hole holiday home homework hope hospital hot hotel hour house huge
+hundred hungry hurry hurt husband ice idea ill imagine important improve include increase
+information instead interest interested interesting internet invite island job join joke journey
+juice jump keep key kid kill kind king kitchen knee know knowledge lady lake land language large
+last late later laugh law lay lazy lead learn leave left leg lesson letter level library lie life
+light likely line list listen little live local long look lose lot loud love lovely low luck lucky
+lunch machine main make man manage manager map mark market marry match matter maybe meal mean
+meaning meat medicine meet meeting member memory message metal middle mile milk million mind minute
+miss mistake mobile modern moment money month moon morning mother mountain mouth move movie mum
+music name nation national natural nature nearly necessary neck need neighbour nervous net new news
+newspaper next nice night nine nineteen ninety noise normal north nose note notice number nurse
+object obviously offer office officer oil okay old open opinion opportunity order ordinary
+organise original page pain paint pair paper parent park part particular partner party pass past
+pay peace pen people perfect period person phone photo piano pick picture piece place plan plane
+plant plastic play player please pleasure pocket point police policy poor popular position possible
+post pound power practice prefer prepare present president pretty price prison private probably
+problem produce product programme project promise protect proud prove provide public pull purpose
+push put quality question quick quickly quiet race radio rain raise reach read ready real reality
+realize reason receive recent recently recognize red relationship relax remember rent repeat reply
+report rest restaurant result return rich ride right ring rise river road rock role room round rule
+run sad safe salt save say scared school science sea season seat second secret see seem sell send
+sense sentence serious serve service set seven seventeen seventy several shape share sheep shirt shoe
+shop short shoulder shout show shower shut sick side sign silly simple sing single sister sit
+situation six sixteen sixty size skill skin sky sleep slow slowly small smell smile smoke snow
+social society soft soldier solution son song soon sorry sort sound soup south space speak special
+speed spend sport spring square staff stage stand star start state station stay step stick stop
+store story straight strange street strong student study stuff stupid subject succeed success sugar
+suggest summer sun support suppose sure surprise sweet swim system table take talk tall taste taxi
+tea teach teacher team teenager telephone television tell temperature ten tend term terrible test
+text thank thing think third thirteen thirty thousand three throw ticket tie time tiny tired today
+toe tomorrow tonight tooth top total touch tour town toy traffic train travel tree trip trouble true
+trust truth try turn twelve twenty two type uncle understand university usually use useful usual
+valley value various video view village visit voice wait wake walk wall want war warm wash waste
+watch water way wear weather website wedding week weekend weight welcome well west wet white wide
+wife wild win wind window wine winter wish woman wonder wonderful wood word work worker world worry
+worse worst write wrong yard yeah year yellow yesterday young zero
+"""
+
+BAND_2 = """
+abroad absolutely academic access accommodation achieve achievement actor adapt advantage
+adventure advertise advertisement affect afterwards agency aim alive amazing amount ancient
+announce annual anxious apart appearance approach approve architecture argue argument arrange
+arrangement artist aspect assume atmosphere attend attitude attract attractive audience
+author authority aware awful background balance band basically battle bean beat behave behaviour
+benefit biology blame blank blind block bored boring brand brave bridge brief bright brilliant
+broad budget bunch calm campaign cancel candidate capable capital captain cash celebrate
+celebration central ceremony challenge champion channel character charge charity chat chemical
+chef chip circle citizen claim classic client climate coach coast collect collection colleague
+combine comedy comment commercial committee communicate communication community compare comparison
+compete competition complain complex concentrate concept concern confidence confident confuse
+connect connection consider constant construction consume contact contain content contest context
+contract contrast contribute convenient conversation convince cope costume cottage council count
+countryside courage crash creative creature credit crime crisis critic criticise crop cruel cultural
+cure curious current curtain custom cycle daily database deadline debate debt decade decline
+decorate decrease define degree delay deliver demand department depend depressed desert deserve
+destroy determine device diet digital dinosaur disappear disaster discover disease dish distance
+district divide document documentary domestic download drama dramatic drug due dust duty eager
+economic economy edge edition editor educate effective efficient effort elderly election element
+emergency emotion emotional emphasis encourage enemy engineer enormous entertain entertainment
+entire entrance equal equipment escape essay essential establish estimate evidence evil exact
+examine exchange exhibition exist existence expand expansion experiment expert explore export
+express expression extend extra extreme facility factor fairly faith false familiar fancy fantastic
+fashion fault feature fee female festival fiction figure file finance financial firm fitness flight
+float focus fold folk former fortune found freedom frequent fridge friendship frighten frustrated
+fuel function fund furniture gadget gain gallery gap gather generation generous gentle genuine
+global glove goods grab gradually graduate grammar grand grateful grocery guarantee guard guide
+guilty habit handle handsome harm headline heritage hero hide highlight highway hire honest
+honour horror household housework humour hunt identify identity ignore illegal illness image
+immediate immediately impact impress impression impressive income independent indicate individual
+industry influence inform initial injure injury innocent insect insist inspire install instance
+instruction instrument insurance intend intelligent international interview introduce invent
+invention invest investigate investment involve issue item jewellery judge junior justice label
+labour lack landscape laptop launch layer leader league lecture legal leisure lend lifestyle limit
+link literature loan location logical lonely loss luxury mainly maintain major majority male
+manner manufacture margin massive master material mature measure media medical mental mention
+menu mess method mild military mineral minor mix mixture mode model monitor mood moreover mostly
+motivate motivation motorbike mysterious narrow native negative network nightlife normally novel
+numerous nutrition observe obtain occasion occupy occur ocean odd official online operate operation
+opponent oppose option organisation outdoor overall overseas owner pace pack package palace panic
+participate passenger passion passport patient pattern peaceful percent perform performance
+permanent permission personal personality persuade phase philosophy photograph physical pile
+pilot pitch planet plenty poem poet poetry pole politics pollution pop population portrait positive
+potential poverty practical precise predict pregnant presence presentation preserve pressure
+prevent previous pride primary principle print priority prize procedure process profession
+professional profit progress property proportion proposal prospect psychology pub publish punish
+pure pursue qualification quantity rapid rare rarely rate reaction reader realistic recipe record
+recover reduce refer reflect reform refuse region regular regularly reject release relevant relief
+religion religious rely remain remind remote remove repair replace represent reputation request
+require research reserve resident resource respect respond response responsibility responsible
+restore retire reveal review revolution reward rhythm risk rival romantic rough route routine
+rural rush sail sake salary sample scene schedule scheme scholarship score screen script search
+section sector secure security select senior sensible separate sequence series session settle
+severe shade shadow shelf shell shift shock shortage significant silence silver similar sincere
+site skiing slight smart software soil solar solid solve source spare species specific spicy
+spirit split sponsor spot stable standard statement statistics status steady steal stomach
+strategy strength stress stretch strict strike structure struggle style substance suburb sufficient
+suit suitable summary supply surface surround survey survive suspect sympathy talent target task
+technique technology teenage temple temporary tension territory theatre theme theory thick thin
+threat tidy tight tip tool topic tough tourism tourist tradition traditional transfer transform
+translate transport treat treatment trend tropical typical unemployment unique unit upset urban
+urgent vacation valuable variety vast vehicle version victim victory viewer violence virtual
+visible vision visitor vital volume volunteer vote wage wealth wealthy weapon widely wildlife
+willing wisdom witness workshop worth youth
+"""
+
+# Everyday words that examiners often want upgraded when they are overused
+BASIC_WORDS = """
+bad big good great happy important interesting lot nice small sad stuff thing very really beautiful
+"""
+
+# Hesitation sounds; not part of the candidate's vocabulary
+FILLERS = """
+um umm uh uhm er erm ah eh hmm mm
+"""
+
+# Idioms and strong collocations, matched on lemmatized tokens
+PHRASES = """
+a blessing in disguise
+a piece of cake
+at the end of the day
+beat around the bush
+better late than never
+break the ice
+broaden my horizons
+broaden horizons
+by and large
+call it a day
+catch up with
+come to terms with
+cost an arm and a leg
+cut corners
+down to earth
+every now and then
+face to face
+few and far between
+first and foremost
+from time to time
+get along with
+get the hang of
+give it a shot
+go the extra mile
+hit the books
+hit the nail on the head
+in a nutshell
+in the long run
+in the nick of time
+it goes without saying
+keep an eye on
+keep in touch
+last but not least
+learn the ropes
+let off steam
+make ends meet
+make a living
+make a decision
+make an effort
+make progress
+more often than not
+my cup of tea
+not my cup of tea
+off the beaten track
+on the other hand
+on the whole
+once in a blue moon
+out of the blue
+over the moon
+pay attention to
+play it by ear
+pros and cons
+rule of thumb
+see eye to eye
+sooner or later
+spend quality time
+take for granted
+take into account
+take part in
+take up
+the best of both worlds
+the bottom line
+time flies
+to be honest
+under the weather
+up to date
+when it comes to
+work out
+wear and tear
+hustle and bustle
+bustling city
+peace and quiet
+heavy traffic
+strong coffee
+highly recommend
+deeply regret
+widely known
+rush hour
+"""
+
+# Contractions: the auxiliary left of n't where the spelling changes
+# (won't, can't, shan't, ain't), and the function word each clitic stands for
+NEGATED_AUXILIARIES = {"wo": "will", "ca": "can", "sha": "shall", "ai": "be"}
+CLITICS = {"re": "be", "ll": "will", "ve": "have", "m": "be", "d": "would"}
+
+# Irregular inflections -> base form
+IRREGULAR_FORMS = {
+    "am": "be", "is": "be", "are": "be", "was": "be", "were": "be", "been": "be", "being": "be",
+    "has": "have", "had": "have", "having": "have",
+    "did": "do", "done": "do", "does": "do",
+    "went": "go", "gone": "go", "goes": "go",
+    "made": "make", "took": "take", "taken": "take", "gave": "give", "given": "give",
+    "got": "get", "gotten": "get", "came": "come", "saw": "see", "seen": "see",
+    "knew": "know", "known": "know", "thought": "think", "brought": "bring", "bought": "buy",
+    "caught": "catch", "taught": "teach", "said": "say", "told": "tell", "found": "find",
+    "felt": "feel", "left": "leave", "kept": "keep", "slept": "sleep", "met": "meet",
+    "ran": "run", "sat": "sit", "stood": "stand", "understood": "understand", "spoke": "speak",
+    "spoken": "speak", "wrote": "write", "written": "write", "ate": "eat", "eaten": "eat",
+    "drank": "drink", "drunk": "drink", "drove": "drive", "driven": "drive", "rode": "ride",
+    "ridden": "ride", "began": "begin", "begun": "begin", "chose": "choose", "chosen": "choose",
+    "forgot": "forget", "forgotten": "forget", "grew": "grow", "grown": "grow", "heard": "hear",
+    "held": "hold", "lost": "lose", "meant": "mean", "paid": "pay", "sent": "send", "spent": "spend",
+    "built": "build", "won": "win", "wore": "wear", "worn": "wear", "broke": "break",
+    "broken": "break", "fell": "fall", "fallen": "fall", "flew": "fly", "flown": "fly",
+    "sang": "sing", "sung": "sing", "swam": "swim", "threw": "throw", "thrown": "throw",
+    "woke": "wake", "woken": "wake", "became": "become", "led": "lead", "lain": "lie",
+    "children": "child", "men": "man", "women": "woman", "feet": "foot",
+    "teeth": "tooth", "mice": "mouse", "lives": "life", "wives": "wife", "knives": "knife",
+    "lots": "lot", "things": "thing",
+}
@@ -0,0 +1,350 @@
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import openai
+from langchain_core.runnables import Runnable
+from src.utils.config import (
+    WHISPER_MAX_CONCURRENCY, LLM_MAX_CONCURRENCY,
+    LLM_RPM_LIMIT, LLM_TPM_LIMIT, WHISPER_RPM_LIMIT,
+    LLM_PROMPT_OVERHEAD_TOKENS, LLM_COMPLETION_TOKENS,
+    RATE_LIMIT_MAX_RETRIES, RATE_LIMIT_BACKOFF_BASE, RATE_LIMIT_BACKOFF_MAX,
+)
+from src.utils.hedging import hedged_call, within_node_deadline
+from src.utils.metrics import get_llm_callbacks
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Transient upstream statuses worth retrying; 429 and 503 also slow the governor down
+RETRYABLE_STATUSES = (408, 409, 429, 500, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)
+
+# Rate scale bounds for the adaptive (AIMD) slowdown after throttling
+MIN_RATE_SCALE = 0.1
+RATE_SCALE_DECREASE = 0.7
+RATE_SCALE_INCREASE = 0.02
+
+# Start time of the assessment the current task belongs to; earlier assessments are served first
+_assessment_started: ContextVar[Optional[float]] = ContextVar("assessment_started", default=None)
+
+@contextmanager
+def assessment_priority():
+    """
+    Marks the calls made inside the block as one assessment.
+
+    Queued upstream calls are served oldest-assessment first, so work that is
+    already in flight finishes before newly admitted assessments start.
+    """
+    token = _assessment_started.set(time.monotonic())
+    try:
+        yield
+    finally:
+        try:
+            _assessment_started.reset(token)
+        except ValueError:
+            # Async generator finalized from another context
+            pass
+
+def current_priority() -> float:
+    started = _assessment_started.get()
+    return started if started is not None else time.monotonic()
+
+class TokenBucket:
+    """
+    Per-minute budget refilled continuously; a limit of 0 disables the bucket.
+    """
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.level = float(per_minute)
+        self.scale = 1.0
+        self._updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self, now: float):
+        rate = self.capacity / 60 * self.scale
+        self.level = min(self.capacity, self.level + (now - self._updated) * rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Seconds until amount can be taken (0 if it can be taken now).
+        """
+        if not self.enabled:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / (self.capacity / 60 * self.scale)
+
+    def take(self, amount: float):
+        if self.enabled:
+            self.level -= min(amount, self.capacity)
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Reads Retry-After (or OpenAI's retry-after-ms) from an API error's response.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _status_code(error: Exception) -> Optional[int]:
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code
+    return None
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    if getattr(error, "code", None) == "insufficient_quota":
+        # Out of credit: waiting will not help
+        return False
+    return _status_code(error) in RETRYABLE_STATUSES
+
+class RateGovernor:
+    """
+    Admission control for one upstream API (chat completions or Whisper).
+
+    A call is started only when a concurrency slot is free and the
+    requests-per-minute and tokens-per-minute buckets can cover it. Waiting
+    calls are served in priority order (see assessment_priority). A 429/503
+    pauses every caller for the Retry-After interval and scales the refill
+    rate down; successes scale it back up, so throughput under saturation
+    settles just below the provider's limit instead of collapsing into retries.
+    """
+    def __init__(self, name: str, max_concurrency: int, rpm: int, tpm: int = 0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._in_flight = 0
+        self._waiters: List[tuple] = []
+        self._sequence = itertools.count()
+        self._cooldown_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats = {"calls": 0, "succeeded": 0, "failed": 0, "retries": 0, "throttled": 0, "wait_seconds": 0.0}
+
+    async def acquire(self, tokens: float = 0, priority: Optional[float] = None):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        priority = current_priority() if priority is None else priority
+        heapq.heappush(self._waiters, (priority, next(self._sequence), tokens, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                # Granted just before the caller was cancelled
+                self.release()
+            else:
+                self._dispatch()
+            raise
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    @property
+    def congested(self) -> bool:
+        """
+        Calls are waiting, or the governor is throttled (cooling down after a
+        429/503, or still below its full rate).
+        """
+        return (
+            self.queued > 0
+            or time.monotonic() < self._cooldown_until
+            or min(self.requests.scale, self.tokens.scale) < 1.0
+        )
+
+    def try_acquire(self, tokens: float = 0) -> bool:
+        """
+        Takes a slot only if one is free right now without overtaking waiting
+        calls; release() it afterwards. Used for hedged duplicates.
+        """
+        if self.congested or self._in_flight >= self.max_concurrency:
+            return False
+        now = time.monotonic()
+        if self.requests.wait_time(1, now) > 0 or self.tokens.wait_time(tokens, now) > 0:
+            return False
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self._in_flight += 1
+        return True
+
+    def release(self):
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._in_flight >= self.max_concurrency:
+                return
+            now = time.monotonic()
+            wait = max(
+                self._cooldown_until - now,
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(tokens, now),
+            )
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _on_success(self):
+        self._stats["succeeded"] += 1
+        for bucket in (self.requests, self.tokens):
+            bucket.scale = min(1.0, bucket.scale + RATE_SCALE_INCREASE)
+
+    def _backoff(self, error: Exception, attempt: int) -> float:
+        """
+        Seconds to wait before retrying; throttling errors also pause the governor.
+        """
+        ceiling = min(RATE_LIMIT_BACKOFF_MAX, RATE_LIMIT_BACKOFF_BASE * 2 ** attempt)
+        retry_after = retry_after_seconds(error)
+        if _status_code(error) in THROTTLE_STATUSES:
+            self._stats["throttled"] += 1
+            pause = retry_after if retry_after is not None else ceiling
+            self._cooldown_until = max(self._cooldown_until, time.monotonic() + pause)
+            for bucket in (self.requests, self.tokens):
+                bucket.scale = max(MIN_RATE_SCALE, bucket.scale * RATE_SCALE_DECREASE)
+        if retry_after is not None:
+            # Jitter on top of the server's hint so callers don't return in lockstep
+            return retry_after + random.uniform(0, RATE_LIMIT_BACKOFF_BASE)
+        return random.uniform(0, ceiling)
+
+    async def call(self, request: Callable[[], Awaitable[Any]], tokens: float = 0) -> Any:
+        """
+        Runs request() within the budgets, retrying rate limits and transient errors.
+
+        Args:
+            request: Starts the upstream call (called again on each retry)
+            tokens: Estimated tokens the call consumes
+        """
+        priority = current_priority()
+        self._stats["calls"] += 1
+        for attempt in itertools.count():
+            queued = time.monotonic()
+            await self.acquire(tokens, priority)
+            self._stats["wait_seconds"] += time.monotonic() - queued
+            try:
+                result = await request()
+            except Exception as e:
+                if not is_retryable(e) or attempt >= RATE_LIMIT_MAX_RETRIES:
+                    self._stats["failed"] += 1
+                    raise
+                delay = self._backoff(e, attempt)
+                self._stats["retries"] += 1
+                logger.warning(f"[{self.name}] {type(e).__name__}, retry {attempt + 1}/{RATE_LIMIT_MAX_RETRIES} in {delay:.1f}s")
+            else:
+                self._on_success()
+                return result
+            finally:
+                self.release()
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "wait_seconds": round(self._stats["wait_seconds"], 3),
+            "in_flight": self._in_flight,
+            "queued": self.queued,
+            "rate_scale": round(min(self.requests.scale, self.tokens.scale), 3),
+        }
+
+# Governors shared by every request, job and batch item, one set per event
+# loop: their waiter futures and timers belong to the loop that created them,
+# so an app restarted on a new loop (or a second loop in tests and benchmarks)
+# must not inherit them
+_loop_governors: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, RateGovernor]]" = weakref.WeakKeyDictionary()
+_unbound_governors: Dict[str, RateGovernor] = {}  # looked up outside a running loop
+
+def _get_governor(name: str, build: Callable[[], RateGovernor]) -> RateGovernor:
+    try:
+        governors = _loop_governors.setdefault(asyncio.get_running_loop(), {})
+    except RuntimeError:
+        governors = _unbound_governors
+    governor = governors.get(name)
+    if governor is None:
+        governor = governors[name] = build()
+    return governor
+
+def get_llm_governor() -> RateGovernor:
+    return _get_governor("llm", lambda: RateGovernor("LLM", LLM_MAX_CONCURRENCY, LLM_RPM_LIMIT, LLM_TPM_LIMIT))
+
+def get_whisper_governor() -> RateGovernor:
+    return _get_governor("whisper", lambda: RateGovernor("Whisper", WHISPER_MAX_CONCURRENCY, WHISPER_RPM_LIMIT))
+
+def estimate_tokens(inputs: Dict[str, Any]) -> int:
+    """
+    Rough token count of an LLM call: ~4 characters per token of the prompt
+    inputs (mostly the transcript), plus the fixed prompt and the completion.
+    """
+    characters = sum(
+        len(value) if isinstance(value, str) else len(json.dumps(value, default=str))
+        for value in inputs.values()
+    )
+    return characters // 4 + LLM_PROMPT_OVERHEAD_TOKENS + LLM_COMPLETION_TOKENS
+
+async def invoke_llm(chain: Runnable, inputs: Dict[str, Any], hedge: Optional[str] = None) -> Any:
+    """
+    Invokes an LLM chain through the shared rate governor.
+
+    Args:
+        chain: Prompt | structured LLM runnable
+        inputs: Prompt variables
+        hedge: Node name to track latency under and hedge slow calls for (see utils/hedging.py)
+    """
+    tokens = estimate_tokens(inputs)
+    governor = get_llm_governor()
+
+    def request():
+        return chain.ainvoke(inputs, config={"callbacks": get_llm_callbacks()})
+
+    # The node deadline and hedging both run inside the governor slot, so
+    # queueing and 429 backoff neither time a node out nor trigger a duplicate
+    if hedge is None:
+        return await governor.call(within_node_deadline(request), tokens)
+    return await governor.call(within_node_deadline(lambda: hedged_call(hedge, request, governor, tokens)), tokens)
+
+async def call_whisper(request: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Runs a Whisper request through the shared rate governor.
+    """
+    return await get_whisper_governor().call(request)
+
+def get_governor_stats() -> Dict[str, Any]:
+    return {"llm": get_llm_governor().get_stats(), "whisper": get_whisper_governor().get_stats()}
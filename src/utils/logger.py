@@ -1,11 +1,35 @@
 import logging
 import sys
+from contextvars import ContextVar
 from datetime import datetime
 
 # Configure logging format - simplified for status tracking
-LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - [%(request_id)s] %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# Id of the request (or job) being handled; inherited by every task the graph starts
+_request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+def get_request_id() -> str:
+    return _request_id.get()
+
+def set_request_id(request_id: str):
+    """
+    Sets the request id shown in log lines; returns a token for reset_request_id().
+    """
+    return _request_id.set(request_id)
+
+def reset_request_id(token):
+    _request_id.reset(token)
+
+class RequestIdFilter(logging.Filter):
+    """
+    Adds the current request id to each log record.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return True
+
 def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
     Set up a logger with console handler.
@@ -29,6 +53,7 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     console_handler.setLevel(level)
     console_formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
     console_handler.setFormatter(console_formatter)
+    console_handler.addFilter(RequestIdFilter())
     
     # Add handlers
     logger.addHandler(console_handler)
@@ -0,0 +1,232 @@
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from src.utils.config import LLM_MODEL
+from src.utils.hedging import is_unavailable
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# USD per 1M prompt / completion tokens, matched by model-name prefix (longest first)
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+# USD per minute of audio
+WHISPER_PRICE_PER_MINUTE = 0.006
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60, 90, 120, 180)
+
+NODE_DURATION = Histogram(
+    "ielts_node_duration_seconds", "Duration of a graph node", ["node", "status"], buckets=LATENCY_BUCKETS,
+)
+NODES_IN_FLIGHT = Gauge("ielts_nodes_in_flight", "Graph nodes currently running", ["node"])
+LLM_DURATION = Histogram(
+    "ielts_llm_call_duration_seconds", "Duration of one chat-completion call", ["node", "model"], buckets=LATENCY_BUCKETS,
+)
+LLM_ERRORS = Counter("ielts_llm_call_errors_total", "Failed chat-completion calls", ["node", "model"])
+LLM_TOKENS = Counter("ielts_llm_tokens_total", "Tokens used by chat-completion calls", ["node", "model", "type"])
+LLM_COST = Counter("ielts_llm_cost_usd_total", "Estimated chat-completion cost", ["node", "model"])
+WHISPER_DURATION = Histogram(
+    "ielts_whisper_call_duration_seconds", "Duration of one Whisper request", buckets=LATENCY_BUCKETS,
+)
+WHISPER_AUDIO_SECONDS = Counter("ielts_whisper_audio_seconds_total", "Audio transcribed by Whisper")
+WHISPER_COST = Counter("ielts_whisper_cost_usd_total", "Estimated Whisper cost")
+HTTP_DURATION = Histogram(
+    "ielts_http_request_duration_seconds", "Duration of an HTTP request", ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge("ielts_http_requests_in_flight", "HTTP requests being handled")
+ASSESSMENTS_RECORDED = Counter(
+    "ielts_assessments_recorded_total", "Assessments handed to the history store", ["status"],
+)
+
+# Graph node the current task is running, used to attribute LLM calls
+_current_node: ContextVar[str] = ContextVar("current_node", default="-")
+
+# LLM usage and node durations of the graph run the current task belongs to (see track_run_usage)
+_run_usage: ContextVar[Optional[Dict[str, Any]]] = ContextVar("run_usage", default=None)
+
+@contextmanager
+def track_run_usage():
+    """
+    Collects the LLM calls, tokens, estimated cost and node durations of one
+    graph run into the yielded dict. Node tasks copy the context they are
+    created in, so they all add to the same dict.
+    """
+    usage = {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0, "nodes": {}}
+    token = _run_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _run_usage.reset(token)
+
+# Called with (node, status, seconds) after every node, e.g. by the benchmark harness
+_node_listeners: List[Callable[[str, str, float], None]] = []
+
+def add_node_listener(listener: Callable[[str, str, float], None]):
+    _node_listeners.append(listener)
+
+def remove_node_listener(listener: Callable[[str, str, float], None]):
+    _node_listeners.remove(listener)
+
+# Called with (node, model, prompt_tokens, completion_tokens, seconds) after every chat completion
+_llm_listeners: List[Callable[[str, str, int, int, float], None]] = []
+
+def add_llm_listener(listener: Callable[[str, str, int, int, float], None]):
+    _llm_listeners.append(listener)
+
+def remove_llm_listener(listener: Callable[[str, str, int, int, float], None]):
+    _llm_listeners.remove(listener)
+
+def model_prices(model: str) -> Optional[Tuple[float, float]]:
+    for prefix in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(prefix):
+            return MODEL_PRICES[prefix]
+    return None
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prices = model_prices(model)
+    if prices is None:
+        return 0.0
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+def instrument_node(name: str, node):
+    """
+    Wraps a graph node to record its duration, status and in-flight count, and
+    to attribute the LLM calls made inside it to the node.
+    """
+    in_flight = NODES_IN_FLIGHT.labels(name)
+
+    @functools.wraps(node)
+    async def wrapper(state):
+        token = _current_node.set(name)
+        in_flight.inc()
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = await node(state)
+            degraded = isinstance(result, dict) and any(is_unavailable(value) for value in result.values())
+            status = "degraded" if degraded else "ok"
+            return result
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            in_flight.dec()
+            NODE_DURATION.labels(name, status).observe(seconds)
+            _current_node.reset(token)
+            logger.info(f"[TIMING] {name}: {status} in {seconds:.3f}s")
+            usage = _run_usage.get()
+            if usage is not None:
+                usage["nodes"][name] = round(usage["nodes"].get(name, 0.0) + seconds, 3)
+            for listener in _node_listeners:
+                listener(name, status, seconds)
+    return wrapper
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    Records latency, token usage and estimated cost of every chat-completion call.
+    Runs inline (no executor hop), so the current node is read from its context.
+    """
+    run_inline = True
+
+    def __init__(self):
+        self._started: Dict[UUID, Tuple[float, str, str]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any):
+        # The routed model (utils/routing.py), until the response names the exact version
+        model = (kwargs.get("invocation_params") or {}).get("model") or LLM_MODEL
+        self._started[run_id] = (time.perf_counter(), _current_node.get(), model)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        started, node, requested = self._started.pop(run_id, (None, _current_node.get(), LLM_MODEL))
+        output = response.llm_output or {}
+        model = output.get("model_name") or requested
+        seconds = time.perf_counter() - started if started is not None else 0.0
+        if started is not None:
+            LLM_DURATION.labels(node, model).observe(seconds)
+
+        usage = output.get("token_usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        LLM_TOKENS.labels(node, model, "prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(node, model, "completion").inc(completion_tokens)
+        LLM_COST.labels(node, model).inc(cost)
+        run_usage = _run_usage.get()
+        if run_usage is not None:
+            run_usage["llm_calls"] += 1
+            run_usage["prompt_tokens"] += prompt_tokens
+            run_usage["completion_tokens"] += completion_tokens
+            run_usage["cost_usd"] += cost
+        for listener in _llm_listeners:
+            listener(node, model, prompt_tokens, completion_tokens, seconds)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        _, node, model = self._started.pop(run_id, (None, _current_node.get(), LLM_MODEL))
+        LLM_ERRORS.labels(node, model).inc()
+
+_llm_callback = LLMMetricsCallback()
+
+def get_llm_callbacks() -> list:
+    """
+    Callbacks to pass in the config of every LLM chain invocation.
+    """
+    return [_llm_callback]
+
+def record_whisper(audio_seconds: Optional[float], call_seconds: float):
+    WHISPER_DURATION.observe(call_seconds)
+    if audio_seconds:
+        WHISPER_AUDIO_SECONDS.inc(audio_seconds)
+        WHISPER_COST.inc(audio_seconds / 60 * WHISPER_PRICE_PER_MINUTE)
+
+class UpstreamCollector:
+    """
+    Exposes the rate governors' queue state at scrape time.
+    """
+    def _families(self):
+        return (
+            GaugeMetricFamily("ielts_upstream_queued", "Upstream calls waiting for the rate governor", labels=["upstream"]),
+            GaugeMetricFamily("ielts_upstream_in_flight", "Upstream calls in flight", labels=["upstream"]),
+            CounterMetricFamily("ielts_upstream_retries", "Retried upstream calls", labels=["upstream"]),
+            CounterMetricFamily("ielts_upstream_throttled", "Upstream calls rejected with 429/503", labels=["upstream"]),
+            GaugeMetricFamily("ielts_upstream_rate_scale", "Adaptive rate scale after throttling (1 = full rate)", labels=["upstream"]),
+        )
+
+    def describe(self):
+        return self._families()
+
+    def collect(self):
+        from src.utils.limits import get_governor_stats
+
+        families = self._families()
+        queued, in_flight, retries, throttled, rate_scale = families
+        for upstream, stats in get_governor_stats().items():
+            queued.add_metric([upstream], stats["queued"])
+            in_flight.add_metric([upstream], stats["in_flight"])
+            retries.add_metric([upstream], stats["retries"])
+            throttled.add_metric([upstream], stats["throttled"])
+            rate_scale.add_metric([upstream], stats["rate_scale"])
+        return families
+
+REGISTRY.register(UpstreamCollector())
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    The Prometheus text exposition of all metrics, and its content type.
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
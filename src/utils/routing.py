@@ -0,0 +1,104 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Mapping, Optional, Tuple
+from src.utils.config import LLM_MODEL, LLM_ROUTES, LLM_FALLBACK_MODEL, LLM_FALLBACK_MAX_WORDS, LLM_FALLBACK_QUEUE_DEPTH
+from src.utils.limits import get_llm_governor
+
+# Nodes that make LLM calls, by routing name
+ROUTED_NODES = ("fluency", "pronunciation", "grammar", "vocabulary", "combined", "feedback", "suggestions")
+
+@dataclass(frozen=True)
+class ModelRoutes:
+    """
+    Which chat model each node uses.
+
+    A node uses nodes[node] (else default). When fallback is set, every node
+    switches to it for transcripts shorter than fallback_max_words words, or
+    while at least fallback_queue_depth LLM calls are waiting for the rate
+    governor (0 disables either rule).
+    """
+    default: str = LLM_MODEL
+    nodes: Mapping[str, str] = field(default_factory=dict)
+    fallback: str = ""
+    fallback_max_words: int = 0
+    fallback_queue_depth: int = 0
+
+    def with_nodes(self, **nodes: str) -> "ModelRoutes":
+        return replace(self, nodes={**self.nodes, **nodes})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "default": self.default,
+            "nodes": dict(self.nodes),
+            "fallback": self.fallback,
+            "fallback_max_words": self.fallback_max_words,
+            "fallback_queue_depth": self.fallback_queue_depth,
+        }
+
+def _configured_routes() -> ModelRoutes:
+    unknown = set(LLM_ROUTES) - set(ROUTED_NODES)
+    if unknown:
+        raise ValueError(f"Unknown nodes in LLM_ROUTES: {', '.join(sorted(unknown))}")
+    return ModelRoutes(
+        default=LLM_MODEL,
+        nodes=dict(LLM_ROUTES),
+        fallback=LLM_FALLBACK_MODEL if LLM_FALLBACK_MAX_WORDS or LLM_FALLBACK_QUEUE_DEPTH else "",
+        fallback_max_words=LLM_FALLBACK_MAX_WORDS,
+        fallback_queue_depth=LLM_FALLBACK_QUEUE_DEPTH,
+    )
+
+_routes: ModelRoutes = _configured_routes()
+_routes_lock = threading.Lock()
+
+# (node, model) chosen once for the node running in this task, see pin_model()
+_pinned_model: ContextVar[Optional[Tuple[str, str]]] = ContextVar("pinned_model", default=None)
+
+def get_routes() -> ModelRoutes:
+    return _routes
+
+def set_routes(routes: Optional[ModelRoutes]):
+    """
+    Replaces the routing table (e.g. per configuration in the routing
+    benchmark). Passing None restores the one configured by environment.
+    """
+    global _routes
+    with _routes_lock:
+        _routes = routes if routes is not None else _configured_routes()
+
+def select_model(node: str, transcript: Optional[str] = None) -> str:
+    """
+    Returns the chat model a node should call for this transcript, given the
+    routing table and the current LLM queue depth.
+    """
+    routes = _routes
+    model = routes.nodes.get(node, routes.default)
+    if not routes.fallback or model == routes.fallback:
+        return model
+    if routes.fallback_max_words and transcript is not None and len(transcript.split()) < routes.fallback_max_words:
+        return routes.fallback
+    if routes.fallback_queue_depth and get_llm_governor().queued >= routes.fallback_queue_depth:
+        return routes.fallback
+    return model
+
+@contextmanager
+def pin_model(node: str, model: str):
+    """
+    Fixes the model of a node call, so the model in the analysis cache key is
+    the one the call uses even if the queue-depth fallback flips meanwhile.
+    """
+    token = _pinned_model.set((node, model))
+    try:
+        yield
+    finally:
+        _pinned_model.reset(token)
+
+def routed_model(node: str, transcript: Optional[str] = None) -> str:
+    """
+    The model pinned for this node call by memoize_analysis, else select_model().
+    """
+    pinned = _pinned_model.get()
+    if pinned is not None and pinned[0] == node:
+        return pinned[1]
+    return select_model(node, transcript)
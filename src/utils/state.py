@@ -4,10 +4,23 @@ class AgentState(TypedDict):
     """
     Represents the state of the IELTS Speaking Feedback agent.
     """
-    audio_path: str
+    audio_path: Optional[str]  # Upload spilled to disk (large files)
+    audio_bytes: Optional[bytes]  # Upload held in memory (small files, normalized audio)
+    audio_filename: Optional[str]  # Original file name; its extension tells decoders the format
+    audio_hash: Optional[str]  # SHA-256 of the uploaded audio, keys the transcript cache
+    audio_size: Optional[int]  # in bytes
+    audio_duration: Optional[float]  # decoded length in seconds, when known before transcription
+    preprocessing: Optional[Dict[str, Any]]  # Normalization byte counts and timing
     transcript: Optional[str]
     duration: Optional[float]  # in seconds
+    segments: Optional[list[Dict[str, Any]]]  # Whisper segments: start, end (seconds) and text
+    words: Optional[list[Dict[str, Any]]]  # Whisper word timestamps: start, end (seconds) and word
+    fluency_features: Optional[Dict[str, Any]]  # Pause, rate and run measures (utils/fluency_features.py)
+    lexical_profile: Optional[Dict[str, Any]]  # Vocabulary statistics and flagged spans (utils/lexical_profile.py)
     questions: Optional[list[str]]  # List of questions asked
+    feedback_mode: Optional[str]  # Overrides FEEDBACK_MODE for this request
+    analysis_mode: Optional[str]  # Graph variant the run uses, so a checkpointed run resumes on the same graph
+    candidate_id: Optional[str]  # Who was assessed, for the assessment history
     
     # Analysis results (stored as dictionaries matching the Pydantic models)
     pronunciation_analysis: Optional[Dict[str, Any]]  # Fluency analysis
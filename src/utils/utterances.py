@@ -0,0 +1,203 @@
+import io
+import wave
+from collections import deque
+from typing import Any, Dict, List, NamedTuple, Optional
+import numpy as np
+from src.utils.config import (
+    FLUENCY_PAUSE_MIN_SECONDS,
+    FLUENCY_VAD_FRAME_MS,
+    FLUENCY_VAD_THRESHOLD_DB,
+    LIVE_UTTERANCE_SILENCE_SECONDS,
+    LIVE_UTTERANCE_MAX_SECONDS,
+    LIVE_UTTERANCE_MIN_SECONDS,
+    LIVE_UTTERANCE_PADDING_SECONDS,
+    LIVE_VAD_FLOOR_DBFS,
+    LIVE_VAD_WINDOW_SECONDS,
+)
+from src.utils.fluency_features import MIN_VOICED_SECONDS
+
+class Utterance(NamedTuple):
+    """
+    A closed stretch of speech from a live stream, as 16-bit mono PCM.
+    """
+    index: int
+    offset: float  # start within the stream, in seconds
+    duration: float  # in seconds
+    pcm: bytes
+
+def encode_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """
+    Wraps 16-bit mono PCM in a WAV container for upload.
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+class UtteranceSegmenter:
+    """
+    Splits a stream of 16-bit little-endian mono PCM into silence-bounded
+    utterances as the audio arrives, and tracks the stream's voice activity
+    (pauses, speech span) on the way.
+
+    Frames are classified with the same energy rule as voice_activity() in
+    fluency_features.py, over a rolling window of recent frame levels since
+    the whole recording is not known yet; frames below LIVE_VAD_FLOOR_DBFS
+    never count as speech. Only the audio of the open utterance (plus a short
+    pre-roll) is kept in memory.
+    """
+    def __init__(
+        self,
+        sample_rate: int,
+        frame_ms: int = FLUENCY_VAD_FRAME_MS,
+        silence_seconds: float = LIVE_UTTERANCE_SILENCE_SECONDS,
+        max_seconds: float = LIVE_UTTERANCE_MAX_SECONDS,
+        min_speech_seconds: float = LIVE_UTTERANCE_MIN_SECONDS,
+        padding_seconds: float = LIVE_UTTERANCE_PADDING_SECONDS,
+        min_pause: float = FLUENCY_PAUSE_MIN_SECONDS,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_length = max(1, sample_rate * frame_ms // 1000)
+        self.frame_seconds = self.frame_length / sample_rate
+        self.silence_seconds = silence_seconds
+        self.max_seconds = max_seconds
+        self.min_speech_seconds = min_speech_seconds
+        self.padding_seconds = padding_seconds
+        self.min_pause = min_pause
+
+        self._levels: deque = deque(maxlen=max(1, int(LIVE_VAD_WINDOW_SECONDS / self.frame_seconds)))
+        self._pending = bytearray()  # bytes short of a whole frame
+        self._audio = bytearray()  # PCM kept for the open utterance
+        self._audio_start = 0  # sample index of _audio[0]
+        self._frames = 0  # frames classified so far
+
+        self._run_start: Optional[float] = None  # voiced run in progress
+        self._speech_start: Optional[float] = None
+        self._speech_end: Optional[float] = None
+        self._pauses: List[List[float]] = []
+
+        self._utterance_start: Optional[float] = None  # open utterance
+        self._utterance_speech = 0.0
+        self._closed_end = 0.0  # end of the last closed utterance
+        self._count = 0
+
+    @property
+    def duration(self) -> float:
+        """Seconds of audio classified so far."""
+        return self._frames * self.frame_seconds
+
+    def feed(self, pcm: bytes) -> List[Utterance]:
+        """
+        Adds audio to the stream. Returns the utterances it closed, in order.
+        """
+        self._pending += pcm
+        usable = len(self._pending) // (2 * self.frame_length) * 2 * self.frame_length
+        if not usable:
+            return []
+        data = bytes(self._pending[:usable])
+        del self._pending[:usable]
+        self._audio += data
+
+        frames = np.frombuffer(data, dtype="<i2").astype(np.float32).reshape(-1, self.frame_length)
+        levels = 20 * np.log10(np.maximum(np.sqrt(np.mean(np.square(frames), axis=1)), 1e-6) / 32768)
+        self._levels.extend(levels.tolist())
+        window = np.fromiter(self._levels, dtype=np.float32)
+        threshold = max(
+            np.percentile(window, 95) - FLUENCY_VAD_THRESHOLD_DB,
+            np.percentile(window, 10) + 3,
+            LIVE_VAD_FLOOR_DBFS,
+        )
+
+        closed: List[Utterance] = []
+        for voiced in (levels > threshold).tolist():
+            self._step(voiced, closed)
+        self._trim_audio()
+        return closed
+
+    def flush(self) -> List[Utterance]:
+        """
+        Ends the stream: closes the voiced run and the utterance still open.
+        """
+        closed: List[Utterance] = []
+        now = self.duration
+        if self._run_start is not None:
+            self._end_run(now)
+        if self._utterance_start is not None:
+            self._close(min(self._speech_end + self.padding_seconds, now), closed)
+        self._audio.clear()
+        return closed
+
+    def activity(self) -> Dict[str, Any]:
+        """
+        Voice activity of the stream so far, in the format of voice_activity().
+        """
+        if self._speech_start is None:
+            return {"speech_start": None, "speech_end": None, "speech_seconds": 0.0, "pauses": []}
+        paused = sum(end - start for start, end in self._pauses)
+        return {
+            "speech_start": round(self._speech_start, 3),
+            "speech_end": round(self._speech_end, 3),
+            "speech_seconds": round(self._speech_end - self._speech_start - paused, 3),
+            "pauses": [[round(start, 3), round(end, 3)] for start, end in self._pauses],
+        }
+
+    def _step(self, voiced: bool, closed: List[Utterance]):
+        start = self._frames * self.frame_seconds
+        self._frames += 1
+        now = start + self.frame_seconds
+        if voiced:
+            if self._run_start is None:
+                self._run_start = start
+        else:
+            if self._run_start is not None:
+                self._end_run(start)
+            if self._utterance_start is not None and now - self._speech_end >= self.silence_seconds:
+                self._close(min(self._speech_end + self.padding_seconds, now), closed)
+        if self._utterance_start is not None and now - self._utterance_start >= self.max_seconds:
+            self._close(now, closed)
+
+    def _end_run(self, end: float):
+        start, self._run_start = self._run_start, None
+        if end - start < MIN_VOICED_SECONDS:
+            return
+        if self._speech_start is None:
+            self._speech_start = start
+        elif start - self._speech_end >= self.min_pause:
+            self._pauses.append([self._speech_end, start])
+        self._speech_end = end
+        if self._utterance_start is None:
+            self._utterance_start = max(self._closed_end, start - self.padding_seconds)
+            self._utterance_speech = 0.0
+        self._utterance_speech += end - max(start, self._utterance_start)
+
+    def _close(self, end: float, closed: List[Utterance]):
+        start, self._utterance_start = self._utterance_start, None
+        self._closed_end = end
+        if self._utterance_speech < self.min_speech_seconds:
+            return
+        first = int(start * self.sample_rate) - self._audio_start
+        last = int(end * self.sample_rate) - self._audio_start
+        closed.append(Utterance(
+            index=self._count,
+            offset=round(start, 3),
+            duration=round(end - start, 3),
+            pcm=bytes(self._audio[max(0, first) * 2:max(0, last) * 2]),
+        ))
+        self._count += 1
+
+    def _trim_audio(self):
+        """Drops audio no open or upcoming utterance can start in."""
+        if self._utterance_start is not None:
+            keep_from = self._utterance_start
+        elif self._run_start is not None:
+            keep_from = self._run_start - self.padding_seconds
+        else:
+            keep_from = self.duration - self.padding_seconds
+        keep_from = max(int(max(keep_from, self._closed_end) * self.sample_rate), self._audio_start)
+        drop = keep_from - self._audio_start
+        if drop > 0:
+            del self._audio[:drop * 2]
+            self._audio_start = keep_from
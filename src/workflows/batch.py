@@ -0,0 +1,81 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional
+from src.workflows.wf_speaking_feedback import get_graph, invoke_graph
+from src.utils.checkpoints import new_run_id
+from src.utils.config import BATCH_MAX_CONCURRENCY
+from src.utils.limits import assessment_priority
+from src.utils.logger import setup_logger, log_step, get_request_id, set_request_id
+
+logger = setup_logger(__name__)
+
+class BatchItem(NamedTuple):
+    """
+    One recording of a batch, ready to run through the graph.
+    """
+    index: int
+    filename: str
+    state: Dict[str, Any]
+    cleanup: Optional[Callable[[], Awaitable[None]]] = None
+
+async def run_batch(
+    items: List[BatchItem],
+    analysis_mode: Optional[str] = None,
+    max_concurrency: int = BATCH_MAX_CONCURRENCY,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs every item through the compiled graph and yields results as they finish.
+    A failed item's outcome carries the run id it was checkpointed under.
+
+    At most max_concurrency items of the batch are in flight; upstream calls are
+    further bounded by the process-wide Whisper and LLM budgets (utils/limits.py),
+    so a large batch cannot starve other traffic of API quota.
+    """
+    graph = get_graph(analysis_mode)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    started = time.perf_counter()
+    parent_request_id = get_request_id()
+
+    async def run_item(item: BatchItem) -> Dict[str, Any]:
+        step_name = f"[BATCH ITEM {item.index}] {item.filename}"
+        run_id = new_run_id()
+        # Each item runs in its own task, so this only tags the item's log lines
+        set_request_id(f"{parent_request_id}.{item.index}")
+        try:
+            async with semaphore:
+                item_started = time.perf_counter()
+                try:
+                    log_step(logger, step_name, "STARTED")
+                    with assessment_priority():
+                        result = await invoke_graph(graph, item.state, run_id)
+                    final_feedback = result.get("final_feedback")
+                    if not final_feedback:
+                        raise RuntimeError("Failed to generate feedback.")
+                    log_step(logger, step_name, "COMPLETED")
+                    outcome = {"status": "completed", "result": final_feedback}
+                except Exception as e:
+                    log_step(logger, step_name, "FAILED")
+                    logger.error(f"{step_name} error: {str(e)}")
+                    # The run id lets the client resume the item (POST /runs/{run_id}/resume)
+                    outcome = {"status": "failed", "error": str(e), "run_id": run_id}
+        finally:
+            # Release the audio as soon as the item is done (or cancelled before it started)
+            if item.cleanup is not None:
+                await item.cleanup()
+        return {
+            "index": item.index,
+            "filename": item.filename,
+            **outcome,
+            "seconds": round(time.perf_counter() - item_started, 3),
+            "elapsed": round(time.perf_counter() - started, 3),
+        }
+
+    tasks = [asyncio.create_task(run_item(item)) for item in items]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Client went away: stop scheduling the rest of the batch
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from src.utils.assessment_store import AssessmentRecord, AssessmentStore, SQLiteAssessmentStore
+from src.utils.config import (
+    ASSESSMENT_STORE,
+    ASSESSMENT_DB_PATH,
+    ASSESSMENT_BATCH_SIZE,
+    ASSESSMENT_FLUSH_SECONDS,
+    ASSESSMENT_QUEUE_MAX,
+)
+from src.utils.metrics import ASSESSMENTS_RECORDED
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def create_assessment_store() -> Optional[AssessmentStore]:
+    """
+    Builds the store selected by ASSESSMENT_STORE ("sqlite" or "none").
+    """
+    if ASSESSMENT_STORE == "sqlite":
+        return SQLiteAssessmentStore(ASSESSMENT_DB_PATH)
+    if ASSESSMENT_STORE == "none":
+        return None
+    raise ValueError(f"Unknown ASSESSMENT_STORE: {ASSESSMENT_STORE}")
+
+class AssessmentRecorder:
+    """
+    Writes finished assessments to the history store off the request path.
+
+    record() only queues the assessment; a background task writes what has
+    queued up in one transaction, at most batch_size records at a time and
+    flush_seconds after the first of them arrived. When more than max_pending
+    records are waiting (the store cannot keep up), new ones are dropped and
+    counted rather than slowing scoring down.
+    """
+    def __init__(
+        self,
+        batch_size: int = ASSESSMENT_BATCH_SIZE,
+        flush_seconds: float = ASSESSMENT_FLUSH_SECONDS,
+        max_pending: int = ASSESSMENT_QUEUE_MAX,
+    ):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.store: Optional[AssessmentStore] = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self):
+        self.store = create_assessment_store()
+        if self.store is not None:
+            self._task = asyncio.create_task(self._writer())
+
+    async def stop(self):
+        """Writes what is still queued, then closes the store."""
+        task, self._task = self._task, None
+        if task is not None:
+            await self._queue.put(None)
+            await task
+        if self.store is not None:
+            await self.store.close()
+            self.store = None
+
+    def record(self, record: AssessmentRecord):
+        if self._task is None:
+            return
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            ASSESSMENTS_RECORDED.labels("dropped").inc()
+            logger.warning(f"Assessment history queue full; dropped {record.assessment_id[:8]}")
+
+    async def _writer(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            record = await self._queue.get()
+            if record is None:
+                return
+            batch = [record]
+            deadline = loop.time() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    stopping = True
+                    break
+                batch.append(record)
+            await self._write(batch)
+
+    async def _write(self, batch: List[AssessmentRecord]):
+        try:
+            skipped = await self.store.add_many(batch)
+            ASSESSMENTS_RECORDED.labels("written").inc(len(batch) - skipped)
+            if skipped:
+                ASSESSMENTS_RECORDED.labels("skipped").inc(skipped)
+        except Exception as e:
+            ASSESSMENTS_RECORDED.labels("failed").inc(len(batch))
+            logger.error(f"Could not write {len(batch)} assessments to the history store: {str(e)}")
+
+_recorder: Optional[AssessmentRecorder] = None
+
+def get_assessment_recorder() -> AssessmentRecorder:
+    """
+    Returns the process-wide recorder (started from the FastAPI lifespan;
+    until then record_assessment() is a no-op).
+    """
+    global _recorder
+    if _recorder is None:
+        _recorder = AssessmentRecorder()
+    return _recorder
+
+def get_assessment_store() -> Optional[AssessmentStore]:
+    return get_assessment_recorder().store
+
+def record_assessment(run_id: str, state: Dict[str, Any], seconds: float, usage: Dict[str, Any]):
+    """
+    Queues a finished graph run for the history store. Runs without a report
+    (e.g. the parts of a test session) are not recorded.
+    """
+    feedback = state.get("final_feedback")
+    if not feedback:
+        return
+    get_assessment_recorder().record(AssessmentRecord(
+        assessment_id=run_id,
+        created_at=time.time(),
+        candidate_id=state.get("candidate_id"),
+        feedback=feedback,
+        transcript=state.get("transcript"),
+        duration=state.get("duration"),
+        analysis_mode=state.get("analysis_mode"),
+        feedback_mode=state.get("feedback_mode"),
+        seconds=seconds,
+        usage=usage,
+    ))
@@ -0,0 +1,173 @@
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from src.workflows.wf_speaking_feedback import get_graph, invoke_graph
+from src.utils.limits import assessment_priority
+from src.utils.job_store import JobStore, InMemoryJobStore, SQLiteJobStore
+from src.utils.config import JOB_STORE, JOB_DB_PATH, JOB_WORKERS, JOB_QUEUE_MAX_DEPTH, JOB_RESULT_TTL
+from src.utils.logger import setup_logger, log_step, get_request_id, set_request_id, reset_request_id
+
+logger = setup_logger(__name__)
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is submitted while the queue is at its depth limit.
+    """
+
+def create_job_store() -> JobStore:
+    """
+    Builds the job store selected by JOB_STORE ("memory" or "sqlite").
+    """
+    if JOB_STORE == "sqlite":
+        return SQLiteJobStore(JOB_DB_PATH, ttl=JOB_RESULT_TTL)
+    if JOB_STORE == "memory":
+        return InMemoryJobStore(ttl=JOB_RESULT_TTL)
+    raise ValueError(f"Unknown JOB_STORE: {JOB_STORE}")
+
+class JobRunner:
+    """
+    Bounded in-process worker pool that runs the compiled graph for queued jobs.
+
+    Admission control: at most max_queue_depth jobs may wait for a worker;
+    submit() raises QueueFullError beyond that.
+    """
+    def __init__(self, store: JobStore, workers: int = JOB_WORKERS, max_queue_depth: int = JOB_QUEUE_MAX_DEPTH):
+        self.store = store
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._waiting = 0
+        self._running = 0
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    async def start(self):
+        interrupted = await self.store.fail_unfinished("Interrupted by a server restart.")
+        if interrupted:
+            logger.info(f"Marked {interrupted} unfinished jobs as failed")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """
+        Cancels the running jobs, fails the ones still queued (running their
+        cleanups, e.g. deleting the upload), then closes the store.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while not self._queue.empty():
+            job_id, _, _, cleanup, _ = self._queue.get_nowait()
+            self._waiting -= 1
+            try:
+                await self.store.update(job_id, "failed", error="Cancelled during shutdown.")
+            except Exception as e:
+                logger.error(f"[JOB {job_id[:8]}] Could not mark as failed: {str(e)}")
+            finally:
+                if cleanup is not None:
+                    await cleanup()
+                self._queue.task_done()
+        await self.store.close()
+
+    async def submit(
+        self,
+        state: Dict[str, Any],
+        analysis_mode: Optional[str] = None,
+        cleanup: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Queues a workflow run and returns the new job record.
+
+        Args:
+            state: Initial graph state
+            analysis_mode: Graph variant to run
+            cleanup: Called once the job has finished (e.g. to delete the upload)
+        """
+        if self._waiting >= self.max_queue_depth:
+            raise QueueFullError(f"Job queue is full ({self.max_queue_depth} waiting).")
+
+        # Reserve the slot before awaiting the store so concurrent submits can't overshoot
+        self._waiting += 1
+        try:
+            job = await self.store.create(uuid.uuid4().hex)
+        except Exception:
+            self._waiting -= 1
+            raise
+        self._queue.put_nowait((job["job_id"], state, analysis_mode, cleanup, get_request_id()))
+        return job
+
+    async def retry(self, job_id: str, analysis_mode: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Re-queues a failed job. The run resumes from the job's last checkpoint,
+        so nodes that had finished before the failure are not run again.
+        """
+        if self._waiting >= self.max_queue_depth:
+            raise QueueFullError(f"Job queue is full ({self.max_queue_depth} waiting).")
+
+        self._waiting += 1
+        try:
+            await self.store.update(job_id, "queued")
+            job = await self.store.get(job_id)
+        except Exception:
+            self._waiting -= 1
+            raise
+        self._queue.put_nowait((job_id, None, analysis_mode, None, get_request_id()))
+        return job
+
+    async def _worker(self):
+        while True:
+            job_id, state, analysis_mode, cleanup, request_id = await self._queue.get()
+            self._waiting -= 1
+            self._running += 1
+            # Log the job under the id of the request that submitted it
+            token = set_request_id(request_id)
+            try:
+                await self._run(job_id, state, analysis_mode)
+            finally:
+                self._running -= 1
+                if cleanup is not None:
+                    await cleanup()
+                reset_request_id(token)
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, state: Optional[Dict[str, Any]], analysis_mode: Optional[str]):
+        step_name = f"[JOB {job_id[:8]}] Workflow Execution"
+        try:
+            log_step(logger, step_name, "STARTED")
+            await self.store.update(job_id, "running")
+
+            with assessment_priority():
+                # Checkpointed under the job id; a None state resumes a retried job
+                result = await invoke_graph(get_graph(analysis_mode), state, job_id)
+            final_feedback = result.get("final_feedback")
+            if not final_feedback:
+                raise RuntimeError("Failed to generate feedback.")
+
+            await self.store.update(job_id, "completed", result=final_feedback)
+            log_step(logger, step_name, "COMPLETED")
+
+        except asyncio.CancelledError:
+            await self.store.update(job_id, "failed", error="Cancelled during shutdown.")
+            raise
+        except Exception as e:
+            log_step(logger, step_name, "FAILED")
+            logger.error(f"[JOB {job_id[:8]}] Error: {str(e)}")
+            await self.store.update(job_id, "failed", error=str(e))
+
+_job_runner: Optional[JobRunner] = None
+
+def get_job_runner() -> JobRunner:
+    """
+    Returns the process-wide job runner (started from the FastAPI lifespan).
+    """
+    global _job_runner
+    if _job_runner is None:
+        _job_runner = JobRunner(create_job_store())
+    return _job_runner
@@ -0,0 +1,169 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from src.agents.transcriber import transcribe_chunk
+from src.utils.audio import AudioChunk
+from src.utils.config import FLUENCY_LONG_PAUSE_SECONDS, TRANSCRIBE_MAX_CONCURRENCY
+from src.utils.fluency_features import extract_fluency_features
+from src.utils.lexical_profile import profile_lexis
+from src.utils.state import AgentState
+from src.utils.utterances import Utterance, UtteranceSegmenter, encode_wav
+from src.utils.logger import setup_logger, log_step
+
+logger = setup_logger(__name__)
+
+class LiveSession:
+    """
+    One live assessment: audio frames come in while the candidate speaks,
+    each silence-bounded utterance is transcribed as soon as it closes, and
+    the running transcript, duration and timestamps are kept in an
+    AgentState. When the stream ends, only the last utterance is left to
+    transcribe; finish() then returns a state the graph starts from the
+    analyses with (the preprocess and transcribe nodes are skipped, as for
+    a cached transcript).
+
+    Progress is put on the events queue as ("utterance", payload) tuples,
+    in stream order, for the caller to forward to the client. An utterance
+    whose transcription fails is reported right away as "utterance_error"
+    and left out of the transcript; the session goes on with the next one.
+    """
+    def __init__(
+        self,
+        sample_rate: int,
+        questions: List[str],
+        feedback_mode: Optional[str] = None,
+        analysis_mode: Optional[str] = None,
+        candidate_id: Optional[str] = None,
+    ):
+        self.segmenter = UtteranceSegmenter(sample_rate)
+        self.state: AgentState = {
+            "audio_filename": "live.wav",
+            "transcript": "",
+            "duration": 0.0,
+            "segments": [],
+            "words": [],
+            "questions": questions,
+            "feedback_mode": feedback_mode,
+            "analysis_mode": analysis_mode,
+            "candidate_id": candidate_id,
+        }
+        self.events: asyncio.Queue = asyncio.Queue()
+        self._next = 0  # index of the next utterance to append
+        self._finished: Dict[int, Optional[Dict[str, Any]]] = {}  # done ahead of an earlier utterance; None if failed
+        self._failed = 0
+        self._tasks: List[asyncio.Task] = []
+        self._semaphore = asyncio.Semaphore(TRANSCRIBE_MAX_CONCURRENCY)
+
+    @property
+    def duration(self) -> float:
+        return self.segmenter.duration
+
+    def feed(self, pcm: bytes):
+        """
+        Adds a frame of audio; utterances it closes start transcribing in the background.
+        """
+        for utterance in self.segmenter.feed(pcm):
+            self._transcribe(utterance)
+
+    def _transcribe(self, utterance: Utterance):
+        self._tasks.append(asyncio.create_task(self._transcribe_utterance(utterance, time.perf_counter())))
+
+    async def _transcribe_utterance(self, utterance: Utterance, closed_at: float):
+        chunk = AudioChunk(
+            offset=utterance.offset,
+            duration=utterance.duration,
+            filename=f"utterance_{utterance.index}.wav",
+            data=encode_wav(utterance.pcm, self.segmenter.sample_rate),
+        )
+        try:
+            async with self._semaphore:
+                part = await transcribe_chunk(chunk)
+            part["latency"] = round(time.perf_counter() - closed_at, 3)
+            part["offset"] = utterance.offset
+        except Exception as e:
+            # Skip the utterance rather than hold back the ones after it
+            part = None
+            self._failed += 1
+            logger.warning(f"Live utterance {utterance.index} could not be transcribed: {str(e)}")
+            await self.events.put(("utterance_error", {
+                "index": utterance.index,
+                "start": utterance.offset,
+                "end": round(utterance.offset + utterance.duration, 3),
+                "detail": str(e),
+            }))
+        self._finished[utterance.index] = part
+
+        # Append in stream order: a later utterance may finish first
+        while self._next in self._finished:
+            index = self._next
+            part = self._finished.pop(index)
+            self._next += 1
+            if part is None:
+                continue
+            state = self.state
+            if part["transcript"]:
+                state["transcript"] = f"{state['transcript']} {part['transcript']}".lstrip()
+            state["segments"].extend(part["segments"])
+            state["words"].extend(part["words"])
+            state["duration"] = round(self.duration, 3)
+            await self.events.put(("utterance", {
+                "index": index,
+                "start": part["offset"],
+                "end": round(part["offset"] + part["duration"], 3),
+                "text": part["transcript"],
+                "latency": part["latency"],
+                "metrics": self.metrics(),
+            }))
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Running fluency measures, updated as each utterance is transcribed:
+        words per minute over the stream so far and the pauses seen so far.
+        """
+        word_count = len(self.state["words"]) or len(self.state["transcript"].split())
+        activity = self.segmenter.activity()
+        pauses = [end - start for start, end in activity["pauses"]]
+        minutes = self.duration / 60
+        return {
+            "words": word_count,
+            "duration": round(self.duration, 3),
+            "wpm": round(word_count / minutes, 1) if minutes else 0.0,
+            "pause_count": len(pauses),
+            "long_pause_count": sum(pause >= FLUENCY_LONG_PAUSE_SECONDS for pause in pauses),
+            "mean_pause": round(sum(pauses) / len(pauses), 3) if pauses else 0.0,
+        }
+
+    async def finish(self) -> AgentState:
+        """
+        Ends the stream: transcribes what is still open, waits for the pending
+        utterances and adds the local fluency and lexical measures.
+        """
+        step_name = "Live Transcript"
+        log_step(logger, step_name, "STARTED")
+        try:
+            for utterance in self.segmenter.flush():
+                self._transcribe(utterance)
+            await asyncio.gather(*self._tasks)
+
+            state = self.state
+            if not state["transcript"]:
+                # The graph would otherwise look for audio to transcribe
+                raise ValueError("No speech was detected in the stream")
+            state["duration"] = round(self.duration, 3)
+            state["fluency_features"] = extract_fluency_features(
+                state["transcript"], state["duration"], state["words"], state["segments"], self.segmenter.activity(),
+            )
+            state["lexical_profile"] = profile_lexis(state["transcript"])
+            logger.info(f"{step_name}: {self._next} utterances ({self._failed} failed), {state['duration']}s")
+            log_step(logger, step_name, "COMPLETED")
+            return state
+        except Exception as e:
+            log_step(logger, step_name, "FAILED")
+            logger.error(f"{step_name} error: {str(e)}")
+            raise
+
+    async def close(self):
+        """Cancels transcriptions still running (e.g. the client went away)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
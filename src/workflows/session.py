@@ -0,0 +1,58 @@
+import asyncio
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from src.workflows.wf_speaking_feedback import get_graph, invoke_graph
+from src.agents.feedback import generate_session_feedback
+from src.utils.limits import assessment_priority
+from src.utils.logger import setup_logger, log_step, get_request_id, set_request_id
+
+logger = setup_logger(__name__)
+
+class SessionPart(NamedTuple):
+    """
+    One recorded part of a test session, ready to run through the graph.
+    """
+    part: int
+    filename: str
+    state: Dict[str, Any]
+
+async def run_session(
+    parts: List[SessionPart],
+    analysis_mode: Optional[str] = None,
+    feedback_mode: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Assesses every part of a session concurrently, then writes one report.
+
+    Each part runs through the graph variant without the report node
+    (transcription and analyses only), so wall-clock time is close to that of
+    the longest part. If any part fails, the others are cancelled.
+    """
+    graph = get_graph(analysis_mode, with_report=False)
+    parent_request_id = get_request_id()
+    started = time.perf_counter()
+
+    async def run_part(part: SessionPart) -> Dict[str, Any]:
+        step_name = f"[SESSION PART {part.part}] {part.filename}"
+        # Each part runs in its own task, so this only tags the part's log lines
+        set_request_id(f"{parent_request_id}.{part.part}")
+        log_step(logger, step_name, "STARTED")
+        try:
+            state = await invoke_graph(graph, part.state, checkpoint=False)
+        except Exception as e:
+            log_step(logger, step_name, "FAILED")
+            logger.error(f"{step_name} error: {str(e)}")
+            raise
+        log_step(logger, step_name, "COMPLETED")
+        return {"part": part.part, "state": state}
+
+    with assessment_priority():
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(run_part(part)) for part in parts]
+        except ExceptionGroup as errors:
+            # Report the part's own error rather than the group wrapper
+            raise errors.exceptions[0]
+        results = sorted((task.result() for task in tasks), key=lambda result: result["part"])
+        logger.info(f"Session parts analyzed in {time.perf_counter() - started:.2f}s")
+        return await generate_session_feedback(results, feedback_mode)
@@ -0,0 +1,77 @@
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from src.agents.feedback import SECTION_STATE_KEYS
+from src.utils.checkpoints import new_run_id, run_config, finish_run
+from src.utils.limits import assessment_priority
+from src.utils.metrics import track_run_usage
+from src.workflows.history import record_assessment
+
+# State key -> report section, for the analysis nodes' updates
+STATE_KEY_SECTIONS = {key: section for section, key in SECTION_STATE_KEYS.items()}
+
+def _node_payload(node: str, update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Picks the client-facing part of a node's state update.
+    """
+    update = update or {}
+    if node == "transcribe":
+        return {"transcript": update.get("transcript"), "duration": update.get("duration")}
+    if node == "preprocess_audio":
+        return {"preprocessing": update.get("preprocessing")}
+    if node == "generate_feedback":
+        return {"feedback": update.get("final_feedback")}
+    sections = {
+        STATE_KEY_SECTIONS[key]: value
+        for key, value in update.items()
+        if key in STATE_KEY_SECTIONS
+    }
+    return {"sections": sections}
+
+async def stream_node_events(
+    graph,
+    initial_state: Dict[str, Any],
+    run_id: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Runs the graph and yields (node_name, payload) as each node finishes.
+
+    Every payload carries "elapsed" (seconds since the run started) and
+    "node_duration" (seconds the node itself took). A transcript seeded from the
+    cache is reported up front as a "transcribe" event with "cached": True.
+    The run is checkpointed under run_id like invoke_graph(), so a failed
+    stream can be resumed, and recorded in the assessment history once done.
+    """
+    run_id = run_id or new_run_id()
+    started = time.perf_counter()
+    task_started: Dict[str, float] = {}
+
+    if initial_state.get("transcript"):
+        yield "transcribe", {
+            "transcript": initial_state["transcript"],
+            "duration": initial_state.get("duration"),
+            "cached": True,
+            "elapsed": 0.0,
+            "node_duration": 0.0,
+        }
+
+    # The run's final state, built up from the node updates
+    state = dict(initial_state)
+    succeeded = False
+    with assessment_priority(), track_run_usage() as usage:
+        try:
+            async for task in graph.astream(initial_state, run_config(run_id), stream_mode="tasks"):
+                now = time.perf_counter()
+                if "result" not in task:
+                    task_started[task["id"]] = now
+                    continue
+
+                state.update(task["result"] or {})
+                payload = _node_payload(task["name"], task["result"])
+                payload["elapsed"] = round(now - started, 3)
+                payload["node_duration"] = round(now - task_started.pop(task["id"], now), 3)
+                yield task["name"], payload
+            succeeded = True
+            record_assessment(run_id, state, time.perf_counter() - started, usage)
+        finally:
+            # Also runs when the client disconnects mid-stream
+            await finish_run(run_id, succeeded)
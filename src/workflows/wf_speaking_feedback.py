@@ -1,33 +1,64 @@
-from langgraph.graph import StateGraph, END
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from langgraph.graph import StateGraph, START, END
 from src.utils.state import AgentState
+from src.agents.preprocessor import preprocess_audio
 from src.agents.transcriber import transcribe_audio
 from src.agents.fluency import analyze_fluency
 from src.agents.pronunciation import analyze_pronunciation
 from src.agents.grammar import analyze_grammar
 from src.agents.vocabulary import analyze_vocabulary
+from src.agents.combined import analyze_combined
 from src.agents.feedback import generate_feedback
+from src.utils.config import ANALYSIS_MODE
+from src.utils.checkpoints import get_checkpointer, node_retry_policy, new_run_id, run_config, finish_run
+from src.utils.metrics import instrument_node, track_run_usage
+from src.workflows.history import record_assessment
 from src.utils.logger import setup_logger, log_step
 
 logger = setup_logger(__name__)
 
-def create_graph():
+ANALYSIS_NODES = ["analyze_fluency", "analyze_pronunciation", "analyze_grammar", "analyze_vocabulary"]
+
+def add_node(workflow: StateGraph, name: str, node: Callable):
+    """
+    Adds a node wrapped with per-node timing and token metrics. A node that
+    raises is re-run in place (node_retry_policy) before the run fails.
+    """
+    workflow.add_node(name, instrument_node(name, node), retry_policy=node_retry_policy())
+
+def add_transcription_stage(workflow: StateGraph, next_nodes: List[str]):
+    """
+    Adds the preprocess_audio -> transcribe nodes as the entry of the graph.
+    If the initial state already carries a cached transcript, the run goes
+    straight to next_nodes instead.
     """
-    Constructs the IELTS Speaking Feedback LangGraph.
+    add_node(workflow, "preprocess_audio", preprocess_audio)
+    add_node(workflow, "transcribe", transcribe_audio)
+    
+    def route(state: AgentState):
+        return next_nodes if state.get("transcript") else "preprocess_audio"
+    
+    workflow.add_conditional_edges(START, route, ["preprocess_audio", *next_nodes])
+    workflow.add_edge("preprocess_audio", "transcribe")
+
+def create_graph(with_report: bool = True):
+    """
+    Constructs the IELTS Speaking Feedback LangGraph. Without the report the
+    graph ends once the analyses are done (e.g. one part of a test session).
     """
     log_step(logger, "Workflow Graph Initialization", "STARTED")
     
     workflow = StateGraph(AgentState)
     
     # Add nodes
-    workflow.add_node("transcribe", transcribe_audio)
-    workflow.add_node("analyze_fluency", analyze_fluency)
-    workflow.add_node("analyze_pronunciation", analyze_pronunciation)
-    workflow.add_node("analyze_grammar", analyze_grammar)
-    workflow.add_node("analyze_vocabulary", analyze_vocabulary)
-    workflow.add_node("generate_feedback", generate_feedback)
-    
-    # Define edges
-    workflow.set_entry_point("transcribe")
+    add_transcription_stage(workflow, ANALYSIS_NODES)
+    add_node(workflow, "analyze_fluency", analyze_fluency)
+    add_node(workflow, "analyze_pronunciation", analyze_pronunciation)
+    add_node(workflow, "analyze_grammar", analyze_grammar)
+    add_node(workflow, "analyze_vocabulary", analyze_vocabulary)
     
     # After transcription, run analyses in parallel
     workflow.add_edge("transcribe", "analyze_fluency")
@@ -35,18 +66,123 @@ def create_graph():
     workflow.add_edge("transcribe", "analyze_grammar")
     workflow.add_edge("transcribe", "analyze_vocabulary")
     
-    # After all analyses are done, generate feedback
-    workflow.add_edge("transcribe", "generate_feedback")
-    workflow.add_edge("analyze_fluency", "generate_feedback")
-    workflow.add_edge("analyze_pronunciation", "generate_feedback")
-    workflow.add_edge("analyze_grammar", "generate_feedback")
-    workflow.add_edge("analyze_vocabulary", "generate_feedback")
+    if with_report:
+        # After all analyses are done, generate feedback (a single join, so the
+        # report is produced once instead of once per finishing predecessor)
+        add_node(workflow, "generate_feedback", generate_feedback)
+        workflow.add_edge(ANALYSIS_NODES, "generate_feedback")
+        workflow.add_edge("generate_feedback", END)
+    else:
+        workflow.add_edge(ANALYSIS_NODES, END)
     
-    # End
-    workflow.add_edge("generate_feedback", END)
-    
-    compiled_graph = workflow.compile()
+    compiled_graph = workflow.compile(checkpointer=get_checkpointer())
     
     log_step(logger, "Workflow Graph Initialization", "COMPLETED")
     
     return compiled_graph
+
+def create_combined_graph(with_report: bool = True):
+    """
+    Constructs the single-call variant: one combined rubric analysis replaces
+    the four parallel per-criterion analyses.
+    """
+    log_step(logger, "Combined Workflow Graph Initialization", "STARTED")
+    
+    workflow = StateGraph(AgentState)
+    
+    add_transcription_stage(workflow, ["analyze_combined"])
+    add_node(workflow, "analyze_combined", analyze_combined)
+    
+    workflow.add_edge("transcribe", "analyze_combined")
+    if with_report:
+        add_node(workflow, "generate_feedback", generate_feedback)
+        workflow.add_edge("analyze_combined", "generate_feedback")
+        workflow.add_edge("generate_feedback", END)
+    else:
+        workflow.add_edge("analyze_combined", END)
+    
+    compiled_graph = workflow.compile(checkpointer=get_checkpointer())
+    
+    log_step(logger, "Combined Workflow Graph Initialization", "COMPLETED")
+    
+    return compiled_graph
+
+
+# Graph variants that can be compiled on demand, keyed by analysis mode
+GRAPH_BUILDERS: Dict[str, Callable] = {
+    "per_criterion": create_graph,
+    "combined": create_combined_graph,
+}
+
+_compiled_graphs: Dict[str, object] = {}
+_graphs_lock = threading.Lock()
+
+def _graph_key(variant: Optional[str], with_report: bool) -> str:
+    variant = variant or ANALYSIS_MODE
+    return variant if with_report else f"{variant}:analysis"
+
+def get_graph(variant: Optional[str] = None, with_report: bool = True):
+    """
+    Returns the process-wide compiled graph for a variant, building it on first use.
+    Defaults to the ANALYSIS_MODE variant; with_report=False returns the variant
+    without the final report node.
+    """
+    key = _graph_key(variant, with_report)
+    graph = _compiled_graphs.get(key)
+    if graph is not None:
+        return graph
+    
+    variant = variant or ANALYSIS_MODE
+    if variant not in GRAPH_BUILDERS:
+        raise ValueError(f"Unknown workflow variant: {variant}")
+    
+    with _graphs_lock:
+        graph = _compiled_graphs.get(key)
+        if graph is None:
+            graph = GRAPH_BUILDERS[variant](with_report=with_report)
+            _compiled_graphs[key] = graph
+    return graph
+
+def set_graph(graph, variant: Optional[str] = None, with_report: bool = True):
+    """
+    Replaces the compiled graph used for a variant (e.g. a stubbed graph in tests).
+    Passing None drops the cached graph so the next get_graph() rebuilds it.
+    """
+    key = _graph_key(variant, with_report)
+    with _graphs_lock:
+        if graph is None:
+            _compiled_graphs.pop(key, None)
+        else:
+            _compiled_graphs[key] = graph
+
+async def invoke_graph(
+    graph,
+    state: Optional[Dict[str, Any]],
+    run_id: Optional[str] = None,
+    checkpoint: bool = True,
+) -> Dict[str, Any]:
+    """
+    Runs a compiled graph with its state checkpointed under run_id after
+    every step. On success the checkpoints are dropped; a failed run keeps
+    them, and invoke_graph(graph, None, run_id) resumes it from the last
+    checkpoint, re-running only the nodes that had not finished. A run that
+    produced a report is queued for the assessment history under run_id.
+
+    Callers that never hand the run id out (so nobody could resume the run)
+    pass checkpoint=False; the run then leaves no checkpoints behind.
+    """
+    run_id = run_id or new_run_id()
+    started = time.perf_counter()
+    if not checkpoint:
+        graph = graph.copy(update={"checkpointer": None})
+    try:
+        with track_run_usage() as usage:
+            result = await graph.ainvoke(state, run_config(run_id))
+    except (Exception, asyncio.CancelledError):
+        if checkpoint:
+            await finish_run(run_id, succeeded=False)
+        raise
+    if checkpoint:
+        await finish_run(run_id, succeeded=True)
+    record_assessment(run_id, result, time.perf_counter() - started, usage)
+    return result
@@ -0,0 +1,7 @@
+import os
+
+# Configuration is read at import time: keep the tests off disk caches and stores
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ["CACHE_DB_PATH"] = ""
+os.environ["CHECKPOINT_SAVER"] = "memory"
+os.environ["ASSESSMENT_STORE"] = "none"
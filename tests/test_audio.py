@@ -0,0 +1,60 @@
+from pydub import AudioSegment
+from pydub.generators import Sine
+from src.agents.transcriber import merge_transcriptions
+from src.utils.audio import find_cut_points
+
+def _speech(ms: int) -> AudioSegment:
+    return Sine(440).to_audio_segment(duration=ms, volume=-10)
+
+def _recording(*parts) -> AudioSegment:
+    """Alternating tone (speech) and silence lengths in ms, starting with tone."""
+    audio = AudioSegment.empty()
+    for index, ms in enumerate(parts):
+        audio += _speech(ms) if index % 2 == 0 else AudioSegment.silent(duration=ms)
+    return audio
+
+def test_short_recording_is_not_cut():
+    audio = _recording(3000)
+    assert find_cut_points(audio, max_chunk_ms=5000, min_silence_ms=300, search_ms=2000) == [0, 3000]
+
+def test_cut_falls_in_the_middle_of_the_last_silence_in_the_window():
+    # Speech 0-4000, silence 4000-4600, speech 4600-9000
+    audio = _recording(4000, 600, 4400)
+    cuts = find_cut_points(audio, max_chunk_ms=5000, min_silence_ms=300, search_ms=2000)
+    assert cuts[0] == 0 and cuts[-1] == len(audio)
+    assert 4000 <= cuts[1] <= 4600
+    assert abs(cuts[1] - 4300) <= 20
+
+def test_cut_is_hard_without_a_silence_in_the_window():
+    audio = _recording(12000)
+    cuts = find_cut_points(audio, max_chunk_ms=5000, min_silence_ms=300, search_ms=2000)
+    assert cuts == [0, 5000, 10000, 12000]
+
+def test_chunks_never_exceed_the_maximum():
+    audio = _recording(3000, 400, 3000, 400, 3000, 400, 3000)
+    cuts = find_cut_points(audio, max_chunk_ms=4000, min_silence_ms=300, search_ms=1500)
+    assert all(0 < end - start <= 4000 for start, end in zip(cuts, cuts[1:]))
+
+def test_merge_keeps_chunk_offsets_and_order():
+    # Chunk timestamps arrive already shifted onto the recording's timeline
+    parts = [
+        {
+            "transcript": "first part",
+            "duration": 10.0,
+            "segments": [{"start": 0.0, "end": 9.5, "text": "first part"}],
+            "words": [{"start": 0.0, "end": 0.4, "word": "first"}, {"start": 0.5, "end": 0.9, "word": "part"}],
+        },
+        {"transcript": "", "duration": 2.5, "segments": [], "words": []},
+        {
+            "transcript": "second part",
+            "duration": 8.25,
+            "segments": [{"start": 12.5, "end": 20.0, "text": "second part"}],
+            "words": [{"start": 12.5, "end": 13.0, "word": "second"}, {"start": 13.1, "end": 13.6, "word": "part"}],
+        },
+    ]
+    merged = merge_transcriptions(parts)
+    assert merged["transcript"] == "first part second part"
+    assert merged["duration"] == 20.75
+    assert [segment["start"] for segment in merged["segments"]] == [0.0, 12.5]
+    starts = [word["start"] for word in merged["words"]]
+    assert starts == sorted(starts) == [0.0, 0.5, 12.5, 13.1]
@@ -0,0 +1,69 @@
+import asyncio
+import uuid
+from src.utils.cache import memoize_analysis, transcript_key
+from src.utils.routing import ModelRoutes, routed_model, set_routes
+
+def _memoized_node(namespace: str):
+    calls = []
+
+    @memoize_analysis(namespace, "v1", transcript_key)
+    async def node(state):
+        calls.append(routed_model(namespace, state.get("transcript")))
+        return {"analysis": {"model": calls[-1], "errors": ["one"]}}
+
+    return node, calls
+
+def test_results_are_cached_per_transcript():
+    node, calls = _memoized_node(f"test-{uuid.uuid4().hex}")
+    asyncio.run(node({"transcript": "I like  my hometown."}))
+    # Whitespace-only differences share the entry
+    asyncio.run(node({"transcript": " I like my\nhometown. "}))
+    asyncio.run(node({"transcript": "Something else entirely."}))
+    assert len(calls) == 2
+
+def test_cache_key_includes_the_routed_model():
+    namespace = f"test-{uuid.uuid4().hex}"
+    node, calls = _memoized_node(namespace)
+    state = {"transcript": "My hometown is a small city by the sea."}
+    try:
+        set_routes(ModelRoutes(default="model-a"))
+        first = asyncio.run(node(state))
+        set_routes(ModelRoutes(default="model-a", nodes={namespace: "model-b"}))
+        second = asyncio.run(node(state))
+        set_routes(ModelRoutes(default="model-a"))
+        third = asyncio.run(node(state))
+    finally:
+        set_routes(None)
+    assert calls == ["model-a", "model-b"]
+    assert first["analysis"]["model"] == "model-a"
+    assert second["analysis"]["model"] == "model-b"
+    assert third == first
+
+def test_fallback_model_results_are_kept_apart():
+    namespace = f"test-{uuid.uuid4().hex}"
+    node, calls = _memoized_node(namespace)
+    try:
+        set_routes(ModelRoutes(default="model-a", fallback="model-small", fallback_max_words=5))
+        asyncio.run(node({"transcript": "Too short."}))
+        asyncio.run(node({"transcript": "This one is long enough to use the default model."}))
+    finally:
+        set_routes(None)
+    assert calls == ["model-small", "model-a"]
+
+def test_cached_results_are_isolated_from_callers():
+    node, calls = _memoized_node(f"test-{uuid.uuid4().hex}")
+    state = {"transcript": "We often go to the beach at the weekend."}
+    first = asyncio.run(node(state))
+    first["analysis"]["errors"].append("mutated after the miss")
+    second = asyncio.run(node(state))
+    second["analysis"]["errors"].append("mutated after a hit")
+    third = asyncio.run(node(state))
+    assert len(calls) == 1
+    assert third["analysis"]["errors"] == ["one"]
+    assert third is not second
+
+def test_no_key_bypasses_the_cache():
+    node, calls = _memoized_node(f"test-{uuid.uuid4().hex}")
+    asyncio.run(node({"transcript": ""}))
+    asyncio.run(node({"transcript": ""}))
+    assert len(calls) == 2
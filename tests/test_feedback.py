@@ -0,0 +1,30 @@
+import pytest
+from src.agents.feedback import calculate_overall_band, round_band
+
+@pytest.mark.parametrize("score, band", [
+    (6.0, 6.0),
+    (6.125, 6.0),
+    (6.25, 6.5),
+    (6.5, 6.5),
+    (6.74, 6.5),
+    (6.75, 7.0),
+    (8.9, 9.0),
+    (0.0, 0.0),
+])
+def test_round_band_rounds_to_half_bands_with_quarters_up(score, band):
+    assert round_band(score) == band
+
+def test_overall_band_is_the_rounded_mean():
+    # 6.25 rounds up to 6.5
+    assert calculate_overall_band([6.0, 6.5, 6.0, 6.5]) == 6.5
+    assert calculate_overall_band([7.0, 7.0, 6.0, 6.0]) == 6.5
+    assert calculate_overall_band([5.0, 5.5, 5.0, 5.0]) == 5.0
+
+def test_overall_band_leaves_out_unavailable_sections():
+    # An unavailable section (None) must not count as a zero
+    assert calculate_overall_band([7.0, None, 7.0, 6.5]) == 7.0
+    assert calculate_overall_band([None, None, None, 5.5]) == 5.5
+
+def test_overall_band_without_any_section_is_zero():
+    assert calculate_overall_band([None, None, None, None]) == 0.0
+    assert calculate_overall_band([]) == 0.0
@@ -0,0 +1,40 @@
+from src.utils.fluency_features import extract_fluency_features
+
+def _words(*spans):
+    return [{"start": start, "end": end, "word": f"w{index}"} for index, (start, end) in enumerate(spans)]
+
+def test_pauses_from_word_timestamps():
+    words = _words((0.0, 0.5), (0.6, 1.0), (2.5, 3.0), (3.1, 3.5), (3.9, 4.2), (4.3, 6.0))
+    features = extract_fluency_features("one two three four five six", 6.0, words=words, min_pause=0.25, long_pause=1.0)
+    assert features["pause_source"] == "words"
+    assert features["word_count"] == 6
+    assert features["speech_rate"] == 60.0
+    # Gaps of 1.5s (long) and 0.4s; 0.1s gaps are not pauses
+    assert features["pause_count"] == 2
+    assert features["long_pause_count"] == 1
+    assert features["max_pause"] == 1.5
+    assert features["mean_pause"] == 0.95
+    # Runs: 2 words, 2 words, 2 words
+    assert features["mean_length_of_run"] == 2.0
+    assert features["phonation_ratio"] == round(4.1 / 6.0, 3)
+
+def test_voice_activity_takes_precedence_over_timestamps():
+    activity = {"speech_start": 0.2, "speech_end": 9.8, "speech_seconds": 8.0, "pauses": [[3.0, 3.6], [6.0, 7.0]]}
+    words = _words((0.0, 5.0), (5.0, 10.0))
+    features = extract_fluency_features("one two", 10.0, words=words, activity=activity, min_pause=0.25, long_pause=1.0)
+    assert features["pause_source"] == "audio"
+    assert features["pause_count"] == 2
+    assert features["long_pause_count"] == 1
+    assert features["phonation_ratio"] == 0.8
+
+def test_filled_pauses_are_counted():
+    features = extract_fluency_features("um I think uh it is er good", 5.0)
+    assert features["filled_pause_count"] == 3
+    assert features["pause_source"] == "none"
+    assert features["pause_count"] == 0
+
+def test_empty_transcript():
+    features = extract_fluency_features("", None)
+    assert features["word_count"] == 0
+    assert features["speech_rate"] == 0.0
+    assert features["filled_pauses_per_100_words"] == 0.0
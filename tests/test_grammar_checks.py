@@ -0,0 +1,54 @@
+from src.utils.grammar_checks import check_sentence, grammar_prepass, split_sentences
+
+def _names(sentence: str):
+    return [check.name for check in check_sentence(sentence)]
+
+def test_common_errors_are_flagged():
+    assert "subject-verb agreement" in _names("They is very friendly.")
+    assert "third person -s" in _names("My brother always go to the gym.")
+    assert "article before vowel sound" in _names("It was a interesting day.")
+    assert "modal followed by to" in _names("You should to try it.")
+    assert "uncountable noun as plural" in _names("They gave me many informations.")
+    assert "tense consistency" in _names("Yesterday I go to the market.")
+
+def test_correct_sentences_are_not_flagged():
+    assert _names("It was a very good idea.") == []
+    assert _names("Does he go there often?") == []
+    assert _names("She has a really nice house.") == []
+
+def test_missing_article_after_an_intensifier():
+    assert "missing article" in _names("It was very good idea.")
+    assert "missing article" in _names("It is good idea.")
+
+def test_long_unpunctuated_runs_are_split():
+    sentences = split_sentences(" ".join(["word"] * 120), max_words=50)
+    assert [len(sentence.split()) for sentence in sentences] == [50, 50, 20]
+
+def test_flagged_sentences_are_capped_with_matching_categories():
+    transcript = "He go there. They is here. I has a car. We was late. It was fine."
+    prepass = grammar_prepass(transcript, max_flagged=2, context=0)
+    assert [item["index"] for item in prepass["flagged"]] == [0, 1]
+    assert sum(prepass["categories"].values()) == sum(len(item["checks"]) for item in prepass["flagged"])
+
+def test_sentences_past_the_cap_are_not_clean_range_samples():
+    # Sentences 3 and 4 have errors and many clauses; they are past the cap
+    transcript = (
+        "He go there. "
+        "I went home. "
+        "The weather was nice. "
+        "They is here, which was odd because it rained when we arrived although nobody minded. "
+        "People is nice although nobody knows why they came when it was late because it was cold. "
+        "We walked."
+    )
+    prepass = grammar_prepass(transcript, max_flagged=1, context=0, range_samples=3)
+    assert [item["index"] for item in prepass["flagged"]] == [0]
+    assert not {3, 4} & set(prepass["range_samples"])
+    assert prepass["range_samples"] == [1, 2, 5]
+
+def test_complexity_counts_clauses():
+    prepass = grammar_prepass("I stayed at home because it was raining. I read a book which my friend gave me.")
+    complexity = prepass["complexity"]
+    assert complexity["sentence_count"] == 2
+    assert complexity["clause_count"] == 4
+    assert complexity["relative_clauses"] == 1
+    assert complexity["complex_sentence_share"] == 1.0
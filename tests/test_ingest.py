@@ -0,0 +1,76 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from src.api.ingest import receive_upload, sniff_audio_format
+
+WAV_HEAD = b"RIFF\x24\x08\x00\x00WAVEfmt "
+
+@pytest.mark.parametrize("head, audio_format", [
+    (WAV_HEAD, "wav"),
+    (b"ID3\x04\x00\x00\x00\x00\x00\x00\x00\x00", "mp3"),
+    (b"\xff\xfb\x90\x64" + b"\x00" * 8, "mp3"),
+    (b"OggS\x00\x02" + b"\x00" * 6, "ogg"),
+    (b"\x00\x00\x00\x20ftypM4A ", "m4a"),
+    (b"fLaC\x00\x00\x00\x22" + b"\x00" * 4, "flac"),
+    (b"\x1aE\xdf\xa3" + b"\x00" * 8, "webm"),
+    (b"%PDF-1.7\n%\xe2\xe3", None),
+    (b"", None),
+])
+def test_sniff_audio_format(head, audio_format):
+    assert sniff_audio_format(head) == audio_format
+
+def _client(max_file_bytes: int = 1024, spool_max_bytes: int = 256) -> TestClient:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        form = await receive_upload(request, max_file_bytes=max_file_bytes, spool_max_bytes=spool_max_bytes)
+        received = form.files[0]
+        result = {"format": received.format, "size": received.size, "spilled": received.path is not None}
+        await form.cleanup()
+        return result
+
+    return TestClient(app)
+
+def _wav(size: int) -> bytes:
+    return WAV_HEAD + b"\x00" * (size - len(WAV_HEAD))
+
+def test_upload_within_the_limit_is_received():
+    response = _client().post("/upload", files={"file": ("a.wav", _wav(1024), "audio/wav")})
+    assert response.status_code == 200
+    assert response.json() == {"format": "wav", "size": 1024, "spilled": True}
+
+def test_small_upload_stays_in_memory():
+    response = _client().post("/upload", files={"file": ("a.wav", _wav(200), "audio/wav")})
+    assert response.json()["spilled"] is False
+
+def test_oversized_file_is_rejected_while_streaming():
+    response = _client().post("/upload", files={"file": ("a.wav", _wav(1025), "audio/wav")})
+    assert response.status_code == 413
+
+def test_oversized_body_is_rejected_from_content_length():
+    body = b"x" * (1024 + 1024 * 1024 + 1)
+    response = _client().post(
+        "/upload",
+        content=body,
+        headers={"content-type": "multipart/form-data; boundary=abc", "content-length": str(len(body))},
+    )
+    assert response.status_code == 413
+
+def test_disallowed_extension_is_rejected():
+    response = _client().post("/upload", files={"file": ("a.flac", b"fLaC" + b"\x00" * 100, "audio/flac")})
+    assert response.status_code == 400
+
+def test_content_that_is_not_audio_is_rejected():
+    response = _client().post("/upload", files={"file": ("a.wav", b"%PDF-1.7" + b"\x00" * 100, "audio/wav")})
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("filename, data", [
+    ("a.wav", b"fLaC" + b"\x00" * 100),
+    ("a.mp3", b"\x1aE\xdf\xa3" + b"\x00" * 100),
+    ("a.mp3", _wav(200)),
+])
+def test_content_must_match_the_extension(filename, data):
+    response = _client().post("/upload", files={"file": (filename, data, "audio/wav")})
+    assert response.status_code == 400
+    assert "does not match" in response.json()["detail"]
@@ -0,0 +1,50 @@
+import pytest
+from src.utils.lexical_profile import FUNCTION, lemmatize, mtld, profile_lexis
+
+@pytest.mark.parametrize("word, lemma", [
+    ("don't", "do"),
+    ("doesn't", "do"),
+    ("didn't", "do"),
+    ("wasn't", "be"),
+    ("isn't", "be"),
+    ("couldn't", "could"),
+    ("won't", "will"),
+    ("can't", "can"),
+    ("ain't", "be"),
+    ("you're", "be"),
+    ("i'm", "be"),
+    ("we'll", "will"),
+    ("they've", "have"),
+    ("she'd", "would"),
+])
+def test_contractions_map_to_function_words(word, lemma):
+    assert lemmatize(word) == lemma
+    assert lemma in FUNCTION
+
+def test_possessives_keep_the_word():
+    assert lemmatize("it's") == "it"
+    assert lemmatize("john's") == "john"
+
+def test_inflections_are_lemmatized():
+    assert lemmatize("went") == "go"
+    assert lemmatize("stopped") == "stop"
+    assert lemmatize("studies") == "study"
+
+def test_contractions_are_not_content_words():
+    profile = profile_lexis("I don't know. It wasn't easy and I couldn't do it, they didn't help and we'll see.")
+    assert profile["less_common_words"] == []
+    assert profile["off_list_share"] == 0.0
+    assert profile["content_word_count"] == profile_lexis("I know. It easy and I do it, they help and we see.")["content_word_count"]
+
+def test_fillers_and_repetitions():
+    profile = profile_lexis("Um, the city is nice. Uh, the city is big. The city is old.", repeat_min=3)
+    assert profile["filler_count"] == 2
+    assert profile["repeated_words"][0]["word"] == "city"
+    assert profile["repeated_words"][0]["count"] == 3
+    assert profile["sentence_count"] == 3
+
+def test_mtld_is_zero_for_no_words_and_higher_for_varied_text():
+    assert mtld([]) == 0.0
+    repetitive = ["the", "cat"] * 50
+    varied = [f"word{index}" for index in range(100)]
+    assert mtld(varied) > mtld(repetitive)
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from email.utils import formatdate
+import httpx
+import openai
+from src.utils.limits import RateGovernor, TokenBucket, retry_after_seconds
+
+def _rate_limit_error(headers) -> openai.RateLimitError:
+    response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(_rate_limit_error({"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(_rate_limit_error({"retry-after": "1.5"})) == 1.5
+
+def test_retry_after_ms_takes_precedence():
+    assert retry_after_seconds(_rate_limit_error({"retry-after-ms": "250", "retry-after": "7"})) == 0.25
+
+def test_retry_after_http_date():
+    seconds = retry_after_seconds(_rate_limit_error({"retry-after": formatdate(time.time() + 30, usegmt=True)}))
+    assert 28 <= seconds <= 30
+
+def test_retry_after_missing_or_malformed():
+    assert retry_after_seconds(_rate_limit_error({})) is None
+    assert retry_after_seconds(_rate_limit_error({"retry-after": "soon"})) is None
+    assert retry_after_seconds(ValueError("no response")) is None
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(60)  # one per second
+    now = bucket._updated
+    assert bucket.wait_time(60, now) == 0.0
+    bucket.take(60)
+    assert bucket.wait_time(1, now) == 1.0
+    assert bucket.wait_time(1, now + 0.5) == 0.5
+    assert bucket.wait_time(1, now + 2) == 0.0
+
+def test_token_bucket_scale_slows_refill():
+    bucket = TokenBucket(60)
+    now = bucket._updated
+    bucket.take(60)
+    bucket.scale = 0.5
+    assert bucket.wait_time(1, now) == 2.0
+
+def test_token_bucket_caps_amount_and_disables_at_zero():
+    bucket = TokenBucket(10)
+    # More than the capacity waits for a full bucket rather than forever
+    assert bucket.wait_time(1000, bucket._updated) == 0.0
+    assert TokenBucket(0).wait_time(10 ** 9, time.monotonic()) == 0.0
+
+def test_governor_serves_waiters_in_priority_order():
+    async def run():
+        governor = RateGovernor("test", max_concurrency=1, rpm=0)
+        await governor.acquire(priority=0)
+        granted = []
+
+        async def waiter(priority: float):
+            await governor.acquire(priority=priority)
+            granted.append(priority)
+            governor.release()
+
+        tasks = [asyncio.create_task(waiter(priority)) for priority in (3.0, 1.0, 2.0)]
+        await asyncio.sleep(0)
+        assert governor.queued == 3
+        governor.release()
+        await asyncio.gather(*tasks)
+        return granted
+
+    assert asyncio.run(run()) == [1.0, 2.0, 3.0]
+
+def test_governor_skips_cancelled_waiters():
+    async def run():
+        governor = RateGovernor("test", max_concurrency=1, rpm=0)
+        await governor.acquire(priority=0)
+        cancelled = asyncio.create_task(governor.acquire(priority=1))
+        waiting = asyncio.create_task(governor.acquire(priority=2))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        governor.release()
+        await asyncio.wait_for(waiting, 1)
+        return governor._in_flight, governor.queued
+
+    assert asyncio.run(run()) == (1, 0)